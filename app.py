@@ -1,36 +1,98 @@
 """
 API Flask para Transferência de Arquivos
 Google Drive → Azure Blob Storage
+
+A aplicação é criada por create_app(). Em produção use um servidor WSGI
+com vários processos e threads (ver wsgi.py e gunicorn.conf.py); os
+gerenciadores são criados sob demanda, uma vez por processo.
 """
-from flask import Flask, jsonify, request, render_template
+from flask import Blueprint, Flask, jsonify, request, render_template
 from flask_cors import CORS
+import hashlib
+import json
 import os
 import sys
+import threading
+import time
 from datetime import datetime
-from google_drive_manager import GoogleDriveManager
-from azure_blob_manager import AzureBlobManager
-from config import validate_config, AZURE_CONTAINER_NAME
+from bandwidth import global_bucket, global_processes, mb_s_to_bytes
+from config import (
+    validate_config, AZURE_CONTAINER_NAME, WEB_HOST, WEB_PORT, FLASK_DEBUG,
+    LISTING_SNAPSHOT_SECONDS, TRANSFER_SOURCE, TRANSFER_SINK
+)
+from history import get_history_store, parse_duration
+from jobs import JobManager
+from logger import get_logger
+from storage import open_backend, uses_cloud
+from tracing import get_tracer
+
+api = Blueprint('api', __name__)
+
+logger = get_logger('app')
+
+# Maior página aceita pelas listagens paginadas
+MAX_PAGE_SIZE = 1000
 
-app = Flask(__name__, template_folder='templates', static_folder='static')
-CORS(app)
+# Janelas padrão de /api/stats e maior número de pontos por série
+DEFAULT_STATS_WINDOWS = '1h,24h,7d'
+MAX_ROLLUP_POINTS = 2000
 
-# Variáveis globais
-gdrive_manager = None
-azure_manager = None
+# Origem e destino do processo atual (criados no primeiro uso)
+_managers = {'pid': None, 'origin': None, 'destination': None, 'jobs': None}
+_managers_lock = threading.Lock()
+
+def get_managers():
+    """
+    Retorna (origin, destination) do processo atual
+    
+    Por padrão, o GoogleDriveManager e o AzureBlobManager; TRANSFER_SOURCE
+    e TRANSFER_SINK trocam os backends (ver storage.py). Cada processo de
+    um servidor com vários workers cria seus próprios gerenciadores no
+    primeiro uso, mesmo que o módulo tenha sido carregado antes do fork
+    (ex.: gunicorn --preload). As threads do processo os compartilham.
+    """
+    pid = os.getpid()
+    if _managers['pid'] != pid:
+        with _managers_lock:
+            if _managers['pid'] != pid:
+                origin = open_backend(TRANSFER_SOURCE)
+                destination = open_backend(TRANSFER_SINK)
+                destination.prepare()
+                # Um job terminado gravou no destino: as listagens guardadas ficam velhas
+                jobs = JobManager(origin, destination,
+                                  on_finished=lambda job: _invalidate_listings())
+                _managers.update(origin=origin, destination=destination, jobs=jobs)
+                # Por último: outras threads só usam os gerenciadores prontos
+                _managers['pid'] = pid
+    return _managers['origin'], _managers['destination']
+
+def get_job_manager():
+    """Retorna o JobManager do processo atual (workers compartilhados entre os jobs)"""
+    get_managers()
+    return _managers['jobs']
 
 def initialize_managers():
     """Inicializa gerenciadores"""
-    global gdrive_manager, azure_manager
     try:
-        gdrive_manager = GoogleDriveManager()
-        azure_manager = AzureBlobManager()
-        azure_manager.create_container_if_not_exists()
+        get_managers()
         return True
     except Exception as e:
-        print(f"❌ Erro ao inicializar: {e}")
+        logger.error("❌ Erro ao inicializar: %s", e)
         return False
 
-@app.route('/api/health', methods=['GET'])
+def create_app():
+    """
+    Cria a aplicação Flask
+    
+    Não conecta ao Google Drive nem ao Azure: isso acontece na primeira
+    requisição de cada processo (ver get_managers).
+    """
+    app = Flask(__name__, template_folder='templates', static_folder='static')
+    CORS(app)
+    app.register_blueprint(api)
+    return app
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """Verifica se a API está funcionando"""
     return jsonify({
@@ -39,37 +101,106 @@ def health_check():
         'message': 'API está operacional'
     })
 
-@app.route('/')
+@api.route('/')
 def index():
     """Retorna página principal"""
     return render_template('index.html')
 
-@app.route('/api/google-drive/files', methods=['GET'])
+def _format_file(file):
+    return {
+        'id': file['id'],
+        'name': file['name'],
+        'size': int(file.get('size', 0)),
+        'size_mb': round(int(file.get('size', 0)) / (1024 * 1024), 2),
+        'mime_type': file.get('mimeType', 'unknown'),
+        'md5': file.get('md5Checksum'),
+        'created': file.get('createdTime', 'N/A'),
+        'modified': file.get('modifiedTime', 'N/A')
+    }
+
+def _format_blob(file):
+    return {
+        'name': file['name'],
+        'size_mb': round(int(file.get('size') or 0) / (1024 * 1024), 2),
+        'last_modified': file.get('modifiedTime') or 'N/A'
+    }
+
+def _load_drive_files():
+    origin, _ = get_managers()
+    return [_format_file(file) for file in origin.list_files()]
+
+def _load_azure_blobs():
+    _, destination = get_managers()
+    return [_format_blob(file) for file in destination.list_files()]
+
+# Última listagem de cada tipo neste processo, usada para servir as páginas
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def _snapshot(kind, load, refresh=False):
+    """
+    Retorna (versão, itens) da listagem 'kind'
+    
+    A listagem é refeita com refresh (ou ?refresh=1) ou quando a anterior tem mais de
+    LISTING_SNAPSHOT_SECONDS; as demais páginas são servidas da mesma
+    listagem. A versão muda sempre que o conteúdo muda, para o cliente
+    saber quando precisa atualizar as páginas que já tem.
+    """
+    with _snapshots_lock:
+        cached = _snapshots.get(kind)
+    refresh = refresh or request.args.get('refresh') == '1'
+    if cached and not refresh and time.monotonic() - cached[0] < LISTING_SNAPSHOT_SECONDS:
+        return cached[1], cached[2]
+    
+    items = load()
+    digest = hashlib.sha1(json.dumps(items, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    with _snapshots_lock:
+        _snapshots[kind] = (time.monotonic(), digest, items)
+    return digest, items
+
+def _invalidate_listings():
+    """Descarta as listagens guardadas (depois de gravar ou deletar arquivos)"""
+    with _snapshots_lock:
+        _snapshots.pop('gdrive', None)
+        _snapshots.pop('azure', None)
+
+def _listing_response(key, version, items):
+    """
+    Resposta de uma listagem, paginada com ?offset=&limit=
+    
+    Sem 'limit' retorna todos os itens (compatível com clientes antigos).
+    Se o cliente envia ?version= igual à atual, os itens são omitidos e
+    a resposta traz 'unchanged': true.
+    """
+    total = len(items)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = request.args.get('limit', type=int)
+    
+    response = {
+        'status': 'success',
+        'count': total,
+        'version': version,
+        'offset': offset
+    }
+    if request.args.get('version') == version:
+        response['unchanged'] = True
+        return jsonify(response)
+    
+    if limit is None:
+        page = items[offset:]
+    else:
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        page = items[offset:offset + limit]
+        response['limit'] = limit
+    response[key] = page
+    return jsonify(response)
+
+@api.route('/api/google-drive/files', methods=['GET'])
 def get_google_drive_files():
-    """Lista arquivos do Google Drive"""
+    """Lista arquivos do Google Drive (aceita ?offset=&limit=&refresh=1&version=)"""
     try:
-        files = gdrive_manager.list_files_in_folder()
-        
-        # Filtrar apenas arquivos (não pastas)
-        files = [f for f in files if f.get('mimetype', '').lower() != 'application/vnd.google-apps.folder']
-        
-        # Formatar resposta
-        formatted_files = []
-        for file in files:
-            formatted_files.append({
-                'id': file['id'],
-                'name': file['name'],
-                'size_mb': round(int(file.get('size', 0)) / (1024 * 1024), 2),
-                'mime_type': file.get('mimeType', 'unknown'),
-                'created': file.get('createdTime', 'N/A'),
-                'modified': file.get('modifiedTime', 'N/A')
-            })
-        
-        return jsonify({
-            'status': 'success',
-            'count': len(formatted_files),
-            'files': formatted_files
-        })
+        version, files = _snapshot('gdrive', _load_drive_files)
+        return _listing_response('files', version, files)
     
     except Exception as e:
         return jsonify({
@@ -77,26 +208,12 @@ def get_google_drive_files():
             'message': str(e)
         }), 500
 
-@app.route('/api/azure/blobs', methods=['GET'])
+@api.route('/api/azure/blobs', methods=['GET'])
 def get_azure_blobs():
-    """Lista blobs do Azure Blob Storage"""
+    """Lista blobs do Azure Blob Storage (aceita ?offset=&limit=&refresh=1&version=)"""
     try:
-        blobs = azure_manager.list_blobs()
-        
-        # Formatar resposta
-        formatted_blobs = []
-        for blob in blobs:
-            formatted_blobs.append({
-                'name': blob.name,
-                'size_mb': round(blob.size / (1024 * 1024), 2),
-                'last_modified': blob.last_modified.isoformat() if blob.last_modified else 'N/A'
-            })
-        
-        return jsonify({
-            'status': 'success',
-            'count': len(formatted_blobs),
-            'blobs': formatted_blobs
-        })
+        version, blobs = _snapshot('azure', _load_azure_blobs)
+        return _listing_response('blobs', version, blobs)
     
     except Exception as e:
         return jsonify({
@@ -104,71 +221,93 @@ def get_azure_blobs():
             'message': str(e)
         }), 500
 
-@app.route('/api/transfer', methods=['POST'])
+def _resolve_files(requested):
+    """
+    Arquivos da origem para os ids pedidos pelo cliente
+    
+    Só o id vale: nome, tamanho e MD5 vêm da listagem guardada (refeita
+    uma vez se algum id não está nela), então um tamanho velho não trunca
+    o blob e o cliente não escolhe o nome gravado no destino. 'name',
+    'size' e 'md5' enviados pelo cliente (o que ele viu na listagem) são
+    conferidos com ela.
+    
+    Args:
+        requested (list): Dicionários com 'id' e, opcionalmente, 'name',
+                          'size' e 'md5'
+    
+    Returns:
+        list: Arquivos ('id', 'name', 'size', 'md5Checksum')
+    
+    Raises:
+        LookupError: Um id não existe na origem
+        ValueError: Valores do cliente diferentes da listagem atual
+    """
+    _, items = _snapshot('gdrive', _load_drive_files)
+    by_id = {item['id']: item for item in items}
+    if any(entry['id'] not in by_id for entry in requested):
+        _, items = _snapshot('gdrive', _load_drive_files, refresh=True)
+        by_id = {item['id']: item for item in items}
+    
+    files = []
+    for entry in requested:
+        item = by_id.get(entry['id'])
+        if item is None:
+            raise LookupError(f"Arquivo não encontrado na origem: {entry['id']}")
+        for key in ('name', 'size', 'md5'):
+            if entry.get(key) is not None and str(entry[key]) != str(item[key]):
+                raise ValueError(f"'{key}' de {item['name']} difere da listagem atual; atualize a lista")
+        files.append({'id': item['id'], 'name': item['name'], 'size': item['size'],
+                      'md5Checksum': item['md5']})
+    return files
+
+def _files_from_request(data):
+    """Arquivos a transferir a partir de 'files' (com 'id') ou 'file_ids' (ver _resolve_files)"""
+    requested = [f for f in data.get('files', []) if f.get('id')]
+    requested += [{'id': file_id} for file_id in data.get('file_ids', []) if file_id]
+    return _resolve_files(requested) if requested else []
+
+def _invalid_files(error):
+    return jsonify({
+        'status': 'error',
+        'message': str(error)
+    }), 400
+
+def _invalid_priority():
+    return jsonify({
+        'status': 'error',
+        'message': "priority deve ser 'low', 'normal', 'high' ou um inteiro"
+    }), 400
+
+@api.route('/api/transfer', methods=['POST'])
 def transfer_files():
-    """Transfere arquivos selecionados"""
+    """Transfere arquivos selecionados (espera o job terminar)"""
     try:
         data = request.json
-        file_ids = data.get('file_ids', [])
         
-        if not file_ids:
+        if not data.get('file_ids') and not data.get('files'):
             return jsonify({
                 'status': 'error',
                 'message': 'Nenhum arquivo selecionado'
             }), 400
         
-        # Obter arquivos do Google Drive
-        all_files = gdrive_manager.list_files_in_folder()
-        all_files = [f for f in all_files if f.get('mimetype', '').lower() != 'application/vnd.google-apps.folder']
-        
-        # Filtrar apenas os selecionados
-        files_to_transfer = [f for f in all_files if f['id'] in file_ids]
+        try:
+            files_to_transfer = _files_from_request(data)
+        except (LookupError, ValueError) as e:
+            return _invalid_files(e)
         
-        results = {
-            'success': [],
-            'failed': [],
-            'total': len(files_to_transfer)
-        }
-        
-        # Transferir cada arquivo
-        for file in files_to_transfer:
-            file_id = file['id']
-            file_name = file['name']
-            
-            try:
-                # Baixar do Google Drive
-                file_content = gdrive_manager.download_file(file_id, file_name)
-                
-                if file_content is None:
-                    results['failed'].append({
-                        'name': file_name,
-                        'error': 'Falha ao baixar do Google Drive'
-                    })
-                    continue
-                
-                # Enviar para Azure
-                upload_result = azure_manager.upload_blob(file_name, file_content, overwrite=True)
-                
-                if upload_result['status'] == 'success':
-                    results['success'].append({
-                        'name': file_name,
-                        'size_mb': upload_result['size_mb']
-                    })
-                else:
-                    results['failed'].append({
-                        'name': file_name,
-                        'error': upload_result.get('error', 'Erro desconhecido')
-                    })
-            
-            except Exception as e:
-                results['failed'].append({
-                    'name': file_name,
-                    'error': str(e)
-                })
+        # Transferir em paralelo, dividindo os workers com os demais jobs
+        jobs = get_job_manager()
+        try:
+            job = jobs.submit(files_to_transfer, priority=data.get('priority', 'normal'))
+        except ValueError:
+            return _invalid_priority()
+        jobs.wait(job)
+        get_tracer().export()
         
         return jsonify({
-            'status': 'success' if results['success'] else 'partial',
-            'results': results
+            'status': 'success' if job.results['success'] else 'partial',
+            'job_id': job.id,
+            'results': job.results
         })
     
     except Exception as e:
@@ -177,35 +316,54 @@ def transfer_files():
             'message': str(e)
         }), 500
 
-@app.route('/api/transfer-single', methods=['POST'])
+@api.route('/api/transfer-single', methods=['POST'])
 def transfer_single_file():
-    """Transfere um arquivo individual"""
+    """Transfere um arquivo individual (prioridade alta: passa na frente dos lotes)"""
     try:
         data = request.json
         file_id = data.get('file_id')
-        file_name = data.get('file_name')
         
-        if not file_id or not file_name:
+        if not file_id:
             return jsonify({
                 'status': 'error',
-                'message': 'file_id e file_name são obrigatórios'
+                'message': 'file_id é obrigatório'
             }), 400
         
-        # Baixar do Google Drive
-        file_content = gdrive_manager.download_file(file_id, file_name)
+        try:
+            [file] = _resolve_files([{'id': file_id, 'name': data.get('file_name'),
+                                      'size': data.get('size'), 'md5': data.get('md5')}])
+        except (LookupError, ValueError) as e:
+            return _invalid_files(e)
+        file_name = file['name']
+        
+        jobs = get_job_manager()
+        try:
+            job = jobs.submit([file], priority=data.get('priority', 'high'), name=file_name)
+        except ValueError:
+            return _invalid_priority()
+        jobs.wait(job)
+        get_tracer().export()
         
-        if file_content is None:
+        result = job.scheduled.results[0]
+        if result is None and job.status == 'error':
+            # O job falhou antes de o arquivo rodar
             return jsonify({
                 'status': 'error',
-                'message': 'Falha ao baixar do Google Drive'
+                'job_id': job.id,
+                'message': job.results.get('error', 'Erro desconhecido')
+            }), 500
+        if result is None:
+            result = {'name': file_name, 'status': 'cancelled', 'error': 'Transferência cancelada'}
+        if result.get('stage') == 'download' and result['status'] == 'error':
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
             }), 500
-        
-        # Enviar para Azure
-        upload_result = azure_manager.upload_blob(file_name, file_content, overwrite=True)
         
         return jsonify({
-            'status': 'success' if upload_result['status'] == 'success' else 'error',
-            'result': upload_result
+            'status': result['status'],
+            'job_id': job.id,
+            'result': result
         })
     
     except Exception as e:
@@ -214,7 +372,197 @@ def transfer_single_file():
             'message': str(e)
         }), 500
 
-@app.route('/api/delete-blob', methods=['POST'])
+@api.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Cria um job de transferência e retorna sem esperar (acompanhe em /api/jobs/<id>)"""
+    try:
+        data = request.json or {}
+        try:
+            files = _files_from_request(data)
+        except (LookupError, ValueError) as e:
+            return _invalid_files(e)
+        
+        if not files:
+            return jsonify({
+                'status': 'error',
+                'message': 'Nenhum arquivo selecionado'
+            }), 400
+        
+        try:
+            max_mb_s = _parse_mb_s(data['max_mb_s']) if data.get('max_mb_s') is not None else None
+        except ValueError:
+            return _invalid_mb_s()
+        
+        try:
+            job = get_job_manager().submit(files, priority=data.get('priority', 'normal'),
+                                           name=data.get('name'), max_mb_s=max_mb_s)
+        except ValueError:
+            return _invalid_priority()
+        
+        return jsonify({
+            'status': 'success',
+            'job': job.to_dict()
+        }), 202
+    
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Lista os jobs do processo (em andamento e os últimos terminados)"""
+    return jsonify({
+        'status': 'success',
+        'jobs': [job.to_dict() for job in get_job_manager().list()]
+    })
+
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Situação de um job, com os resultados por arquivo (exceto com ?results=0)"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job não encontrado'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'job': job.to_dict(include_results=request.args.get('results') != '0')
+    })
+
+@api.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancela um job: pendentes são descartados e os em andamento param no próximo bloco"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job não encontrado'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'job': job.to_dict()
+    })
+
+def _parse_mb_s(value):
+    """Limite de banda em MB/s (0 = sem limite); ValueError se inválido"""
+    mb_s = float(value)
+    if not 0 <= mb_s < float('inf'):
+        raise ValueError(value)
+    return mb_s
+
+def _invalid_mb_s():
+    return jsonify({
+        'status': 'error',
+        'message': 'mb_s deve ser um número >= 0 (0 = sem limite)'
+    }), 400
+
+@api.route('/api/jobs/<job_id>/bandwidth', methods=['POST'])
+def set_job_bandwidth(job_id):
+    """Troca o limite de banda de um job ({"mb_s": x}); vale a partir do próximo bloco"""
+    try:
+        mb_s = _parse_mb_s((request.json or {}).get('mb_s'))
+    except (TypeError, ValueError):
+        return _invalid_mb_s()
+    job = get_job_manager().set_limit(job_id, mb_s)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job não encontrado'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'job': job.to_dict()
+    })
+
+@api.route('/api/bandwidth', methods=['GET', 'POST'])
+def bandwidth_limit():
+    """
+    Limite global de banda do processo (download + upload, em MB/s)
+
+    POST {"mb_s": x} troca o limite sem reiniciar as transferências em
+    andamento. Com vários processos (WEB_WORKERS > 1) cada um tem uma parte
+    de BANDWIDTH_LIMIT_MB_S e a troca é recusada (409): ela valeria só para
+    o processo que recebeu a requisição.
+    """
+    bucket = global_bucket()
+    if request.method == 'POST':
+        if global_processes() > 1:
+            return jsonify({
+                'status': 'error',
+                'message': f'O limite global é dividido entre {global_processes()} processos; '
+                           'troque BANDWIDTH_LIMIT_MB_S e reinicie o servidor'
+            }), 409
+        try:
+            mb_s = _parse_mb_s((request.json or {}).get('mb_s'))
+        except (TypeError, ValueError):
+            return _invalid_mb_s()
+        bucket.set_rate(mb_s_to_bytes(mb_s))
+        logger.info(f"🚦 Limite global de banda: {mb_s or 'sem limite'} MB/s")
+    return jsonify({
+        'status': 'success',
+        'mb_s': bucket.mb_s,
+        'processes': global_processes(),
+        'pid': os.getpid()
+    })
+
+@api.route('/api/stats', methods=['GET'])
+def transfer_stats():
+    """
+    Estatísticas do histórico de transferências
+
+    Parâmetros: windows (ex.: '1h,24h,7d'), bucket (intervalo dos rollups,
+    ex.: '5m') e range (período dos rollups; padrão: a maior janela)
+    """
+    try:
+        store = get_history_store()
+        if store is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Histórico desabilitado (HISTORY_DB vazio)'
+            }), 404
+
+        try:
+            windows = [w.strip() for w in request.args.get('windows', DEFAULT_STATS_WINDOWS).split(',')
+                       if w.strip()]
+            window_s = {w: parse_duration(w) for w in windows}
+            span = parse_duration(request.args.get('range')) if request.args.get('range') \
+                else max(window_s.values(), default=86400)
+            bucket = parse_duration(request.args.get('bucket', '5m'))
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Durações inválidas (use por exemplo 90s, 15m, 24h ou 7d)'
+            }), 400
+        if bucket <= 0 or span <= 0 or any(s <= 0 for s in window_s.values()):
+            return jsonify({
+                'status': 'error',
+                'message': 'Durações devem ser positivas'
+            }), 400
+
+        # Intervalo maior quando a série teria pontos demais
+        bucket = max(bucket, span / MAX_ROLLUP_POINTS)
+        now = time.time()
+        return jsonify({
+            'status': 'success',
+            'generated_at': now,
+            'windows': {w: store.stats(s, now=now) for w, s in window_s.items()},
+            'rollups': {
+                'range_s': span,
+                'bucket_s': bucket,
+                'points': store.rollups(span, bucket, now=now)
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/api/delete-blob', methods=['POST'])
 def delete_blob():
     """Deleta um blob do Azure"""
     try:
@@ -227,7 +575,9 @@ def delete_blob():
                 'message': 'blob_name é obrigatório'
             }), 400
         
-        result = azure_manager.delete_blob(blob_name)
+        _, destination = get_managers()
+        result = destination.delete_file(blob_name)
+        _invalidate_listings()
         
         return jsonify({
             'status': 'success' if result else 'error',
@@ -240,22 +590,23 @@ def delete_blob():
             'message': str(e)
         }), 500
 
+app = create_app()
+
 if __name__ == '__main__':
-    # Validar configurações
-    if not validate_config():
-        print("❌ Configurações inválidas")
+    # Validar configurações (só o Drive e o Azure precisam de credenciais)
+    if uses_cloud(TRANSFER_SOURCE, TRANSFER_SINK) and not validate_config():
+        logger.error("❌ Configurações inválidas")
         sys.exit(1)
     
     # Inicializar gerenciadores
     if not initialize_managers():
-        print("❌ Erro ao inicializar gerenciadores")
+        logger.error("❌ Erro ao inicializar gerenciadores")
         sys.exit(1)
     
-    print("\n" + "="*70)
-    print("  API Flask iniciada com sucesso!")
-    print("="*70)
-    print("\n🌐 Acesse a aplicação em: http://localhost:5000")
-    print("📡 Documentação da API disponível em: http://localhost:5000/api/docs\n")
+    logger.info("✅ API Flask iniciada com sucesso!")
+    logger.info("🌐 Acesse a aplicação em: http://localhost:%d", WEB_PORT)
+    logger.info("📡 Documentação da API disponível em: http://localhost:%d/api/docs", WEB_PORT)
+    logger.info("ℹ️  Servidor de desenvolvimento; em produção use: python wsgi.py ou gunicorn -c gunicorn.conf.py wsgi:app")
     
     # Iniciar servidor
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=FLASK_DEBUG, host=WEB_HOST, port=WEB_PORT, threaded=True)
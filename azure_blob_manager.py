@@ -1,21 +1,189 @@
 """
 Módulo para operações com Azure Blob Storage
 """
-from azure.storage.blob import BlobServiceClient, BlobClient
+import io
+import logging
+import mmap
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from azure.storage.blob import BlobServiceClient, BlobClient, ContentSettings
 from datetime import datetime
-from config import AZURE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from config import (
+    AZURE_CONNECTION_STRING, AZURE_CONTAINER_NAME, FANOUT_QUEUE_CHUNKS, AZURE_READ_CHUNK_SIZE
+)
+from bandwidth import default_limiter
+from logger import get_logger
+from singleflight import SingleFlight
+from staging import is_buffer, iter_buffer
+from storage import StorageBackend
+from tracing import get_tracer
 
-class AzureBlobManager:
-    def __init__(self, container_name=None):
+logger = get_logger('azure_blob')
+
+# Limite de sub-requisições por requisição em lote (Blob Batch)
+BLOB_BATCH_SIZE = 256
+
+def _api_call_counter(metrics):
+    """Cria um hook que conta cada resposta HTTP em metrics['api_calls']"""
+    if metrics is None:
+        return None
+    
+    metrics.setdefault('api_calls', 0)
+    lock = threading.Lock()
+    
+    def hook(response):
+        # Uploads em blocos paralelos chamam o hook de várias threads
+        with lock:
+            metrics['api_calls'] += 1
+    
+    return hook
+
+def _upload_progress_hook(progress, limiter):
+    """Hook de progresso do SDK: atualiza o FileProgress e aplica o limite de banda"""
+    lock = threading.Lock()
+    sent = [0]
+    
+    def hook(current, total):
+        if progress is not None:
+            progress.upload(current, total)
+        # Com blocos paralelos o hook é chamado de várias threads
+        with lock:
+            delta = current - sent[0]
+            sent[0] = max(sent[0], current)
+        # Esperar aqui atrasa o próximo bloco desta thread de upload
+        limiter.consume(delta)
+    
+    return hook
+
+class _ChunkTee:
+    """Copia um fluxo de blocos para vários consumidores (um por destino)"""
+    
+    def __init__(self, count, max_chunks):
+        self.queues = [queue.Queue(maxsize=max_chunks) for _ in range(count)]
+        self.closed = [threading.Event() for _ in range(count)]
+    
+    def reader(self, index):
+        """Gerador com os blocos recebidos pelo consumidor 'index'"""
+        def generate():
+            while True:
+                chunk = self.queues[index].get()
+                if chunk is None:
+                    return
+                if isinstance(chunk, Exception):
+                    # A origem falhou: interrompe o upload sem gravar o blob
+                    raise chunk
+                yield chunk
+        return generate()
+    
+    def close(self, index):
+        """Marca um consumidor como encerrado (não recebe mais blocos)"""
+        self.closed[index].set()
+    
+    def _put(self, index, item):
+        # Não bloqueia para sempre se o consumidor já terminou (ex.: falhou)
+        while not self.closed[index].is_set():
+            try:
+                self.queues[index].put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def feed(self, chunks):
+        """Lê o fluxo de origem uma única vez e entrega cada bloco a todos"""
+        end = None
+        try:
+            for chunk in chunks:
+                for index in range(len(self.queues)):
+                    self._put(index, chunk)
+        except Exception as e:
+            end = e
+            raise
+        finally:
+            for index in range(len(self.queues)):
+                self._put(index, end)
+
+class BlobRangeReader(io.RawIOBase):
+    """
+    Arquivo somente leitura e posicionável sobre um blob
+    
+    Lê o blob em intervalos (ranged GET) de 'chunk_size' bytes e mantém
+    apenas o intervalo atual em memória, independente do tamanho do blob.
+    """
+    
+    def __init__(self, blob_client, size, chunk_size=None, limiter=None):
+        self.blob_client = blob_client
+        self.size = size
+        self.chunk_size = chunk_size or AZURE_READ_CHUNK_SIZE
+        self.limiter = limiter or default_limiter()
+        self._pos = 0
+        self._buffer = b''
+        self._buffer_start = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        self._pos = max(0, min(self._pos, self.size))
+        return self._pos
+    
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = self.size - self._pos
+        n = min(n, self.size - self._pos)
+        if n <= 0:
+            return b''
+        
+        offset = self._pos - self._buffer_start
+        if not (0 <= offset < len(self._buffer)):
+            # Fora do intervalo em memória: busca o próximo intervalo
+            length = min(max(n, self.chunk_size), self.size - self._pos)
+            self._buffer = self.blob_client.download_blob(
+                offset=self._pos, length=length
+            ).readall()
+            self.limiter.consume(len(self._buffer))
+            self._buffer_start = self._pos
+            offset = 0
+        
+        data = self._buffer[offset:offset + n]
+        self._pos += len(data)
+        return data
+    
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+class AzureBlobManager(StorageBackend):
+    kind = 'azure'
+    
+    def __init__(self, container_name=None, connection_string=None):
         """
         Inicializa conexão com Azure Blob Storage
         
         Args:
             container_name (str): Nome do contêiner
+            connection_string (str): Cadeia de conexão de outra conta
+                                     (padrão: AZURE_CONNECTION_STRING)
         """
         self.container_name = container_name or AZURE_CONTAINER_NAME
-        self.connection_string = AZURE_CONNECTION_STRING
+        self.connection_string = connection_string or AZURE_CONNECTION_STRING
         self.blob_service_client = None
+        self.container_client = None
+        self._flight = SingleFlight()
         self.authenticate()
     
     def authenticate(self):
@@ -24,20 +192,26 @@ class AzureBlobManager:
             self.blob_service_client = BlobServiceClient.from_connection_string(
                 self.connection_string
             )
-            print("✅ Autenticação Azure Blob Storage bem-sucedida!")
-            
+            # Cliente do contêiner padrão reaproveitado por todos os uploads
+            self.container_client = self.blob_service_client.get_container_client(
+                self.container_name
+            )
             # Testa conexão listando contêineres
             containers = list(self.blob_service_client.list_containers())
-            print(f"   Total de contêineres: {len(containers)}")
+            logger.info("✅ Autenticação Azure Blob Storage bem-sucedida!",
+                        extra={'containers': len(containers)})
             
         except Exception as e:
-            print(f"❌ Erro ao autenticar com Azure Blob Storage: {e}")
+            logger.error("❌ Erro ao autenticar com Azure Blob Storage: %s", e)
             raise
     
     def list_blobs(self, container_name=None):
         """
         Lista todos os blobs (arquivos) em um contêiner
         
+        Chamadas simultâneas para o mesmo contêiner compartilham uma única
+        listagem no Azure (single-flight).
+        
         Args:
             container_name (str): Nome do contêiner
                                 Se None, usa o padrão configurado
@@ -48,6 +222,10 @@ class AzureBlobManager:
         if container_name is None:
             container_name = self.container_name
         
+        return list(self._flight.do(('list_blobs', container_name),
+                                    self._list_blobs, container_name))
+    
+    def _list_blobs(self, container_name):
         try:
             container_client = self.blob_service_client.get_container_client(
                 container_name
@@ -55,73 +233,265 @@ class AzureBlobManager:
             
             blobs = list(container_client.list_blobs())
             
-            print(f"\n☁️  Listando blobs do Azure Blob Storage...")
-            print(f"   Contêiner: {container_name}\n")
-            
-            if not blobs:
-                print("   Nenhum blob encontrado no contêiner!")
-            else:
-                print(f"   📊 Total de blobs: {len(blobs)}\n")
+            logger.info("☁️  %d blob(s) no contêiner", len(blobs),
+                        extra={'container': container_name})
+            # Uma linha por blob só em DEBUG (e sem custo nos demais níveis)
+            if logger.isEnabledFor(logging.DEBUG):
                 for idx, blob in enumerate(blobs, 1):
-                    size_mb = round(blob.size / (1024 * 1024), 2)
-                    print(f"   {idx}. {blob.name}")
-                    print(f"      Tamanho: {size_mb} MB")
-                    print(f"      Última modificação: {blob.last_modified}\n")
+                    logger.debug("   %d. %s", idx, blob.name, extra={
+                        'size': blob.size,
+                        'last_modified': blob.last_modified
+                    })
             
             return blobs
             
         except Exception as e:
-            print(f"❌ Erro ao listar blobs: {e}")
+            logger.error("❌ Erro ao listar blobs: %s", e, extra={'container': container_name})
             return []
     
-    def upload_blob(self, file_name, file_content, overwrite=False):
+    def iter_blobs(self, name_starts_with=None):
+        """
+        Percorre os blobs do contêiner página por página, sem imprimir
+        
+        Args:
+            name_starts_with (str): Só blobs com este prefixo
+        
+        Yields:
+            BlobProperties: Propriedades de cada blob
+        """
+        return iter(self.container_client.list_blobs(
+            name_starts_with=name_starts_with,
+            results_per_page=5000
+        ))
+    
+    def prepare(self):
+        """Cria o contêiner se ainda não existe (StorageBackend)"""
+        self.create_container_if_not_exists()
+    
+    def list_files(self):
+        """Blobs do contêiner no formato de arquivo do agendador (StorageBackend)"""
+        files = []
+        for blob in self.list_blobs():
+            content_md5 = blob.content_settings.content_md5
+            files.append({
+                'id': blob.name,
+                'name': blob.name,
+                'size': blob.size,
+                'mimeType': blob.content_settings.content_type,
+                'md5Checksum': bytes(content_md5).hex() if content_md5 else None,
+                'modifiedTime': blob.last_modified.isoformat() if blob.last_modified else None
+            })
+        return files
+    
+    def read_file(self, file, metrics=None, cancel=None, progress=None, limiter=None):
+        """
+        Lê um blob em intervalos de AZURE_READ_CHUNK_MB (StorageBackend)
+        
+        Returns:
+            iterable: Blocos do blob; só um intervalo fica em memória
+        """
+        if file.get('size'):
+            blob_client = self.container_client.get_blob_client(file['name'])
+            reader = BlobRangeReader(blob_client, int(file['size']), limiter=limiter)
+        else:
+            reader, _ = self.open_blob_reader(file['name'], limiter=limiter)
+        
+        def generate():
+            # Sem span: o gerador é consumido dentro do span do upload
+            started = time.perf_counter()
+            calls = 0
+            while True:
+                if cancel is not None:
+                    cancel.check()
+                chunk = reader.read(reader.chunk_size)
+                if not chunk:
+                    break
+                calls += 1
+                if progress is not None:
+                    progress.add_download(len(chunk))
+                yield chunk
+            if metrics is not None:
+                metrics['download_s'] = time.perf_counter() - started
+                metrics['api_calls'] = metrics.get('api_calls', 0) + calls
+        
+        return generate()
+    
+    def write_file(self, name, content, overwrite=True, **options):
+        """Grava um blob (StorageBackend); as opções são as de upload_blob"""
+        return self.upload_blob(name, content, overwrite=overwrite, **options)
+    
+    def delete_file(self, name):
+        """Deleta um blob (StorageBackend)"""
+        return self.delete_blob(name)
+    
+    def upload_blob(self, file_name, file_content, overwrite=False, metrics=None,
+                    max_concurrency=1, length=None, content_md5=None,
+                    validate_content=False, progress=None, limiter=None):
         """
         Faz upload de um arquivo para o Azure Blob Storage
         
+        Usa apenas as requisições do próprio upload: tamanho e data de
+        modificação vêm da resposta do upload, sem consultar as propriedades.
+        
         Args:
             file_name (str): Nome do blob (arquivo)
-            file_content (bytes): Conteúdo do arquivo em bytes
+            file_content (bytes): Conteúdo do arquivo em bytes, um mmap
+                                  (StagingBuffer; lido como arquivo, sem
+                                  cópia) ou um iterável de blocos de bytes
             overwrite (bool): Se True, sobrescreve se já existir
+            metrics (dict): Se informado, recebe 'upload_s' e soma em
+                            'api_calls' as requisições HTTP feitas
+            max_concurrency (int): Blocos enviados em paralelo (arquivos grandes)
+            length (int): Tamanho total em bytes; obrigatório para iteráveis
+            content_md5 (bytearray): MD5 do conteúdo, gravado no blob
+            validate_content (bool): Se True, envia o MD5 de cada bloco para
+                                     o Azure validar (MD5 transacional)
+            progress (FileProgress): Recebe os bytes enviados (hook de
+                                     progresso do SDK, a cada bloco)
+            limiter (Limiter): Limite de banda (padrão: só o global)
         
         Returns:
             dict: Informações do blob enviado ou None se falhar
         """
         try:
-            container_client = self.blob_service_client.get_container_client(
-                self.container_name
-            )
+            blob_client = self.container_client.get_blob_client(file_name)
             
             # Fazer upload
-            blob_client = container_client.get_blob_client(file_name)
-            blob_client.upload_blob(file_content, overwrite=overwrite)
+            with get_tracer().span('azure.upload', blob=file_name, container=self.container_name) as span:
+                response = blob_client.upload_blob(
+                    file_content,
+                    overwrite=overwrite,
+                    length=length,
+                    max_concurrency=max_concurrency,
+                    validate_content=validate_content,
+                    content_settings=ContentSettings(content_md5=content_md5) if content_md5 else None,
+                    raw_response_hook=_api_call_counter(metrics),
+                    progress_hook=_upload_progress_hook(progress, limiter or default_limiter())
+                )
             
-            # Obter informações do blob
-            properties = blob_client.get_blob_properties()
+            if metrics is not None:
+                metrics['upload_s'] = span.duration
             
+            size = length if length is not None else len(file_content)
             result = {
                 'name': file_name,
-                'size': properties.size,
-                'size_mb': round(properties.size / (1024 * 1024), 2),
-                'last_modified': properties.last_modified,
+                'size': size,
+                'size_mb': round(size / (1024 * 1024), 2),
+                'last_modified': response.get('last_modified'),
+                'etag': response.get('etag'),
                 'status': 'success'
             }
             
             return result
             
         except Exception as e:
-            print(f"❌ Erro ao fazer upload do blob {file_name}: {e}")
+            logger.error("❌ Erro ao fazer upload do blob %s: %s", file_name, e,
+                         extra={'container': self.container_name})
             return {
                 'name': file_name,
                 'status': 'error',
                 'error': str(e)
             }
     
-    def download_blob(self, file_name):
+    def upload_blob_fanout(self, file_name, file_content, targets, overwrite=False,
+                           metrics=None, length=None, progress=None, **kwargs):
+        """
+        Envia o mesmo conteúdo para este contêiner e para outros destinos
+        
+        O conteúdo é lido uma única vez: bytes são compartilhados entre os
+        uploads e iteráveis são copiados em memória, bloco a bloco, para
+        cada destino. Os uploads acontecem ao mesmo tempo.
+        
+        Args:
+            file_name (str): Nome do blob em todos os destinos
+            file_content: bytes, mmap ou iterável de blocos de bytes
+            targets (list): Outros AzureBlobManager (contêineres ou contas)
+            overwrite (bool): Se True, sobrescreve se já existir
+            metrics (dict): Recebe 'upload_s' (o destino mais lento) e soma
+                            em 'api_calls' as requisições de todos os destinos
+            length (int): Tamanho total em bytes; obrigatório para iteráveis
+            progress (FileProgress): Recebe os bytes enviados ao primeiro destino
+            **kwargs: Demais opções de upload_blob
+        
+        Returns:
+            dict: Como upload_blob, com 'targets' contendo o resultado de
+                  cada destino; 'status' é 'success' só se todos deram certo
+        """
+        managers = [self] + list(targets)
+        target_metrics = [{} for _ in managers]
+        if isinstance(file_content, mmap.mmap):
+            # Um mmap tem uma única posição de leitura: os destinos recebem blocos
+            file_content = iter_buffer(file_content, AZURE_READ_CHUNK_SIZE)
+        streaming = not is_buffer(file_content)
+        tee = _ChunkTee(len(managers), FANOUT_QUEUE_CHUNKS) if streaming else None
+        
+        def upload(index):
+            content = tee.reader(index) if streaming else file_content
+            try:
+                result = managers[index].upload_blob(
+                    file_name, content, overwrite=overwrite,
+                    metrics=target_metrics[index], length=length,
+                    progress=progress if index == 0 else None, **kwargs
+                )
+            finally:
+                if streaming:
+                    tee.close(index)
+            result['container'] = managers[index].container_name
+            return result
+        
+        feed_error = None
+        with ThreadPoolExecutor(max_workers=len(managers)) as executor:
+            futures = [executor.submit(upload, index) for index in range(len(managers))]
+            if streaming:
+                try:
+                    tee.feed(file_content)
+                except Exception as e:
+                    feed_error = e
+            results = [future.result() for future in futures]
+        
+        if metrics is not None:
+            metrics['upload_s'] = max(m.get('upload_s', 0) for m in target_metrics)
+            metrics['api_calls'] = metrics.get('api_calls', 0) + \
+                sum(m.get('api_calls', 0) for m in target_metrics)
+        
+        failed = [r for r in results if r['status'] != 'success']
+        if feed_error is not None or failed:
+            errors = [f"{r['container']}: {r.get('error')}" for r in failed]
+            if feed_error is not None:
+                errors.insert(0, f"origem: {feed_error}")
+            return {
+                'name': file_name,
+                'status': 'error',
+                'error': '; '.join(errors),
+                'targets': results
+            }
+        
+        return dict(results[0], targets=results)
+    
+    def open_blob_reader(self, file_name, chunk_size=None, limiter=None):
+        """
+        Abre um blob para leitura em intervalos, com memória limitada
+        
+        Args:
+            file_name (str): Nome do blob
+            chunk_size (int): Bytes por leitura (padrão: AZURE_READ_CHUNK_MB)
+            limiter (Limiter): Limite de banda (padrão: só o global)
+        
+        Returns:
+            tuple: (BlobRangeReader, propriedades do blob)
+        """
+        blob_client = self.container_client.get_blob_client(file_name)
+        properties = blob_client.get_blob_properties()
+        return BlobRangeReader(blob_client, properties.size, chunk_size, limiter), properties
+    
+    def download_blob(self, file_name, offset=None, length=None):
         """
         Faz download de um blob do Azure Blob Storage
         
         Args:
             file_name (str): Nome do blob
+            offset (int): Início do intervalo a ler (padrão: o blob inteiro)
+            length (int): Bytes a ler a partir de offset
         
         Returns:
             bytes: Conteúdo do arquivo, ou None se falhar
@@ -132,11 +502,11 @@ class AzureBlobManager:
                 blob=file_name
             )
             
-            download_stream = blob_client.download_blob()
+            download_stream = blob_client.download_blob(offset=offset, length=length)
             return download_stream.readall()
             
         except Exception as e:
-            print(f"❌ Erro ao fazer download do blob {file_name}: {e}")
+            logger.error("❌ Erro ao fazer download do blob %s: %s", file_name, e)
             return None
     
     def delete_blob(self, file_name):
@@ -156,13 +526,48 @@ class AzureBlobManager:
             )
             
             blob_client.delete_blob()
-            print(f"✅ Blob '{file_name}' deletado com sucesso")
+            logger.info("✅ Blob '%s' deletado com sucesso", file_name)
             return True
             
         except Exception as e:
-            print(f"❌ Erro ao deletar blob {file_name}: {e}")
+            logger.error("❌ Erro ao deletar blob %s: %s", file_name, e)
             return False
     
+    def delete_blobs(self, file_names):
+        """
+        Deleta vários blobs usando requisições em lote (até 256 por requisição)
+        
+        Args:
+            file_names (list): Nomes dos blobs
+        
+        Returns:
+            dict: 'deleted' com os nomes removidos e 'failed' com
+                  {'name', 'error'} dos que não puderam ser removidos
+        """
+        deleted = []
+        failed = []
+        file_names = list(file_names)
+        
+        for start in range(0, len(file_names), BLOB_BATCH_SIZE):
+            names = file_names[start:start + BLOB_BATCH_SIZE]
+            try:
+                responses = self.container_client.delete_blobs(
+                    *names, raise_on_any_failure=False
+                )
+                for name, response in zip(names, responses):
+                    # 404: o blob já não existe, que é o estado desejado
+                    if response.status_code < 300 or response.status_code == 404:
+                        deleted.append(name)
+                    else:
+                        failed.append({'name': name, 'error': f"HTTP {response.status_code}"})
+            except Exception as e:
+                failed.extend({'name': name, 'error': str(e)} for name in names)
+        
+        if failed:
+            logger.warning("❌ %d blob(s) não puderam ser deletados", len(failed),
+                           extra={'container': self.container_name})
+        return {'deleted': deleted, 'failed': failed}
+    
     def create_container_if_not_exists(self, container_name=None):
         """
         Cria um contêiner se não existir
@@ -180,13 +585,13 @@ class AzureBlobManager:
             container_client = self.blob_service_client.create_container(
                 name=container_name
             )
-            print(f"✅ Contêiner '{container_name}' criado com sucesso")
+            logger.info("✅ Contêiner '%s' criado com sucesso", container_name)
             return True
             
         except Exception as e:
             if "ContainerAlreadyExists" in str(e):
-                print(f"ℹ️  Contêiner '{container_name}' já existe")
+                logger.debug("ℹ️  Contêiner '%s' já existe", container_name)
                 return True
             else:
-                print(f"❌ Erro ao criar contêiner: {e}")
+                logger.error("❌ Erro ao criar contêiner: %s", e)
                 return False
@@ -0,0 +1,143 @@
+"""
+Limite de banda (MB/s) por token bucket
+
+Há um limite global do processo (BANDWIDTH_LIMIT_MB_S) e, opcionalmente,
+um por job. Os laços de download e upload dos gerenciadores chamam
+Limiter.consume(n) a cada bloco que passa; quando o balde está vazio a
+thread espera o tempo necessário para manter a vazão no limite. Todos os
+fluxos (downloads paralelos, blocos do Azure, jobs diferentes) dividem o
+mesmo balde global.
+
+Os limites podem ser trocados a qualquer momento (set_rate); a mudança
+vale a partir do próximo bloco, sem reiniciar as transferências.
+
+Com vários processos (workers do gunicorn), cada um fica com uma parte
+igual do limite global (share_global_limit), para que a soma não passe do
+configurado.
+"""
+import threading
+import time
+from config import BANDWIDTH_LIMIT_MB_S
+
+_MB = 1024 * 1024
+
+# Rajada máxima acumulada pelo balde, em segundos de vazão
+BURST_SECONDS = 1.0
+
+
+def mb_s_to_bytes(mb_s):
+    """Converte MB/s (None ou 0 = sem limite) em bytes/s"""
+    return int(float(mb_s or 0) * _MB)
+
+
+class TokenBucket:
+    def __init__(self, rate=0):
+        """
+        Args:
+            rate (int): Bytes por segundo (0 = sem limite)
+        """
+        self._lock = threading.Lock()
+        self.rate = max(0, rate)
+        self._tokens = self.rate * BURST_SECONDS
+        self._updated = time.monotonic()
+
+    @property
+    def mb_s(self):
+        return round(self.rate / _MB, 3) if self.rate else 0
+
+    def _refill(self, now):
+        if self.rate:
+            capacity = self.rate * BURST_SECONDS
+            self._tokens = min(capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate):
+        """Troca o limite (bytes/s, 0 = sem limite); vale para os próximos blocos"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(0, rate)
+            if not self.rate:
+                self._tokens = 0
+            else:
+                self._tokens = min(self._tokens, self.rate * BURST_SECONDS)
+
+    def reserve(self, count):
+        """
+        Retira 'count' bytes do balde
+
+        Returns:
+            float: Segundos que o chamador deve esperar (0 se havia saldo)
+        """
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill(time.monotonic())
+            # O saldo pode ficar negativo: quem vem depois espera a dívida
+            self._tokens -= count
+            return max(0.0, -self._tokens / self.rate)
+
+
+_global_bucket = TokenBucket(mb_s_to_bytes(BANDWIDTH_LIMIT_MB_S))
+# Processos que dividem BANDWIDTH_LIMIT_MB_S (ver share_global_limit)
+_processes = 1
+
+
+def global_bucket():
+    """Balde compartilhado por todas as transferências do processo"""
+    return _global_bucket
+
+
+def share_global_limit(processes):
+    """
+    Deixa este processo com 1/processes do limite global configurado
+
+    Chamado em cada worker do gunicorn (ver gunicorn.conf.py): os processos
+    não compartilham o balde, então cada um limita a sua parte.
+    """
+    global _processes
+    _processes = max(1, int(processes))
+    rate = mb_s_to_bytes(BANDWIDTH_LIMIT_MB_S)
+    _global_bucket.set_rate(max(1, rate // _processes) if rate else 0)
+
+
+def global_processes():
+    """Quantos processos dividem o limite global (1 = só este)"""
+    return _processes
+
+
+class Limiter:
+    def __init__(self, *buckets):
+        """
+        Aplica o limite global e os baldes informados (ex.: o do job)
+
+        Args:
+            *buckets (TokenBucket): Baldes adicionais ao global
+        """
+        self.buckets = (_global_bucket,) + tuple(b for b in buckets if b is not None)
+
+    def consume(self, count, cancel=None):
+        """
+        Registra 'count' bytes transferidos e espera se algum limite estourou
+
+        Args:
+            cancel (CancelToken): Interrompe a espera ao cancelar
+        """
+        if count <= 0:
+            return
+        wait = max(bucket.reserve(count) for bucket in self.buckets)
+        if wait > 0:
+            if cancel is not None:
+                cancel.sleep(wait)
+            else:
+                time.sleep(wait)
+
+    def wrap(self, chunks, cancel=None):
+        """Repassa os blocos de um iterável, respeitando o limite"""
+        for chunk in chunks:
+            self.consume(len(chunk), cancel)
+            yield chunk
+
+
+def default_limiter():
+    """Limiter só com o limite global (CLI, sincronização)"""
+    return Limiter()
@@ -0,0 +1,83 @@
+"""
+Benchmark de transferência (benchmark.py)
+
+Transfere os arquivos da origem configurada (TRANSFER_SOURCE) para o
+destino (TRANSFER_SINK) e mostra, por arquivo, os tempos de cada etapa e a
+quantidade de chamadas de API. Sai com código 1 se algum arquivo
+ultrapassar API_CALL_BUDGET_PER_FILE.
+
+Para medir o motor sem rede: TRANSFER_SOURCE=local:/dados TRANSFER_SINK=memory
+
+Uso:
+    python benchmark.py [quantidade_de_arquivos]
+"""
+import sys
+from config import validate_config, API_CALL_BUDGET_PER_FILE, TRANSFER_SOURCE, TRANSFER_SINK
+from storage import open_backend, uses_cloud
+from transfer_engine import api_calls_per_file, throughput_mb_s, transfer_batch
+
+
+def run_benchmark(origin, destination, limit=None, workers=None):
+    """
+    Executa o benchmark
+
+    Args:
+        origin (StorageBackend): Origem (ex.: GoogleDriveManager)
+        destination (StorageBackend): Destino (ex.: AzureBlobManager)
+        limit (int): Quantidade máxima de arquivos (None = todos)
+        workers (int): Transferências simultâneas (None = MAX_WORKERS)
+
+    Returns:
+        dict: Resultados do lote (ver transfer_engine.transfer_batch)
+    """
+    files = origin.list_files()
+    if limit:
+        files = files[:limit]
+
+    return transfer_batch(origin, destination, files, workers=workers,
+                          source='benchmark')
+
+
+def print_benchmark(results):
+    """Exibe os resultados do benchmark"""
+    print("\n" + "="*70)
+    print("  BENCHMARK DE TRANSFERÊNCIA")
+    print("="*70 + "\n")
+
+    print(f"{'Arquivo':<30} {'Chamadas':>8} {'TTFB':>8} {'Down':>8} {'Up':>8} {'Total':>8}")
+    for file in results['success'] + results['failed']:
+        timings = file.get('timings', {})
+        print(f"{file['name'][:30]:<30} {file.get('api_calls', 0):>8} "
+              f"{timings.get('ttfb_s', 0):>8.3f} {timings.get('download_s', 0):>8.3f} "
+              f"{timings.get('upload_s', 0):>8.3f} {timings.get('total_s', 0):>8.3f}")
+
+    print(f"\n📊 Arquivos: {results['total']} ({len(results['failed'])} falhas)")
+    print(f"   Tempo total: {results['elapsed_s']}s")
+    print(f"   Vazão: {throughput_mb_s(results)} MB/s")
+    print(f"   Chamadas de API por arquivo: {api_calls_per_file(results)}")
+    if API_CALL_BUDGET_PER_FILE:
+        print(f"   Orçamento: {API_CALL_BUDGET_PER_FILE}/arquivo "
+              f"({results['over_budget']} acima do orçamento)")
+
+
+def main():
+    """Função principal"""
+    if uses_cloud(TRANSFER_SOURCE, TRANSFER_SINK) and not validate_config():
+        sys.exit(1)
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    origin = open_backend(TRANSFER_SOURCE)
+    destination = open_backend(TRANSFER_SINK)
+    destination.prepare()
+
+    results = run_benchmark(origin, destination, limit)
+    print_benchmark(results)
+
+    if results['over_budget']:
+        print("\n❌ Orçamento de chamadas de API excedido")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
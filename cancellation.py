@@ -0,0 +1,42 @@
+"""
+Cancelamento cooperativo de transferências
+
+Um CancelToken é compartilhado pelas transferências de um job. Os laços
+que movem dados (chunks do download, intervalos paralelos, blocos enviados
+ao Azure) chamam check() entre um bloco e outro, então um job cancelado
+para no próximo bloco e libera o worker, sem esperar o arquivo terminar.
+"""
+import threading
+
+
+class TransferCancelled(Exception):
+    """A transferência foi interrompida por um cancelamento"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Sinaliza o cancelamento (as transferências param no próximo bloco)"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Lança TransferCancelled se o cancelamento foi sinalizado"""
+        if self._event.is_set():
+            raise TransferCancelled('Transferência cancelada')
+
+    def sleep(self, seconds):
+        """Espera como time.sleep, mas acorda (e lança) ao ser cancelado"""
+        self._event.wait(seconds)
+        self.check()
+
+    def wrap(self, chunks):
+        """Repassa os blocos de um iterável, conferindo o cancelamento entre eles"""
+        for chunk in chunks:
+            self.check()
+            yield chunk
@@ -14,6 +14,94 @@ GOOGLE_CREDENTIALS_FILE = 'credentials.json'
 AZURE_CONNECTION_STRING = os.getenv('AZURE_CONNECTION_STRING', '')
 AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME', 'Aluno_ViniciusRibeiro')
 
+# Rastreamento (spans exportados em JSON, um por linha). Vazio = desabilitado
+TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', '')
+
+# Máximo de chamadas de API por arquivo transferido (0 = sem limite)
+API_CALL_BUDGET_PER_FILE = int(os.getenv('API_CALL_BUDGET_PER_FILE', '0'))
+
+# Transferências paralelas
+MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))
+# Orçamento de bytes em memória ao mesmo tempo (0 = sem limite)
+MAX_INFLIGHT_BYTES = int(float(os.getenv('MAX_INFLIGHT_MB', '512')) * 1024 * 1024)
+# Arquivos a partir deste tamanho começam primeiro e sobem com blocos em paralelo
+LARGE_FILE_BYTES = int(float(os.getenv('LARGE_FILE_MB', '256')) * 1024 * 1024)
+UPLOAD_BLOCK_CONCURRENCY = int(os.getenv('UPLOAD_BLOCK_CONCURRENCY', '4'))
+
+# Download do Google Drive em intervalos (HTTP Range) paralelos
+DOWNLOAD_CHUNK_SIZE = int(float(os.getenv('DOWNLOAD_CHUNK_MB', '16')) * 1024 * 1024)
+DOWNLOAD_PARALLELISM = int(os.getenv('DOWNLOAD_PARALLELISM', '4'))
+# Arquivos a partir deste tamanho usam o download em intervalos
+RANGED_DOWNLOAD_MIN_BYTES = int(float(os.getenv('RANGED_DOWNLOAD_MIN_MB', '64')) * 1024 * 1024)
+# Novas tentativas por intervalo antes de desistir do arquivo
+DOWNLOAD_RANGE_RETRIES = int(os.getenv('DOWNLOAD_RANGE_RETRIES', '3'))
+
+# Integridade: MD5 por bloco no upload (transacional) e comparação com o Drive
+VERIFY_INTEGRITY = os.getenv('VERIFY_INTEGRITY', 'true').lower() == 'true'
+
+# Modo distribuído: duração do lease dos blobs de coordenação (15 a 60 s)
+SHARD_LEASE_SECONDS = int(os.getenv('SHARD_LEASE_SECONDS', '60'))
+
+# Fan-out: blocos em memória por destino ao copiar um download para vários contêineres
+FANOUT_QUEUE_CHUNKS = int(os.getenv('FANOUT_QUEUE_CHUNKS', '4'))
+
+# Sentido inverso (Azure → Google Drive)
+# Leitura do blob em intervalos; cada intervalo é o único buffer em memória
+AZURE_READ_CHUNK_SIZE = int(float(os.getenv('AZURE_READ_CHUNK_MB', '8')) * 1024 * 1024)
+# Chunk do upload resumable do Drive (múltiplo de 256 KB)
+DRIVE_UPLOAD_CHUNK_SIZE = int(float(os.getenv('DRIVE_UPLOAD_CHUNK_MB', '8')) * 1024 * 1024)
+DRIVE_UPLOAD_RETRIES = int(os.getenv('DRIVE_UPLOAD_RETRIES', '5'))
+# Onde ficam as sessões resumable para retomar após uma interrupção
+RESUME_STATE_DIR = os.getenv('RESUME_STATE_DIR', '.transfer_state')
+
+# Cache em disco dos downloads do Drive (vazio = desabilitado)
+SPOOL_DIR = os.getenv('SPOOL_DIR', '')
+SPOOL_MAX_BYTES = int(float(os.getenv('SPOOL_MAX_MB', '4096')) * 1024 * 1024)
+
+# Arquivos que precisam chegar inteiros: em memória até STAGING_MEMORY_MB,
+# acima disso em um arquivo temporário lido por mmap (vazio = pasta do sistema)
+STAGING_MEMORY_BYTES = int(float(os.getenv('STAGING_MEMORY_MB', '64')) * 1024 * 1024)
+STAGING_DIR = os.getenv('STAGING_DIR', '')
+
+# Servidor web
+WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
+WEB_PORT = int(os.getenv('WEB_PORT', '5000'))
+# Processos e threads por processo do servidor WSGI (gunicorn/waitress).
+# Os jobs da API ficam na memória do processo que os criou: com mais de um
+# processo, consultar ou cancelar um job pode cair em outro processo (404)
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+# Por quanto tempo uma listagem serve as páginas seguintes antes de ser refeita
+LISTING_SNAPSHOT_SECONDS = int(os.getenv('LISTING_SNAPSHOT_SECONDS', '30'))
+
+# Logs: nível (DEBUG mostra uma linha por arquivo) e formato ('text' ou 'json')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+
+# Limite de banda em MB/s (download + upload somados; 0 = sem limite):
+# global do processo e padrão de cada job da API
+BANDWIDTH_LIMIT_MB_S = float(os.getenv('BANDWIDTH_LIMIT_MB_S', '0'))
+JOB_BANDWIDTH_LIMIT_MB_S = float(os.getenv('JOB_BANDWIDTH_LIMIT_MB_S', '0'))
+
+# Origem e destino das transferências: 'drive', 'drive:<pasta>', 'azure',
+# 'azure:<contêiner>', 'local:<pasta>' ou 'memory' (ver storage.py)
+TRANSFER_SOURCE = os.getenv('TRANSFER_SOURCE', 'drive')
+TRANSFER_SINK = os.getenv('TRANSFER_SINK', 'azure')
+
+# Empacotamento de arquivos pequenos (--pack): formato ('tar' ou 'zip'),
+# tamanho de cada shard e maior arquivo empacotado (os maiores vão avulsos)
+PACK_FORMAT = os.getenv('PACK_FORMAT', 'tar')
+PACK_SHARD_BYTES = int(float(os.getenv('PACK_SHARD_MB', '64')) * 1024 * 1024)
+PACK_MAX_FILE_BYTES = int(float(os.getenv('PACK_MAX_FILE_MB', '1')) * 1024 * 1024)
+
+# Sincronização contínua: intervalo entre as consultas de mudanças do Drive
+SYNC_INTERVAL_SECONDS = int(os.getenv('SYNC_INTERVAL_SECONDS', '60'))
+
+# Histórico das transferências para /api/stats (vazio = desabilitado; ex.: transfer_history.db)
+HISTORY_DB = os.getenv('HISTORY_DB', '')
+HISTORY_RETENTION_DAYS = int(os.getenv('HISTORY_RETENTION_DAYS', '90'))
+
 # Validar configurações
 def validate_config():
     """Valida se todas as configurações estão presentes"""
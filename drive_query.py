@@ -0,0 +1,161 @@
+"""
+Construtor de consultas da listagem do Google Drive
+
+Transforma filtros (tipo MIME, padrões de nome, data de modificação e
+tamanho) na expressão 'q' da API do Drive, para que o próprio Drive
+descarte o que não interessa, e escolhe os campos ('fields') que a
+listagem deve trazer.
+
+O que a linguagem de consulta do Drive não suporta é conferido localmente
+em matches(): tamanho e padrões de nome com curingas no meio ou no início
+(ex.: '*.pdf'). Um padrão como 'relatorio*' vai para o Drive como
+"name contains 'relatorio'" (que no Drive casa pelo início do nome) e é
+conferido localmente também.
+"""
+import fnmatch
+from datetime import datetime, timezone
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Campos trazidos quando o chamador não escolhe
+DEFAULT_FIELDS = ('id', 'name', 'mimeType', 'size', 'md5Checksum', 'createdTime', 'modifiedTime')
+
+_WILDCARDS = '*?['
+
+
+def quote(value):
+    """Literal de texto na sintaxe de consulta do Drive"""
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _rfc3339(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return str(value)
+
+
+class DriveQuery:
+    def __init__(self, folder_id=None):
+        """
+        Args:
+            folder_id (str): Pasta pai (None = sem restrição de pasta)
+        """
+        self.folder_id = folder_id
+        self._terms = []
+        self._include = []
+        self._exclude = []
+        self._min_size = None
+        self._max_size = None
+        self._fields = DEFAULT_FIELDS
+
+    def files_only(self):
+        """Exclui as pastas"""
+        self._terms.append(f"mimeType != {quote(FOLDER_MIME_TYPE)}")
+        return self
+
+    def mime_types(self, *mime_types):
+        """Só arquivos com um destes tipos MIME"""
+        if mime_types:
+            self._terms.append('(' + ' or '.join(f"mimeType = {quote(m)}" for m in mime_types) + ')')
+        return self
+
+    def name_matches(self, *patterns):
+        """
+        Só nomes que casam com um dos padrões fnmatch
+
+        Um único padrão sem curingas vira "name = ..."; um único padrão
+        com curingas só no fim vira "name contains ..." (prefixo).
+        """
+        patterns = [p for p in patterns if p]
+        if not patterns:
+            return self
+        self._include.append(patterns)
+        if len(patterns) == 1:
+            pattern = patterns[0]
+            prefix = pattern.rstrip('*')
+            if not any(c in pattern for c in _WILDCARDS):
+                self._terms.append(f"name = {quote(pattern)}")
+            elif prefix and not any(c in prefix for c in _WILDCARDS):
+                self._terms.append(f"name contains {quote(prefix)}")
+        return self
+
+    def name_equals(self, name):
+        """Só o nome exato (sem curingas: '[', '*' e '?' valem como texto)"""
+        self._terms.append(f"name = {quote(name)}")
+        return self
+
+    def name_excludes(self, *patterns):
+        """Descarta nomes que casam com algum dos padrões fnmatch"""
+        for pattern in patterns:
+            if not pattern:
+                continue
+            self._exclude.append(pattern)
+            if not any(c in pattern for c in _WILDCARDS):
+                self._terms.append(f"name != {quote(pattern)}")
+        return self
+
+    def modified_since(self, when):
+        """
+        Só arquivos modificados depois de 'when'
+
+        Args:
+            when: datetime (sem fuso = UTC) ou texto RFC 3339
+        """
+        if when:
+            self._terms.append(f"modifiedTime > {quote(_rfc3339(when))}")
+        return self
+
+    def size_between(self, min_bytes=None, max_bytes=None):
+        """Só arquivos com tamanho no intervalo (conferido localmente)"""
+        self._min_size = min_bytes
+        self._max_size = max_bytes
+        if min_bytes or max_bytes is not None:
+            # Sem 'size' não há como conferir
+            self._require_fields('size')
+        return self
+
+    def fields(self, *names):
+        """Campos de cada arquivo trazidos pela listagem"""
+        self._fields = tuple(names)
+        if self._include or self._exclude:
+            self._require_fields('name')
+        if self._min_size or self._max_size is not None:
+            self._require_fields('size')
+        return self
+
+    def _require_fields(self, *names):
+        self._fields = self._fields + tuple(n for n in names if n not in self._fields)
+
+    def build(self):
+        """Expressão 'q' para files().list"""
+        terms = ["trashed = false"]
+        if self.folder_id:
+            terms.insert(0, f"{quote(self.folder_id)} in parents")
+        return ' and '.join(terms + self._terms)
+
+    def fields_param(self):
+        """Parâmetro 'fields' de files().list (com o token de paginação)"""
+        return f"nextPageToken, files({', '.join(self._fields)})"
+
+    def matches(self, file):
+        """Confere localmente os filtros que o Drive não aplica"""
+        name = file.get('name', '')
+        for patterns in self._include:
+            if not any(fnmatch.fnmatch(name, p) for p in patterns):
+                return False
+        if any(fnmatch.fnmatch(name, p) for p in self._exclude):
+            return False
+        if self._min_size or self._max_size is not None:
+            size = int(file.get('size', 0) or 0)
+            if self._min_size and size < self._min_size:
+                return False
+            if self._max_size is not None and size > self._max_size:
+                return False
+        return True
+
+    def key(self):
+        """Identifica consultas equivalentes (usado pelo single-flight)"""
+        return (self.build(), self.fields_param(), tuple(map(tuple, self._include)),
+                tuple(self._exclude), self._min_size, self._max_size)
@@ -105,13 +105,12 @@ def exemplo_4_transferir_com_filtro():
     gdrive = GoogleDriveManager()
     azure = AzureBlobManager()
     
-    # Listar arquivos
-    files = gdrive.list_files_in_folder()
-    
-    # Filtrar apenas PDFs
-    pdfs = [f for f in files if f['name'].lower().endswith('.pdf')]
+    # Listar apenas PDFs: o filtro vai na consulta e o Drive só devolve
+    # os PDFs, com os campos usados abaixo
+    pdfs = gdrive.list_files_in_folder(
+        query=gdrive.query().mime_types('application/pdf').fields('id', 'name')
+    )
     
-    print(f"Total de arquivos: {len(files)}")
     print(f"PDFs encontrados: {len(pdfs)}\n")
     
     # Transferir PDFs
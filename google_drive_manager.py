@@ -2,21 +2,57 @@
 Módulo para operações com Google Drive
 """
 import io
+import logging
+import mmap
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from config import GOOGLE_CREDENTIALS_FILE, GOOGLE_DRIVE_FOLDER_ID
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from config import (
+    GOOGLE_CREDENTIALS_FILE, GOOGLE_DRIVE_FOLDER_ID, DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_PARALLELISM, DOWNLOAD_RANGE_RETRIES, DRIVE_UPLOAD_CHUNK_SIZE,
+    DRIVE_UPLOAD_RETRIES
+)
+from bandwidth import default_limiter
+from cancellation import TransferCancelled
+from resume_state import ResumeStore
+from scheduler import file_size, uses_ranged_download
+from singleflight import SingleFlight
+from staging import StagingBuffer, is_buffer
+from drive_query import DEFAULT_FIELDS, DriveQuery
+from logger import get_logger
+from storage import StorageBackend
+from tracing import get_tracer
 
 # Escopo necessário para acessar Google Drive
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
-class GoogleDriveManager:
-    def __init__(self):
-        """Inicializa conexão com Google Drive"""
+logger = get_logger('google_drive')
+
+class GoogleDriveManager(StorageBackend):
+    kind = 'drive'
+    
+    def __init__(self, folder_id=None):
+        """
+        Inicializa conexão com Google Drive
+        
+        Args:
+            folder_id (str): Pasta usada por padrão (padrão: GOOGLE_DRIVE_FOLDER_ID)
+        """
+        self.folder_id = folder_id or GOOGLE_DRIVE_FOLDER_ID
         self.service = None
+        self.credentials = None
+        self._local = threading.local()
+        self._flight = SingleFlight()
         self.authenticate()
     
     def authenticate(self):
@@ -26,90 +62,555 @@ class GoogleDriveManager:
                 GOOGLE_CREDENTIALS_FILE, 
                 scopes=SCOPES
             )
+            self.credentials = credentials
             self.service = build('drive', 'v3', credentials=credentials)
-            print("✅ Autenticação Google Drive bem-sucedida!")
+            logger.info("✅ Autenticação Google Drive bem-sucedida!")
         except Exception as e:
-            print(f"❌ Erro ao autenticar com Google Drive: {e}")
+            logger.error("❌ Erro ao autenticar com Google Drive: %s", e)
             raise
     
-    def list_files_in_folder(self, folder_id=None):
+    def _http(self):
+        """
+        Retorna uma conexão HTTP autenticada exclusiva da thread atual
+        
+        O httplib2 não é thread-safe, então cada thread do agendador de
+        transferências usa sua própria conexão.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+    
+    def query(self, folder_id=None):
+        """
+        Cria uma consulta de listagem para uma pasta
+        
+        Exemplo:
+            gdrive.query().files_only().mime_types('application/pdf') \
+                  .modified_since('2024-01-01T00:00:00').fields('id', 'name', 'size')
+        
+        Args:
+            folder_id (str): ID da pasta (padrão: a pasta do gerenciador)
+        
+        Returns:
+            DriveQuery: Consulta para list_files_in_folder/iter_files_in_folder
+        """
+        return DriveQuery(folder_id or self.folder_id)
+    
+    def iter_files_in_folder(self, folder_id=None, page_size=1000, query=None):
+        """
+        Percorre os arquivos de uma pasta página por página, sem imprimir
+        
+        Os arquivos são entregues conforme cada página chega, então pastas
+        grandes podem ser processadas sem esperar a listagem completa.
+        
+        Args:
+            folder_id (str): ID da pasta no Google Drive
+                           Se None, usa o ID configurado
+            page_size (int): Arquivos por requisição (máximo 1000)
+            query (DriveQuery): Filtros e campos (ver query()); se
+                                informada, folder_id é ignorado
+        
+        Yields:
+            dict: Informações de cada arquivo
+        """
+        query = query or self.query(folder_id)
+        q = query.build()
+        fields = query.fields_param()
+        page_token = None
+        
+        while True:
+            response = self.service.files().list(
+                q=q,
+                spaces='drive',
+                fields=fields,
+                pageSize=page_size,
+                pageToken=page_token
+            ).execute(http=self._http())
+            
+            for file in response.get('files', []):
+                if query.matches(file):
+                    yield file
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+    
+    def get_start_page_token(self):
+        """
+        Marca o ponto atual do histórico de mudanças do Drive
+        
+        Returns:
+            str: Token para list_changes (mudanças a partir de agora)
+        """
+        response = self.service.changes().getStartPageToken().execute(http=self._http())
+        return response['startPageToken']
+    
+    def list_changes(self, page_token, fields=None, page_size=1000):
+        """
+        Lista as mudanças ocorridas desde um token
+        
+        O custo depende só da quantidade de mudanças, não do tamanho das
+        pastas. As mudanças são de todo o Drive visível à conta; quem chama
+        filtra pela pasta (campo 'parents' do arquivo).
+        
+        Args:
+            page_token (str): Token de get_start_page_token ou de uma chamada anterior
+            fields (tuple): Campos de cada arquivo (padrão: os da listagem,
+                            mais 'parents' e 'trashed')
+            page_size (int): Mudanças por requisição (máximo 1000)
+        
+        Returns:
+            tuple: (lista de mudanças, token para a próxima chamada)
+        """
+        fields = fields or DEFAULT_FIELDS + ('parents', 'trashed')
+        changes = []
+        while True:
+            response = self.service.changes().list(
+                pageToken=page_token,
+                spaces='drive',
+                includeRemoved=True,
+                pageSize=page_size,
+                fields=f"nextPageToken, newStartPageToken, "
+                       f"changes(fileId, removed, file({', '.join(fields)}))"
+            ).execute(http=self._http())
+            changes.extend(response.get('changes', []))
+            
+            if 'newStartPageToken' in response:
+                return changes, response['newStartPageToken']
+            page_token = response['nextPageToken']
+    
+    def list_files_in_folder(self, folder_id=None, query=None):
         """
         Lista todos os arquivos em uma pasta específica do Google Drive
         
+        Chamadas simultâneas com a mesma pasta e consulta compartilham uma
+        única listagem no Drive (single-flight).
+        
         Args:
             folder_id (str): ID da pasta no Google Drive
                            Se None, usa o ID configurado
+            query (DriveQuery): Filtros aplicados pelo próprio Drive e
+                                campos trazidos (ver query()); se
+                                informada, folder_id é ignorado
         
         Returns:
             list: Lista de dicionários com info dos arquivos
         """
-        if folder_id is None:
-            folder_id = GOOGLE_DRIVE_FOLDER_ID
-        
+        query = query or self.query(folder_id)
+        return list(self._flight.do(('list_files', query.key()),
+                                    self._list_files_in_folder, query))
+    
+    def _list_files_in_folder(self, query):
+        folder_id = query.folder_id
         if not folder_id:
-            print("❌ Nenhum ID de pasta foi fornecido!")
+            logger.error("❌ Nenhum ID de pasta foi fornecido!")
             return []
         
         try:
-            files = []
-            query = f"'{folder_id}' in parents and trashed=false"
-            
-            print(f"\n📂 Listando arquivos da pasta Google Drive...")
-            print(f"   ID da Pasta: {folder_id}\n")
-            
-            results = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name, mimeType, size, createdTime, modifiedTime)',
-                pageSize=100
-            ).execute()
-            
-            files = results.get('files', [])
+            files = list(self.iter_files_in_folder(query=query))
             
             if not files:
-                print("   Nenhum arquivo encontrado na pasta!")
+                logger.info("📂 Nenhum arquivo encontrado na pasta", extra={'folder_id': folder_id})
             else:
-                print(f"   📊 Total de arquivos: {len(files)}\n")
-                for idx, file in enumerate(files, 1):
-                    size_mb = round(int(file.get('size', 0)) / (1024 * 1024), 2)
-                    print(f"   {idx}. {file['name']}")
-                    print(f"      ID: {file['id']}")
-                    print(f"      Tamanho: {size_mb} MB")
-                    print(f"      Tipo: {file['mimeType']}")
-                    print(f"      Criado: {file.get('createdTime', 'N/A')}\n")
+                logger.info("📂 %d arquivo(s) na pasta do Google Drive", len(files),
+                            extra={'folder_id': folder_id})
+                # Uma linha por arquivo só em DEBUG (e sem custo nos demais níveis)
+                if logger.isEnabledFor(logging.DEBUG):
+                    for idx, file in enumerate(files, 1):
+                        logger.debug("   %d. %s", idx, file.get('name'), extra={
+                            'file_id': file.get('id'),
+                            'size': int(file.get('size', 0)),
+                            'mime_type': file.get('mimeType'),
+                            'created': file.get('createdTime', 'N/A')
+                        })
             
             return files
             
         except Exception as e:
-            print(f"❌ Erro ao listar arquivos: {e}")
+            logger.error("❌ Erro ao listar arquivos: %s", e, extra={'folder_id': folder_id})
             return []
     
-    def download_file(self, file_id, file_name):
+    def download_file(self, file_id, file_name, metrics=None, cancel=None, progress=None,
+                      limiter=None):
         """
         Baixa um arquivo do Google Drive
         
         Args:
             file_id (str): ID do arquivo no Google Drive
             file_name (str): Nome do arquivo para exibição
+            metrics (dict): Se informado, recebe 'ttfb_s' (tempo até o
+                            primeiro chunk), 'download_s' (duração total)
+                            e soma em 'api_calls' as requisições feitas
+            cancel (CancelToken): Interrompe o download entre dois chunks
+                                  (lança TransferCancelled)
+            progress (FileProgress): Recebe os bytes baixados a cada chunk
+            limiter (Limiter): Limite de banda (padrão: só o global)
         
         Returns:
-            bytes: Conteúdo do arquivo em bytes
+            bytes: Conteúdo do arquivo em bytes; acima de STAGING_MEMORY_MB,
+                   um mmap somente leitura de um arquivo temporário
+                   (ver staging.StagingBuffer)
         """
+        limiter = limiter or default_limiter()
+        file = StagingBuffer()
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            file = io.BytesIO()
-            downloader = MediaIoBaseDownload(file, request)
+            with get_tracer().span('drive.download', file_id=file_id, file_name=file_name) as span:
+                request = self.service.files().get_media(fileId=file_id)
+                request.http = self._http()
+                downloader = MediaIoBaseDownload(file, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+                
+                done = False
+                ttfb = None
+                calls = 0
+                while not done:
+                    if cancel is not None:
+                        cancel.check()
+                    received = file.tell()
+                    status, done = downloader.next_chunk()
+                    calls += 1
+                    if progress is not None and status is not None:
+                        progress.download(status.resumable_progress, status.total_size)
+                    limiter.consume(file.tell() - received, cancel)
+                    if ttfb is None:
+                        ttfb = span.duration
+                
+                span.set_attribute('ttfb_ms', round((ttfb or 0) * 1000, 3))
+                span.set_attribute('bytes', file.tell())
+                span.set_attribute('spilled', file.spilled)
             
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            if metrics is not None:
+                metrics['ttfb_s'] = ttfb
+                metrics['download_s'] = span.duration
+                metrics['api_calls'] = metrics.get('api_calls', 0) + calls
             
-            file.seek(0)
             return file.getvalue()
             
+        except TransferCancelled:
+            raise
         except Exception as e:
-            print(f"❌ Erro ao baixar arquivo {file_name}: {e}")
+            logger.error("❌ Erro ao baixar arquivo %s: %s", file_name, e, extra={'file_id': file_id})
             return None
+        finally:
+            file.close()
+    
+    def iter_file_ranges(self, file_id, size, chunk_size=None, parallelism=None, metrics=None,
+                         cancel=None, progress=None, limiter=None):
+        """
+        Baixa um arquivo em intervalos de bytes (HTTP Range) paralelos
+        
+        Vários intervalos do mesmo arquivo são baixados ao mesmo tempo, cada
+        um com suas próprias novas tentativas, e entregues em ordem. No
+        máximo 'parallelism' intervalos ficam em memória.
+        
+        Args:
+            file_id (str): ID do arquivo no Google Drive
+            size (int): Tamanho do arquivo em bytes (campo 'size' do Drive)
+            chunk_size (int): Tamanho de cada intervalo (None = DOWNLOAD_CHUNK_MB)
+            parallelism (int): Intervalos simultâneos (None = DOWNLOAD_PARALLELISM)
+            metrics (dict): Se informado, recebe 'ttfb_s' e 'download_s' e
+                            soma em 'api_calls' as requisições feitas
+            cancel (CancelToken): Interrompe o download entre dois
+                                  intervalos (lança TransferCancelled)
+            progress (FileProgress): Recebe os bytes de cada intervalo entregue
+            limiter (Limiter): Limite de banda (padrão: só o global); os
+                               intervalos seguintes esperam a entrega dos anteriores
+        
+        Returns:
+            generator: Blocos de bytes do arquivo, em ordem
+        """
+        chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+        parallelism = max(1, parallelism or DOWNLOAD_PARALLELISM)
+        limiter = limiter or default_limiter()
+        ranges = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+        
+        # O gerador pode ser consumido por outra thread (upload do Azure),
+        # então o span pai é capturado aqui
+        parent = get_tracer().current_span()
+        lock = threading.Lock()
+        
+        def generate():
+            started = time.perf_counter()
+            pending = iter(ranges)
+            futures = deque()
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                try:
+                    for start, end in pending:
+                        futures.append(executor.submit(
+                            self._download_range, file_id, start, end, parent, metrics, lock, cancel
+                        ))
+                        if len(futures) >= parallelism:
+                            break
+                    
+                    first = True
+                    while futures:
+                        if cancel is not None:
+                            cancel.check()
+                        data = futures.popleft().result()
+                        next_range = next(pending, None)
+                        if next_range is not None:
+                            futures.append(executor.submit(
+                                self._download_range, file_id, *next_range, parent, metrics, lock,
+                                cancel
+                            ))
+                        if first and metrics is not None:
+                            metrics['ttfb_s'] = time.perf_counter() - started
+                        first = False
+                        if progress is not None:
+                            progress.add_download(len(data))
+                        limiter.consume(len(data), cancel)
+                        yield data
+                finally:
+                    for future in futures:
+                        future.cancel()
+            
+            if metrics is not None:
+                metrics['download_s'] = time.perf_counter() - started
+        
+        return generate()
+    
+    def _download_range(self, file_id, start, end, parent=None, metrics=None, lock=None,
+                        cancel=None):
+        """Baixa o intervalo [start, end] de um arquivo, com novas tentativas"""
+        expected = end - start + 1
+        with get_tracer().span('drive.download_range', parent=parent, file_id=file_id,
+                               start=start, end=end) as span:
+            for attempt in range(DOWNLOAD_RANGE_RETRIES + 1):
+                if cancel is not None:
+                    cancel.check()
+                try:
+                    request = self.service.files().get_media(fileId=file_id)
+                    request.headers['Range'] = f'bytes={start}-{end}'
+                    data = request.execute(http=self._http())
+                    if len(data) != expected:
+                        raise IOError(f"intervalo incompleto ({len(data)} de {expected} bytes)")
+                    return data
+                except Exception as e:
+                    error = e
+                    span.set_attribute('attempts', attempt + 1)
+                    if attempt < DOWNLOAD_RANGE_RETRIES:
+                        if cancel is not None:
+                            cancel.sleep(min(2 ** attempt, 30))
+                        else:
+                            time.sleep(min(2 ** attempt, 30))
+                finally:
+                    if metrics is not None:
+                        with lock:
+                            metrics['api_calls'] = metrics.get('api_calls', 0) + 1
+            
+            raise IOError(f"Falha ao baixar bytes {start}-{end} do arquivo {file_id}: {error}")
+    
+    def upload_file_resumable(self, file_name, stream, folder_id=None, mime_type=None,
+                              chunk_size=None, resume_key=None, metrics=None, progress=None,
+                              limiter=None):
+        """
+        Envia um arquivo para o Google Drive com upload resumable
+        
+        O conteúdo é lido do stream em chunks de 'chunk_size' bytes, então a
+        memória usada não depende do tamanho do arquivo. Com 'resume_key', a
+        sessão é salva após cada chunk confirmado e um upload interrompido
+        continua do último byte confirmado na próxima chamada.
+        
+        Args:
+            file_name (str): Nome do arquivo no Drive
+            stream: Arquivo binário posicionável (ex.: BlobRangeReader)
+            folder_id (str): Pasta de destino (padrão: a pasta do gerenciador)
+            mime_type (str): Tipo do conteúdo
+            chunk_size (int): Bytes por requisição (múltiplo de 256 KB)
+            resume_key (str): Identifica o upload para retomá-lo depois
+            metrics (dict): Se informado, recebe 'upload_s' e 'resumed_from'
+                            e soma em 'api_calls' as requisições feitas
+            progress (FileProgress): Recebe os bytes confirmados pelo Drive
+            limiter (Limiter): Limite de banda (padrão: só o global)
+        
+        Returns:
+            dict: Informações do arquivo criado ('id', 'md5Checksum', ...)
+                  com 'status' 'success', ou 'status' 'error' e 'error'
+        """
+        folder_id = folder_id or self.folder_id
+        store = ResumeStore()
+        limiter = limiter or default_limiter()
+        
+        try:
+            with get_tracer().span('drive.upload', file_name=file_name) as span:
+                media = MediaIoBaseUpload(
+                    stream,
+                    mimetype=mime_type or 'application/octet-stream',
+                    chunksize=chunk_size or DRIVE_UPLOAD_CHUNK_SIZE,
+                    resumable=True
+                )
+                body = {'name': file_name}
+                if folder_id:
+                    body['parents'] = [folder_id]
+                request = self.service.files().create(
+                    body=body,
+                    media_body=media,
+                    fields='id, name, size, md5Checksum'
+                )
+                
+                # Retoma a sessão salva de uma execução anterior
+                state = store.load(resume_key) if resume_key else None
+                resumed = bool(state and state.get('size') == media.size())
+                if resumed:
+                    request.resumable_uri = state['resumable_uri']
+                    request.resumable_progress = state['progress']
+                    span.set_attribute('resumed_from', state['progress'])
+                resumed_from = request.resumable_progress
+                
+                response = None
+                calls = 0
+                errors = 0
+                while response is None:
+                    try:
+                        calls += 1
+                        sent = request.resumable_progress
+                        status, response = request.next_chunk(http=self._http())
+                        errors = 0
+                    except HttpError as e:
+                        if resumed and e.resp.status in (404, 410):
+                            # Sessão expirada: recomeça do zero uma única vez
+                            resumed = False
+                            request.resumable_uri = None
+                            request.resumable_progress = 0
+                            resumed_from = 0
+                            store.clear(resume_key)
+                            continue
+                        errors += 1
+                        if e.resp.status < 500 or errors > DRIVE_UPLOAD_RETRIES:
+                            raise
+                        time.sleep(min(2 ** errors, 30))
+                        continue
+                    except (httplib2.HttpLib2Error, OSError):
+                        errors += 1
+                        if errors > DRIVE_UPLOAD_RETRIES:
+                            raise
+                        time.sleep(min(2 ** errors, 30))
+                        continue
+                    
+                    confirmed = media.size() if response is not None else request.resumable_progress
+                    if progress is not None:
+                        progress.upload(confirmed, media.size())
+                    limiter.consume(confirmed - sent)
+                    
+                    if resume_key and response is None:
+                        store.save(
+                            resume_key,
+                            resumable_uri=request.resumable_uri,
+                            progress=request.resumable_progress,
+                            size=media.size(),
+                            name=file_name
+                        )
+            
+            if resume_key:
+                store.clear(resume_key)
+            
+            if metrics is not None:
+                metrics['upload_s'] = span.duration
+                metrics['resumed_from'] = resumed_from
+                metrics['api_calls'] = metrics.get('api_calls', 0) + calls
+            
+            return dict(response, status='success')
+            
+        except Exception as e:
+            logger.error("❌ Erro ao enviar arquivo %s para o Google Drive: %s", file_name, e)
+            return {
+                'name': file_name,
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def list_files(self):
+        """Arquivos da pasta do gerenciador (StorageBackend)"""
+        return self.list_files_in_folder(query=self.query().files_only().fields(
+            'id', 'name', 'size', 'mimeType', 'md5Checksum', 'createdTime', 'modifiedTime'
+        ))
+    
+    def read_file(self, file, metrics=None, cancel=None, progress=None, limiter=None):
+        """
+        Lê um arquivo (StorageBackend): arquivos grandes em intervalos
+        paralelos (iterável), os demais inteiros (bytes)
+        """
+        if uses_ranged_download(file):
+            return self.iter_file_ranges(file['id'], file_size(file), metrics=metrics,
+                                         cancel=cancel, progress=progress, limiter=limiter)
+        return self.download_file(file['id'], file['name'], metrics=metrics, cancel=cancel,
+                                  progress=progress, limiter=limiter)
+    
+    def _find_by_name(self, name):
+        query = self.query().files_only().name_equals(name).fields('id')
+        return [file['id'] for file in self.iter_files_in_folder(query=query)]
+    
+    def write_file(self, name, content, length=None, overwrite=True, metrics=None,
+                   progress=None, limiter=None, mime_type=None, **options):
+        """
+        Grava um arquivo na pasta do gerenciador (StorageBackend)
+        
+        O upload resumable precisa de um stream posicionável: iteráveis
+        passam por um StagingBuffer (em memória até STAGING_MEMORY_MB, depois
+        em disco) e um mmap é enviado como está. Com overwrite, arquivos de
+        mesmo nome vão para a lixeira depois que o novo termina de subir.
+        """
+        try:
+            replaced = self._find_by_name(name) if overwrite else []
+            if not is_buffer(content):
+                staging = StagingBuffer()
+                try:
+                    for chunk in content:
+                        staging.write(chunk)
+                    content = staging.getvalue()
+                finally:
+                    staging.close()
+            stream = content if isinstance(content, mmap.mmap) else io.BytesIO(content)
+        except Exception as e:
+            logger.error("❌ Erro ao preparar o envio de %s para o Google Drive: %s", name, e)
+            return {'name': name, 'status': 'error', 'error': str(e)}
+        
+        result = self.upload_file_resumable(name, stream, mime_type=mime_type,
+                                            metrics=metrics, progress=progress,
+                                            limiter=limiter)
+        if result['status'] != 'success':
+            return result
+        for file_id in replaced:
+            self._trash(file_id)
+        size = int(result.get('size', 0))
+        return dict(result, size=size, size_mb=round(size / (1024 * 1024), 2))
+    
+    def _trash(self, file_id):
+        self.service.files().update(
+            fileId=file_id,
+            body={'trashed': True}
+        ).execute(http=self._http())
+    
+    def trash_file(self, file_id):
+        """
+        Move um arquivo para a lixeira pelo ID
+        
+        Returns:
+            bool: True se o arquivo foi removido
+        """
+        try:
+            self._trash(file_id)
+            return True
+        except Exception as e:
+            logger.error("❌ Erro ao deletar %s do Google Drive: %s", file_id, e)
+            return False
+    
+    def delete_file(self, name):
+        """
+        Move para a lixeira os arquivos com este nome na pasta (StorageBackend)
+        
+        Returns:
+            bool: True se algum arquivo foi removido
+        """
+        try:
+            file_ids = self._find_by_name(name)
+            for file_id in file_ids:
+                self._trash(file_id)
+            return bool(file_ids)
+        except Exception as e:
+            logger.error("❌ Erro ao deletar %s do Google Drive: %s", name, e)
+            return False
     
     def create_folder(self, folder_name, parent_id=None):
         """
@@ -134,15 +635,14 @@ class GoogleDriveManager:
             file = self.service.files().create(
                 body=file_metadata,
                 fields='id'
-            ).execute()
+            ).execute(http=self._http())
             
             folder_id = file.get('id')
-            print(f"✅ Pasta '{folder_name}' criada com sucesso!")
-            print(f"   ID: {folder_id}")
+            logger.info("✅ Pasta '%s' criada com sucesso!", folder_name, extra={'folder_id': folder_id})
             return folder_id
             
         except Exception as e:
-            print(f"❌ Erro ao criar pasta: {e}")
+            logger.error("❌ Erro ao criar pasta: %s", e)
             return None
     
     def share_folder(self, folder_id, email):
@@ -167,11 +667,11 @@ class GoogleDriveManager:
                 fileId=folder_id,
                 body=permission,
                 fields='id'
-            ).execute()
+            ).execute(http=self._http())
             
-            print(f"✅ Pasta compartilhada com {email}")
+            logger.info("✅ Pasta compartilhada com %s", email)
             return True
             
         except Exception as e:
-            print(f"❌ Erro ao compartilhar pasta: {e}")
+            logger.error("❌ Erro ao compartilhar pasta: %s", e)
             return False
@@ -0,0 +1,28 @@
+"""
+Configuração do gunicorn (gunicorn -c gunicorn.conf.py wsgi:app)
+
+Cada worker é um processo com WEB_THREADS threads; listagens e
+transferências de requisições diferentes rodam ao mesmo tempo. O padrão é
+um único processo: os jobs da API (consulta, cancelamento, limite de
+banda) só existem no processo que os criou.
+"""
+from bandwidth import share_global_limit
+from config import WEB_HOST, WEB_PORT, WEB_WORKERS, WEB_THREADS
+
+bind = f"{WEB_HOST}:{WEB_PORT}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = 'gthread'
+
+# Transferências em lote podem levar vários minutos
+timeout = 600
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Cada worker tem o seu balde: divide BANDWIDTH_LIMIT_MB_S entre eles
+    share_global_limit(workers)
@@ -0,0 +1,310 @@
+"""
+Histórico das transferências (série temporal em SQLite)
+
+Cada lote e o resultado de cada arquivo são gravados em um banco SQLite
+local (HISTORY_DB). A partir dele, stats() calcula vazão, taxa de sucesso
+e percentis de latência em janelas de tempo, e rollups() agrega a série
+em intervalos fixos (ex.: 5 minutos) para acompanhar a capacidade.
+
+Os arquivos de um lote são gravados em blocos, não um por vez, e o banco
+usa WAL para aceitar vários processos (workers do servidor web, CLI).
+"""
+import sqlite3
+import threading
+import time
+from config import HISTORY_DB, HISTORY_RETENTION_DAYS
+from logger import get_logger
+
+# Arquivos acumulados antes de gravar no banco
+FLUSH_EVERY = 500
+
+PERCENTILES = (50, 90, 95, 99)
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+logger = get_logger('history')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    total INTEGER DEFAULT 0,
+    success INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    bytes INTEGER DEFAULT 0,
+    elapsed_s REAL,
+    api_calls INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS batches_finished_at ON batches (finished_at);
+
+CREATE TABLE IF NOT EXISTS transfers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL,
+    stage TEXT,
+    size INTEGER DEFAULT 0,
+    total_s REAL,
+    download_s REAL,
+    upload_s REAL,
+    queue_wait_s REAL,
+    api_calls INTEGER DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS transfers_ts ON transfers (ts);
+"""
+
+
+def parse_duration(text):
+    """Converte '90s', '15m', '24h' ou '7d' em segundos"""
+    text = str(text).strip().lower()
+    if text and text[-1] in _UNITS:
+        return float(text[:-1]) * _UNITS[text[-1]]
+    return float(text)
+
+
+class BatchRecorder:
+    """
+    Acumula os resultados de um lote e os grava em blocos
+
+    Uma falha do banco (ex.: disco cheio) só desativa o registro deste
+    lote; a transferência continua.
+    """
+
+    def __init__(self, store, source):
+        self._store = store
+        self._rows = []
+        try:
+            self.batch_id = store._insert_batch(source)
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def _disable(self, error):
+        logger.warning("⚠️  Histórico desativado para este lote: %s", error)
+        self.batch_id = None
+        self._rows = []
+
+    def add(self, result):
+        """Registra o resultado de um arquivo (formato de transfer_file)"""
+        if self.batch_id is None:
+            return
+        timings = result.get('timings', {})
+        self._rows.append((
+            self.batch_id, time.time(), result.get('name'), result['status'],
+            result.get('stage'), result.get('size', 0) if result['status'] == 'success' else 0,
+            timings.get('total_s'), timings.get('download_s'), timings.get('upload_s'),
+            timings.get('queue_wait_s'), result.get('api_calls', 0), result.get('error')
+        ))
+        if len(self._rows) >= FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        rows, self._rows = self._rows, []
+        if rows:
+            try:
+                self._store._insert_transfers(rows)
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def finish(self, results):
+        """Grava os arquivos pendentes e o resumo do lote (ver new_results)"""
+        self._flush()
+        if self.batch_id is None:
+            return
+        try:
+            self._store._finish_batch(self.batch_id, results)
+        except sqlite3.Error as e:
+            self._disable(e)
+
+
+class HistoryStore:
+    def __init__(self, path=None, retention_days=None):
+        """
+        Abre (ou cria) o banco de histórico
+
+        Args:
+            path (str): Arquivo SQLite (padrão: HISTORY_DB)
+            retention_days (int): Registros mais antigos são apagados
+                                  ao abrir (padrão: HISTORY_RETENTION_DAYS)
+        """
+        self.path = path or HISTORY_DB
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+
+        retention_days = HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+        if retention_days:
+            self.prune(time.time() - retention_days * 86400)
+
+    def _execute(self, sql, params=(), many=False):
+        with self._lock, self._db:
+            if many:
+                return self._db.executemany(sql, params)
+            return self._db.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _insert_batch(self, source):
+        return self._execute(
+            'INSERT INTO batches (source, started_at) VALUES (?, ?)', (source, time.time())
+        ).lastrowid
+
+    def _insert_transfers(self, rows):
+        self._execute(
+            'INSERT INTO transfers (batch_id, ts, name, status, stage, size, total_s, download_s, '
+            'upload_s, queue_wait_s, api_calls, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows, many=True
+        )
+
+    def _finish_batch(self, batch_id, results):
+        self._execute(
+            'UPDATE batches SET finished_at = ?, total = ?, success = ?, failed = ?, bytes = ?, '
+            'elapsed_s = ?, api_calls = ? WHERE id = ?',
+            (time.time(), results['total'], len(results['success']), len(results['failed']),
+             results['bytes'], results.get('elapsed_s'), results['api_calls'], batch_id)
+        )
+
+    def begin_batch(self, source):
+        """
+        Inicia o registro de um lote
+
+        Args:
+            source (str): Origem do lote (ex.: 'api', 'cli', 'batch', 'mirror')
+
+        Returns:
+            BatchRecorder: Use add(resultado) por arquivo e finish(resultados)
+        """
+        return BatchRecorder(self, source)
+
+    def prune(self, before):
+        """Apaga os registros anteriores ao instante 'before' (epoch)"""
+        self._execute('DELETE FROM transfers WHERE ts < ?', (before,))
+        self._execute('DELETE FROM batches WHERE started_at < ?', (before,))
+
+    def _percentiles(self, column, since):
+        # Percentil pelo posto (nearest-rank), sem trazer a série para a memória
+        count = self._query(
+            f'SELECT COUNT({column}) FROM transfers WHERE ts >= ? AND status = ?',
+            (since, 'success')
+        )[0][0]
+        values = {}
+        for p in PERCENTILES:
+            if not count:
+                values[f'p{p}'] = None
+                continue
+            offset = min(count - 1, int(round(p / 100 * (count - 1))))
+            row = self._query(
+                f'SELECT {column} FROM transfers WHERE ts >= ? AND status = ? '
+                f'AND {column} IS NOT NULL ORDER BY {column} LIMIT 1 OFFSET ?',
+                (since, 'success', offset)
+            )
+            values[f'p{p}'] = round(row[0][0], 4) if row else None
+        return values
+
+    def stats(self, window_s, now=None):
+        """
+        Estatísticas de uma janela de tempo
+
+        Args:
+            window_s (float): Tamanho da janela em segundos (até agora)
+
+        Returns:
+            dict: Arquivos (com sucesso, falha e cancelados), taxa de
+                  sucesso entre os que terminaram, bytes, vazão (MB/s
+                  durante os lotes e média na janela) e percentis de latência
+        """
+        now = now or time.time()
+        since = now - window_s
+        files, success, failed, cancelled, total_bytes, api_calls = self._query(
+            'SELECT COUNT(*), COALESCE(SUM(status = ?), 0), COALESCE(SUM(status = ?), 0), '
+            'COALESCE(SUM(status = ?), 0), COALESCE(SUM(size), 0), '
+            'COALESCE(SUM(api_calls), 0) FROM transfers WHERE ts >= ?',
+            ('success', 'error', 'cancelled', since)
+        )[0]
+        finished = success + failed
+        batches, busy_s = self._query(
+            'SELECT COUNT(*), COALESCE(SUM(elapsed_s), 0) FROM batches WHERE finished_at >= ?',
+            (since,)
+        )[0]
+
+        mb = total_bytes / (1024 * 1024)
+        result = {
+            'window_s': window_s,
+            'batches': batches,
+            'files': files,
+            'success': success,
+            'failed': failed,
+            'cancelled': cancelled,
+            'success_rate': round(success / finished, 4) if finished else None,
+            'bytes': total_bytes,
+            'throughput_mb_s': round(mb / busy_s, 2) if busy_s else None,
+            'average_mb_s': round(mb / window_s, 4),
+            'api_calls_per_file': round(api_calls / files, 2) if files else None
+        }
+        if success:
+            result['latency_s'] = {
+                column: self._percentiles(column, since)
+                for column in ('total_s', 'download_s', 'upload_s', 'queue_wait_s')
+            }
+        return result
+
+    def rollups(self, window_s, bucket_s, now=None):
+        """
+        Série agregada em intervalos fixos (downsampling)
+
+        Args:
+            window_s (float): Período coberto (até agora)
+            bucket_s (float): Tamanho de cada intervalo
+
+        Returns:
+            list: Um ponto por intervalo com arquivos, falhas, cancelados,
+                  bytes, vazão média no intervalo e latência média/máxima
+        """
+        now = now or time.time()
+        rows = self._query(
+            'SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, COUNT(*), COALESCE(SUM(status = ?), 0), '
+            'COALESCE(SUM(status = ?), 0), COALESCE(SUM(size), 0), AVG(total_s), MAX(total_s) '
+            'FROM transfers WHERE ts >= ? GROUP BY bucket ORDER BY bucket',
+            (bucket_s, bucket_s, 'error', 'cancelled', now - window_s)
+        )
+        return [{
+            'start': bucket,
+            'files': files,
+            'failed': failed,
+            'cancelled': cancelled,
+            'bytes': total_bytes,
+            'mb_s': round(total_bytes / (1024 * 1024) / bucket_s, 4),
+            'avg_total_s': round(avg, 4) if avg is not None else None,
+            'max_total_s': round(peak, 4) if peak is not None else None
+        } for bucket, files, failed, cancelled, total_bytes, avg, peak in rows]
+
+
+_history_store = None
+_history_lock = threading.Lock()
+
+
+def get_history_store():
+    """Retorna o histórico global, ou None se HISTORY_DB está vazio"""
+    global _history_store
+    if not HISTORY_DB:
+        return None
+    with _history_lock:
+        if _history_store is None:
+            try:
+                _history_store = HistoryStore()
+            except sqlite3.Error as e:
+                logger.warning("⚠️  Não foi possível abrir o histórico %s: %s", HISTORY_DB, e)
+                return None
+        return _history_store
+
+
+def begin_batch(source):
+    """Atalho: BatchRecorder do histórico global, ou None se desabilitado"""
+    store = get_history_store()
+    return store.begin_batch(source) if store else None
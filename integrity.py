@@ -0,0 +1,51 @@
+"""
+Verificação de integridade em passagem única
+
+O MD5 é calculado sobre os bytes enquanto eles passam do Google Drive para
+o Azure, sem baixar nada de novo, e comparado com o md5Checksum do Drive.
+"""
+import hashlib
+from staging import is_buffer
+
+
+class StreamHasher:
+    """Calcula o MD5 incrementalmente sobre o conteúdo transferido"""
+
+    def __init__(self):
+        self._md5 = hashlib.md5()
+        self.bytes = 0
+
+    def update(self, data):
+        self._md5.update(data)
+        self.bytes += len(data)
+
+    def wrap(self, content):
+        """
+        Faz o conteúdo passar pelo hash
+
+        Args:
+            content: bytes (ou mmap) ou iterável de blocos de bytes
+
+        Returns:
+            O mesmo conteúdo: bytes são processados na hora; iteráveis são
+            envolvidos em um gerador que processa cada bloco ao ser lido
+        """
+        if is_buffer(content):
+            self.update(content)
+            return content
+
+        def generate():
+            for chunk in content:
+                self.update(chunk)
+                yield chunk
+
+        return generate()
+
+    def hexdigest(self):
+        return self._md5.hexdigest()
+
+
+def md5_hex_to_bytes(md5_hex):
+    """Converte o md5Checksum do Drive (hex) para os bytes usados pelo Azure"""
+    return bytearray(bytes.fromhex(md5_hex)) if md5_hex else None
+
@@ -0,0 +1,208 @@
+"""
+Jobs de transferência do servidor web
+
+Cada pedido de transferência vira um job no JobScheduler do processo, que
+divide os mesmos workers entre todos os jobs: um arquivo urgente
+('high', usado por /api/transfer-single) passa na frente de um lote grande
+('normal'), lotes de mesma prioridade avançam intercalados e um job pode
+ser cancelado a qualquer momento. Cada job tem seu próprio limite de banda
+(além do global), que pode ser trocado com o job em andamento.
+
+Os jobs ficam na memória do processo que os criou: com vários processos
+(gunicorn), consulte e cancele um job no mesmo processo, ou rode um único
+processo com várias threads (WEB_WORKERS=1).
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from bandwidth import Limiter, TokenBucket, mb_s_to_bytes
+from cancellation import CancelToken
+from config import JOB_BANDWIDTH_LIMIT_MB_S
+from history import begin_batch
+from progress import ProgressTracker
+from scheduler import JobScheduler, plan_batch
+from transfer_engine import new_results, record_result, track, transfer_file
+
+PRIORITIES = {'low': -10, 'normal': 0, 'high': 10}
+
+# Jobs terminados mantidos para consulta (os mais antigos são esquecidos)
+FINISHED_JOBS_KEPT = 100
+
+
+def parse_priority(value):
+    """Aceita 'low', 'normal', 'high' ou um inteiro"""
+    if value is None:
+        return PRIORITIES['normal']
+    if isinstance(value, str) and value.lower() in PRIORITIES:
+        return PRIORITIES[value.lower()]
+    return int(value)
+
+
+class TransferJob:
+    def __init__(self, files, priority, name, source, max_mb_s=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.priority = priority
+        self.files = files
+        self.source = source
+        self.status = 'queued'
+        self.created_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.enqueued_at = time.perf_counter()
+        self.results = new_results(len(files))
+        self.cancel = CancelToken()
+        self.progress = ProgressTracker(files)
+        self.bucket = TokenBucket(mb_s_to_bytes(
+            JOB_BANDWIDTH_LIMIT_MB_S if max_mb_s is None else max_mb_s
+        ))
+        self.limiter = Limiter(self.bucket)
+        self.scheduled = None
+
+    def to_dict(self, include_results=False):
+        """Resumo do job para a API"""
+        results = self.results
+        entry = {
+            'id': self.id,
+            'name': self.name,
+            'priority': self.priority,
+            'max_mb_s': self.bucket.mb_s,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'total': results['total'],
+            'success': len(results['success']),
+            'failed': len(results['failed']),
+            'cancelled': len(results['cancelled']),
+            'bytes': results['bytes']
+        }
+        if self.scheduled is not None:
+            entry['running'] = self.scheduled.running
+            entry['pending'] = len(self.scheduled.pending)
+        if not self.finished_at:
+            # Bytes, vazão e tempo restante (do lote e de cada arquivo em andamento)
+            entry['progress'] = self.progress.snapshot()
+        if include_results:
+            # Cópia: o agendador continua adicionando resultados em outra thread
+            entry['results'] = {key: list(value) if isinstance(value, list) else value
+                                for key, value in list(results.items())}
+        return entry
+
+
+class JobManager:
+    def __init__(self, origin, destination, workers=None, on_finished=None):
+        """
+        Args:
+            origin (StorageBackend): Origem (ex.: GoogleDriveManager)
+            destination (StorageBackend): Destino (ex.: AzureBlobManager)
+            workers (int): Transferências simultâneas somando todos os jobs
+            on_finished (callable): Chamada como on_finished(job) quando um
+                                    job termina (concluído, cancelado ou com erro)
+        """
+        self.origin = origin
+        self.destination = destination
+        self.on_finished = on_finished
+        self.scheduler = JobScheduler(workers=workers)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, files, priority='normal', name=None, source='api', max_mb_s=None):
+        """
+        Cria um job e o coloca na fila (retorna sem esperar)
+
+        Args:
+            files (list): Arquivos da origem ('id', 'name' e, se possível,
+                          'size' e 'md5Checksum')
+            priority: 'low', 'normal', 'high' ou um inteiro (maior = antes)
+            name (str): Descrição do job
+            source (str): Origem no histórico de transferências
+            max_mb_s (float): Limite de banda do job (padrão:
+                              JOB_BANDWIDTH_LIMIT_MB_S; 0 = sem limite)
+
+        Returns:
+            TransferJob: Use wait(job) para esperar o fim
+        """
+        job = TransferJob(files, parse_priority(priority), name, source, max_mb_s)
+        history = begin_batch(source)
+
+        def run(file):
+            job.status = 'running'
+            return track(job.progress, file, lambda file_progress: transfer_file(
+                self.origin, self.destination, file,
+                enqueued_at=job.enqueued_at, cancel=job.cancel, progress=file_progress,
+                limiter=job.limiter
+            ))
+
+        def on_result(file, result):
+            record_result(job.results, result)
+            if history:
+                history.add(result)
+
+        def on_done(scheduled):
+            for file in scheduled.skipped:
+                on_result(file, {'name': file['name'], 'status': 'cancelled',
+                                 'error': 'Transferência cancelada'})
+            if scheduled.error is not None:
+                job.status = 'error'
+                job.results['error'] = str(scheduled.error)
+            else:
+                job.status = 'cancelled' if job.cancel.cancelled else 'completed'
+            job.results['elapsed_s'] = round(time.perf_counter() - job.enqueued_at, 3)
+            job.finished_at = datetime.now().isoformat()
+            if history:
+                history.finish(job.results)
+            if self.on_finished is not None:
+                self.on_finished(job)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+            job.scheduled = self.scheduler.submit(
+                plan_batch(files), run, priority=job.priority,
+                on_result=on_result, on_done=on_done, cancel=job.cancel
+            )
+        return job
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def wait(self, job, timeout=None):
+        """Espera o job terminar; retorna False se o tempo acabou antes"""
+        return job.scheduled.wait(timeout)
+
+    def get(self, job_id):
+        """Retorna o job, ou None se não existe neste processo"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """Jobs deste processo, do mais recente para o mais antigo"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def set_limit(self, job_id, max_mb_s):
+        """
+        Troca o limite de banda de um job (vale a partir do próximo bloco)
+
+        Returns:
+            TransferJob: O job (None se não existe neste processo)
+        """
+        job = self.get(job_id)
+        if job is not None:
+            job.bucket.set_rate(mb_s_to_bytes(max_mb_s))
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancela um job na fila ou em execução
+
+        Returns:
+            TransferJob: O job (None se não existe neste processo)
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished_at:
+            self.scheduler.cancel(job.scheduled)
+        return job
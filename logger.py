@@ -0,0 +1,163 @@
+"""
+Logging estruturado e assíncrono
+
+As mensagens vão para uma fila em memória e são escritas por uma thread
+própria, então quem registra a mensagem (ex.: a listagem de 100 mil
+arquivos) não espera pela escrita no terminal ou no log do contêiner.
+
+Num processo filho de fork (ex.: workers do gunicorn --preload) a fila e
+a thread de escrita são recriadas, já que a thread do pai não existe no
+filho.
+
+Por padrão (LOG_LEVEL=INFO) só saem resumos; as linhas por arquivo são
+DEBUG. Com LOG_FORMAT=json cada mensagem é um objeto JSON por linha, com
+os campos passados em 'extra' (ex.: file_id, size).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from config import LOG_LEVEL, LOG_FORMAT
+
+ROOT_LOGGER = 'gdrive_azure'
+
+# Atributos que todo LogRecord tem; o restante veio de 'extra'
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+def _fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    """Mensagem como antes dos logs (com emojis), seguida dos campos extras"""
+
+    def format(self, record):
+        text = record.getMessage()
+        fields = _fields(record)
+        if fields:
+            text += '  ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            text += '\n' + record.exc_text
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha, para ferramentas de coleta de logs"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(_fields(record))
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _Flush:
+    """Marcador colocado na fila por flush_logs()"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class _Listener(logging.handlers.QueueListener):
+    def handle(self, record):
+        if isinstance(record, _Flush):
+            record.event.set()
+            return
+        super().handle(record)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Formata a exceção agora (o traceback não sobrevive à fila), mas
+        # mantém msg/args e os campos extras para o formatter da thread
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener = None
+_queue = None
+_handler = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level=None, fmt=None, stream=None):
+    """
+    Configura o logging da aplicação (apenas na primeira chamada)
+
+    Args:
+        level (str): DEBUG, INFO, WARNING ou ERROR (padrão: LOG_LEVEL)
+        fmt (str): 'text' ou 'json' (padrão: LOG_FORMAT)
+        stream: Destino das mensagens (padrão: stderr)
+    """
+    global _listener, _queue, _handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if (fmt or LOG_FORMAT) == 'json' else TextFormatter())
+
+        _queue = queue.SimpleQueue()
+        _listener = _Listener(_queue, output)
+        _listener.start()
+        atexit.register(_stop)
+
+        _handler = _QueueHandler(_queue)
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel((level or LOG_LEVEL).upper())
+        logger.addHandler(_handler)
+        logger.propagate = False
+
+
+def _stop():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_after_fork():
+    # O filho herda a fila, mas não a thread que a esvazia: sem isto as
+    # mensagens ficariam acumuladas na fila para sempre. O que já estava
+    # na fila copiada é escrito pelo pai.
+    global _listener, _queue, _setup_lock
+    _setup_lock = threading.Lock()
+    if _listener is None:
+        return
+    _queue = queue.SimpleQueue()
+    _listener = _Listener(_queue, *_listener.handlers)
+    _listener.start()
+    _handler.queue = _queue
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name):
+    """Retorna o logger de um módulo da aplicação"""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def flush_logs(timeout=2.0):
+    """Espera as mensagens da fila serem escritas (ex.: antes de um input())"""
+    if _queue is None:
+        return
+    marker = _Flush()
+    _queue.put(marker)
+    marker.event.wait(timeout)
@@ -1,20 +1,73 @@
 """
 Aplicação Principal - Transferência de Arquivos do Google Drive para Azure Blob Storage
+
+Sem argumentos abre o menu interativo. Com argumentos roda em lote, sem
+interação (cron, contêineres):
+
+    python main.py --folder ID --container NOME --workers 8 \
+                   --include "*.pdf" --exclude "rascunho*" --report ndjson
+
+Para dividir a transferência entre vários processos ou máquinas, rode o
+mesmo comando em cada um com --shards N e o mesmo --job.
+
+Com --mirror o contêiner passa a espelhar a pasta: arquivos novos e
+alterados são enviados e blobs que não existem mais no Drive são deletados.
+
+Com --sync o processo fica rodando e, a cada SYNC_INTERVAL_SECONDS, envia
+só os arquivos que mudaram na pasta (pelas mudanças do Drive).
+
+Com --restore o sentido se inverte: os blobs do --container são enviados
+para a pasta --folder do Google Drive (uploads retomáveis).
 """
+import argparse
+import contextlib
+import fnmatch
+import json
+import logging
+import os
+import signal
+import socket
 import sys
+import threading
 from datetime import datetime
 from google_drive_manager import GoogleDriveManager
 from azure_blob_manager import AzureBlobManager
-from config import validate_config, GOOGLE_DRIVE_FOLDER_ID, AZURE_CONTAINER_NAME
+from config import (
+    validate_config, GOOGLE_DRIVE_FOLDER_ID, AZURE_CONTAINER_NAME, API_CALL_BUDGET_PER_FILE,
+    TRANSFER_SOURCE, TRANSFER_SINK
+)
+from bandwidth import global_bucket, mb_s_to_bytes
+from scheduler import file_size, plan_batch
+from transfer_engine import (
+    api_calls_per_file, blob_to_item, restore_batch, throughput_mb_s, transfer_batch
+)
+from sharding import COORDINATION_PREFIX, run_sharded
+from mirror import plan_mirror, run_mirror
+from packing import PACK_FORMATS, PACK_ROOT, pack_files
+from sync_daemon import SyncDaemon
+from logger import flush_logs, get_logger
+from progress import ProgressTracker
+from storage import open_backend, uses_cloud
+from drive_query import FOLDER_MIME_TYPE
+
+# Intervalo entre as mensagens de progresso de uma transferência (menu e lote)
+PROGRESS_INTERVAL_S = 1.0
+BATCH_PROGRESS_INTERVAL_S = 10.0
+
+# Arquivos bem-sucedidos listados no relatório (o resumo traz o total)
+REPORT_MAX_FILES = 20
+
+logger = get_logger('main')
 
 def print_header(title):
     """Exibe um cabeçalho formatado"""
+    flush_logs()
     print("\n" + "="*70)
     print(f"  {title}")
     print("="*70 + "\n")
 
 def print_status(message, status_type="info"):
-    """Exibe mensagem com formatação de status"""
+    """Registra mensagem de status no log, com o ícone do tipo"""
     icons = {
         "info": "ℹ️ ",
         "success": "✅ ",
@@ -22,47 +75,84 @@ def print_status(message, status_type="info"):
         "warning": "⚠️  ",
         "progress": "⏳ "
     }
+    levels = {
+        "error": logging.ERROR,
+        "warning": logging.WARNING
+    }
     icon = icons.get(status_type, "ℹ️ ")
-    print(f"{icon} {message}")
+    logger.log(levels.get(status_type, logging.INFO), f"{icon} {message}")
 
-def list_google_drive_files(gdrive_manager):
-    """Lista arquivos do Google Drive"""
-    print_header("LISTAR ARQUIVOS DO GOOGLE DRIVE")
-    files = gdrive_manager.list_files_in_folder()
+def list_backend_files(backend, title):
+    """Lista os arquivos de uma origem ou destino (StorageBackend)"""
+    print_header(f"LISTAR ARQUIVOS {title} ({backend.kind})")
+    files = backend.list_files()
+    flush_logs()
+    
+    # A listagem é a resposta pedida no menu: uma linha por arquivo, numa única escrita
+    print('\n'.join(
+        f"   {idx}. {file['name']}  ({round(int(file.get('size') or 0) / (1024 * 1024), 2)} MB, "
+        f"{file.get('mimeType') or 'tipo desconhecido'}, modificado {file.get('modifiedTime') or 'N/A'})"
+        for idx, file in enumerate(files, 1)
+    ) or "   Nenhum arquivo encontrado!")
     return files
 
-def list_azure_blobs(azure_manager):
-    """Lista blobs do Azure Blob Storage"""
-    print_header("LISTAR BLOBS DO AZURE BLOB STORAGE")
-    blobs = azure_manager.list_blobs()
-    return blobs
+def format_progress(snapshot):
+    """Linha de progresso: arquivos, MB, porcentagem, vazão e tempo restante"""
+    mb = 1024 * 1024
+    text = (f"⏳ {snapshot['files_done']}/{snapshot['files_total']} arquivo(s), "
+            f"{snapshot['bytes_done'] / mb:.1f}/{snapshot['bytes_total'] / mb:.1f} MB "
+            f"({snapshot['percent']}%), {snapshot['rate_mb_s']} MB/s")
+    if snapshot['eta_s'] is not None and snapshot['bytes_done'] < snapshot['bytes_total']:
+        text += f", faltam ~{snapshot['eta_s']:.0f}s"
+    return text
 
-def transfer_files(gdrive_manager, azure_manager, files_to_transfer=None):
+@contextlib.contextmanager
+def progress_reporter(tracker, interval=PROGRESS_INTERVAL_S):
+    """Registra o progresso do lote a cada 'interval' segundos enquanto ele roda"""
+    stop = threading.Event()
+    
+    def report():
+        while not stop.wait(interval):
+            snapshot = tracker.snapshot()
+            logger.info(format_progress(snapshot), extra={
+                'bytes_done': snapshot['bytes_done'],
+                'bytes_total': snapshot['bytes_total'],
+                'rate_mb_s': snapshot['rate_mb_s'],
+                'eta_s': snapshot['eta_s']
+            })
+            # Arquivos grandes em andamento, com a fase e a vazão de cada um
+            for active in snapshot['active']:
+                logger.debug("   ↳ %s: %s %.1f/%.1f MB, %s MB/s", active['name'], active['phase'],
+                             (active['uploaded'] if active['phase'] == 'upload'
+                              else active['downloaded']) / (1024 * 1024),
+                             active['bytes_total'] / (1024 * 1024), active['rate_mb_s'])
+    
+    thread = threading.Thread(target=report, name='progress', daemon=True)
+    thread.start()
+    try:
+        yield tracker
+    finally:
+        stop.set()
+        thread.join()
+
+def transfer_files(origin, destination, files_to_transfer=None):
     """
-    Transfere arquivos do Google Drive para Azure Blob Storage
+    Transfere arquivos da origem para o destino (Google Drive → Azure Blob Storage)
     
     Args:
-        gdrive_manager: Gerenciador do Google Drive
-        azure_manager: Gerenciador do Azure Blob Storage
+        origin (StorageBackend): Origem (ex.: GoogleDriveManager)
+        destination (StorageBackend): Destino (ex.: AzureBlobManager)
         files_to_transfer: Lista de IDs de arquivos ou None (para transferir todos)
     """
     print_header("INICIANDO TRANSFERÊNCIA DE ARQUIVOS")
     
-    # Obter lista de arquivos
-    all_files = gdrive_manager.list_files_in_folder()
+    # Obter lista de arquivos (sem pastas)
+    all_files = origin.list_files()
     
     if not all_files:
         print_status("Nenhum arquivo para transferir", "warning")
         return None
     
-    # Filtrar apenas ARQUIVOS (não pastas/folders)
-    # Pastas têm tipo 'application/vnd.google-apps.folder'
-    all_files = [f for f in all_files if f.get('mimetype', '').lower() != 'application/vnd.google-apps.folder']
-    
-    if not all_files:
-        print_status("Nenhum arquivo encontrado (apenas pastas no Google Drive)", "warning")
-        return None
-    
     # Filtrar arquivos se especificado
     if files_to_transfer:
         files = [f for f in all_files if f['id'] in files_to_transfer]
@@ -76,59 +166,36 @@ def transfer_files(gdrive_manager, azure_manager, files_to_transfer=None):
     # Estatísticas
     total_files = len(files)
     print_status(f"Total de arquivos para transferir: {total_files}", "progress")
-    print()
     
-    # Resultados
-    transfer_results = {
-        'success': [],
-        'failed': [],
-        'total': total_files,
-        'timestamp': datetime.now().isoformat()
-    }
+    # Transferir em paralelo: cada arquivo em DEBUG, falhas sempre e o
+    # progresso em bytes (vazão e tempo restante) a cada PROGRESS_INTERVAL_S
+    completed = 0
+    tracker = ProgressTracker(files)
     
-    # Transferir cada arquivo
-    for idx, file in enumerate(files, 1):
-        file_id = file['id']
-        file_name = file['name']
-        file_size_mb = round(int(file.get('size', 0)) / (1024 * 1024), 2)
-        
-        print(f"[{idx}/{total_files}] Transferindo: {file_name}")
-        print(f"          Tamanho: {file_size_mb} MB")
-        
-        # Baixar do Google Drive
-        print(f"          ⬇️  Baixando do Google Drive...", end=" ")
-        file_content = gdrive_manager.download_file(file_id, file_name)
-        
-        if file_content is None:
-            print("❌ Falha!")
-            transfer_results['failed'].append({
-                'name': file_name,
-                'error': 'Falha ao baixar do Google Drive'
-            })
-            continue
-        
-        print("✅ OK")
+    def show_result(file, result):
+        nonlocal completed
+        completed += 1
+        timings = result.get('timings', {})
         
-        # Enviar para Azure Blob Storage
-        print(f"          ⬆️  Enviando para Azure...", end=" ")
-        upload_result = azure_manager.upload_blob(file_name, file_content, overwrite=True)
-        
-        if upload_result['status'] == 'success':
-            print("✅ OK")
-            transfer_results['success'].append({
-                'name': file_name,
-                'size_mb': upload_result['size_mb']
+        if result['status'] == 'success':
+            logger.debug("[%d/%d] ✅ %s", completed, total_files, file['name'], extra={
+                'size': int(file.get('size', 0)),
+                'download_s': timings.get('download_s', 0),
+                'upload_s': timings.get('upload_s', 0),
+                'queue_wait_s': timings.get('queue_wait_s', 0)
             })
+        elif result['status'] == 'cancelled':
+            logger.info("[%d/%d] ⏹️ %s: cancelado", completed, total_files, file['name'])
         else:
-            print("❌ Falha!")
-            transfer_results['failed'].append({
-                'name': file_name,
-                'error': upload_result.get('error', 'Erro desconhecido')
-            })
-        
-        print()
+            logger.warning("[%d/%d] ❌ %s: %s", completed, total_files, file['name'],
+                           result.get('error', 'Erro desconhecido'))
     
-    return transfer_results
+    with progress_reporter(tracker):
+        results = transfer_batch(origin, destination, files, on_result=show_result,
+                                 source='cli', progress=tracker)
+    logger.info(format_progress(tracker.snapshot()))
+    flush_logs()
+    return results
 
 def print_transfer_report(results):
     """Exibe relatório de transferência"""
@@ -139,6 +206,7 @@ def print_transfer_report(results):
     
     success_count = len(results['success'])
     failed_count = len(results['failed'])
+    cancelled_count = len(results.get('cancelled', []))
     total_count = results['total']
     
     print(f"Timestamp: {results['timestamp']}\n")
@@ -148,41 +216,52 @@ def print_transfer_report(results):
     print(f"   Total de arquivos: {total_count}")
     print(f"   ✅ Sucesso: {success_count}")
     print(f"   ❌ Falhas: {failed_count}")
-    print(f"   Taxa de sucesso: {round((success_count/total_count)*100, 1)}%\n")
+    if cancelled_count:
+        print(f"   ⏹️ Cancelados: {cancelled_count}")
+    print(f"   Taxa de sucesso: {round((success_count/total_count)*100, 1)}%")
+    print(f"   Chamadas de API por arquivo: {api_calls_per_file(results)}")
+    if API_CALL_BUDGET_PER_FILE:
+        print(f"   Acima do orçamento ({API_CALL_BUDGET_PER_FILE}/arquivo): {results['over_budget']}")
+    print()
     
     # Arquivos bem-sucedidos
     if results['success']:
         print("✅ ARQUIVOS TRANSFERIDOS COM SUCESSO:")
-        total_size = 0
-        for file in results['success']:
-            print(f"   • {file['name']} ({file['size_mb']} MB)")
-            total_size += file['size_mb']
-        print(f"   Total transferido: {round(total_size, 2)} MB\n")
+        lines = []
+        for file in results['success'][:REPORT_MAX_FILES]:
+            total_s = file.get('timings', {}).get('total_s', 0)
+            lines.append(f"   • {file['name']} ({file['size_mb']} MB em {total_s:.2f}s)")
+        hidden = len(results['success']) - REPORT_MAX_FILES
+        if hidden > 0:
+            lines.append(f"   ... e mais {hidden} arquivo(s)")
+        total_size = sum(file['size_mb'] for file in results['success'])
+        lines.append(f"   Total transferido: {round(total_size, 2)} MB\n")
+        print('\n'.join(lines))
     
     # Arquivos com falha
     if results['failed']:
         print("❌ ARQUIVOS COM FALHA:")
         for file in results['failed']:
             print(f"   • {file['name']}")
-            print(f"     Erro: {file['error']}\n")
+            print(f"     Erro: {file.get('error', 'Erro desconhecido')}\n")
 
 def interactive_menu():
     """Menu interativo da aplicação"""
     print_header("TRANSFERÊNCIA GOOGLE DRIVE → AZURE BLOB STORAGE")
     
-    # Validar configurações
-    if not validate_config():
+    # Validar configurações (só o Drive e o Azure precisam de credenciais)
+    if uses_cloud(TRANSFER_SOURCE, TRANSFER_SINK) and not validate_config():
         sys.exit(1)
     
-    # Inicializar gerenciadores
-    print("\n⏳ Inicializando conexões...")
+    # Inicializar origem e destino (TRANSFER_SOURCE / TRANSFER_SINK)
+    print_status("Inicializando conexões...", "progress")
     try:
-        gdrive_manager = GoogleDriveManager()
-        azure_manager = AzureBlobManager()
+        origin = open_backend(TRANSFER_SOURCE)
+        destination = open_backend(TRANSFER_SINK)
         
-        # Criar contêiner se não existir
-        print("\n⏳ Verificando contêiner do Azure...")
-        azure_manager.create_container_if_not_exists()
+        # Criar contêiner (ou pasta) de destino se não existir
+        print_status("Verificando destino...", "progress")
+        destination.prepare()
         
     except Exception as e:
         print_status(f"Erro ao inicializar: {e}", "error")
@@ -191,22 +270,24 @@ def interactive_menu():
     print("\n" + "="*70 + "\n")
     
     while True:
+        # As mensagens da fila de logs saem antes do menu
+        flush_logs()
         print("OPÇÕES:")
-        print("  1. Listar arquivos do Google Drive")
-        print("  2. Listar blobs do Azure Blob Storage")
+        print(f"  1. Listar arquivos da origem ({origin.kind})")
+        print(f"  2. Listar arquivos do destino ({destination.kind})")
         print("  3. Transferir TODOS os arquivos")
         print("  4. Sair\n")
         
         choice = input("Selecione uma opção (1-4): ").strip()
         
         if choice == '1':
-            list_google_drive_files(gdrive_manager)
+            list_backend_files(origin, "DA ORIGEM")
         
         elif choice == '2':
-            list_azure_blobs(azure_manager)
+            list_backend_files(destination, "DO DESTINO")
         
         elif choice == '3':
-            results = transfer_files(gdrive_manager, azure_manager)
+            results = transfer_files(origin, destination)
             print_transfer_report(results)
         
         elif choice == '4':
@@ -216,15 +297,373 @@ def interactive_menu():
         else:
             print_status("Opção inválida", "error")
 
+def parse_args(argv=None):
+    """Lê os argumentos do modo em lote"""
+    parser = argparse.ArgumentParser(
+        description="Transferência Google Drive → Azure Blob Storage em lote (sem interação)"
+    )
+    parser.add_argument('--folder', default=GOOGLE_DRIVE_FOLDER_ID,
+                        help="ID da pasta de origem no Google Drive")
+    parser.add_argument('--container', default=AZURE_CONTAINER_NAME,
+                        help="Contêiner de destino no Azure")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Transferências simultâneas (padrão: MAX_WORKERS)")
+    parser.add_argument('--include', action='append', default=[], metavar='PADRÃO',
+                        help="Transfere só nomes que casam com o padrão (ex.: '*.pdf'); pode repetir")
+    parser.add_argument('--exclude', action='append', default=[], metavar='PADRÃO',
+                        help="Ignora nomes que casam com o padrão; pode repetir")
+    parser.add_argument('--mime-type', action='append', default=[], metavar='TIPO',
+                        help="Transfere só arquivos deste tipo MIME (ex.: application/pdf); pode repetir")
+    parser.add_argument('--modified-since', default=None, metavar='DATA',
+                        help="Transfere só arquivos modificados depois da data (ex.: 2024-01-31T00:00:00)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Só lista o que seria transferido")
+    parser.add_argument('--report', choices=['json', 'ndjson'], default='json',
+                        help="Formato do relatório: json (um documento) ou ndjson (uma linha por arquivo)")
+    parser.add_argument('--output', default='-',
+                        help="Arquivo do relatório ('-' = saída padrão)")
+    parser.add_argument('--also-container', action='append', default=[], metavar='NOME',
+                        help="Também envia cada arquivo para este contêiner (fan-out, um único download); pode repetir")
+    parser.add_argument('--shards', type=int, default=0,
+                        help="Modo distribuído: divide a pasta em N shards coordenados por leases de blob")
+    parser.add_argument('--job', default=None,
+                        help="Nome do job distribuído (padrão: ID da pasta)")
+    parser.add_argument('--worker-id', default=None,
+                        help="Identificação deste worker (padrão: host e PID)")
+    parser.add_argument('--mirror', action='store_true',
+                        help="Espelha a pasta no contêiner: envia novos/alterados e deleta os removidos do Drive")
+    parser.add_argument('--no-delete', action='store_true',
+                        help="Com --mirror, mantém os blobs que não existem mais no Drive")
+    parser.add_argument('--sync', action='store_true',
+                        help="Sincronização contínua: envia só os arquivos que mudaram, a cada SYNC_INTERVAL_SECONDS")
+    parser.add_argument('--interval', type=float, default=None,
+                        help="Com --sync, segundos entre os ciclos (padrão: SYNC_INTERVAL_SECONDS)")
+    parser.add_argument('--delete', action='store_true',
+                        help="Com --sync, deleta os blobs de arquivos removidos, movidos ou renomeados no Drive "
+                             "(a sincronização inicial nunca deleta)")
+    parser.add_argument('--once', action='store_true',
+                        help="Com --sync, executa um único ciclo e sai (ex.: cron)")
+    parser.add_argument('--restore', action='store_true',
+                        help="Sentido inverso: envia os blobs do contêiner para a pasta do Google Drive")
+    parser.add_argument('--pack', default=None, metavar='NOME',
+                        help="Empacota os arquivos pequenos em shards '_packs/NOME/' com um índice (ver PACK_MAX_FILE_MB)")
+    parser.add_argument('--pack-format', choices=PACK_FORMATS, default=None,
+                        help="Formato dos shards do --pack (padrão: PACK_FORMAT)")
+    parser.add_argument('--max-mb-s', type=float, default=None, metavar='MB/S',
+                        help="Limite de banda do processo, download + upload (padrão: BANDWIDTH_LIMIT_MB_S; 0 = sem limite)")
+    args = parser.parse_args(argv)
+    # Cada modo segue um caminho próprio em run_batch/run_sync: combinados,
+    # só um deles rodaria e os demais seriam ignorados em silêncio
+    modes = [flag for flag, enabled in (('--mirror', args.mirror), ('--restore', args.restore),
+                                        ('--pack', args.pack), ('--shards', args.shards),
+                                        ('--sync', args.sync)) if enabled]
+    if len(modes) > 1:
+        parser.error(f"{', '.join(modes[:-1])} e {modes[-1]} não podem ser usados juntos")
+    if args.also_container and modes and modes[0] != '--shards':
+        parser.error(f"--also-container não pode ser usado com {modes[0]}")
+    if args.restore and (args.mime_type or args.modified_since):
+        parser.error("--mime-type e --modified-since filtram o Drive e não se aplicam a --restore")
+    if args.sync and args.dry_run:
+        parser.error("--dry-run não pode ser usado com --sync")
+    if args.mirror and not args.no_delete and (args.mime_type or args.modified_since):
+        # Os blobs não têm tipo nem data do Drive: com a listagem do Drive
+        # reduzida, os blobs dos arquivos filtrados seriam deletados
+        parser.error("--mime-type e --modified-since não podem ser usados com --mirror "
+                     "(use --no-delete para só enviar novos e alterados)")
+    if args.delete and not args.sync:
+        parser.error("--delete só pode ser usado com --sync (com --mirror a deleção é o padrão)")
+    return args
+
+def filter_files(files, include=None, exclude=None):
+    """
+    Remove pastas e aplica os filtros de nome localmente
+    
+    Usado para os blobs (restauração e espelhamento); na listagem do Drive
+    os filtros vão na consulta (ver build_query).
+    
+    Args:
+        files (iterable): Arquivos ou blobs (dicionários com 'name')
+        include (list): Padrões fnmatch; se informado, o nome deve casar com um deles
+        exclude (list): Padrões fnmatch; nomes que casam são ignorados
+    
+    Returns:
+        list: Arquivos selecionados
+    """
+    selected = []
+    for file in files:
+        name = file['name']
+        if file.get('mimeType') == FOLDER_MIME_TYPE:
+            continue
+        if include and not any(fnmatch.fnmatch(name, pattern) for pattern in include):
+            continue
+        if exclude and any(fnmatch.fnmatch(name, pattern) for pattern in exclude):
+            continue
+        selected.append(file)
+    return selected
+
+def build_query(gdrive_manager, args, *fields):
+    """
+    Consulta do Drive com os filtros do modo em lote
+    
+    Pastas, tipos MIME, data de modificação e nomes exatos ou com curinga
+    no fim são filtrados pelo próprio Drive; os demais padrões de nome,
+    localmente durante a listagem.
+    """
+    return (gdrive_manager.query(args.folder)
+            .files_only()
+            .mime_types(*args.mime_type)
+            .modified_since(args.modified_since)
+            .name_matches(*args.include)
+            .name_excludes(*args.exclude)
+            .fields('id', 'name', 'size', 'md5Checksum', *fields))
+
+def file_report(file, result=None):
+    """Linha de relatório de um arquivo (planejado ou transferido)"""
+    entry = {
+        'type': 'file',
+        'id': file.get('id'),
+        'name': file['name'],
+        'size': file_size(file)
+    }
+    if result is None:
+        entry['status'] = 'planned'
+    else:
+        entry.update({key: value for key, value in result.items() if key != 'name'})
+    return entry
+
+def run_sync(args):
+    """
+    Executa a sincronização contínua (ou um ciclo, com --once)
+    
+    Cada arquivo transferido é uma linha NDJSON em --output; SIGTERM e
+    Ctrl+C encerram depois do ciclo em andamento.
+    
+    Returns:
+        int: Código de saída (0 = tudo certo, 1 = falhas no ciclo, 2 = erro de configuração)
+    """
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+    lock = threading.Lock()
+    
+    def on_result(file, result):
+        with lock:
+            out.write(json.dumps(dict(file_report(file, result), timestamp=datetime.now().isoformat()),
+                                 default=str) + '\n')
+            out.flush()
+    
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if not validate_config():
+                return 2
+            
+            daemon = SyncDaemon(
+                GoogleDriveManager(), AzureBlobManager(container_name=args.container),
+                folder_id=args.folder, interval=args.interval, delete=args.delete,
+                workers=args.workers, on_result=on_result
+            )
+            if args.once:
+                results = daemon.sync_once()
+                return 1 if results['failed'] else 0
+            
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+            try:
+                daemon.run(stop_event)
+            except KeyboardInterrupt:
+                pass
+            return 0
+    
+    finally:
+        flush_logs()
+        if out is not sys.stdout:
+            out.close()
+
+def run_batch(args):
+    """
+    Executa a transferência em lote e escreve o relatório
+    
+    Mensagens de progresso vão para stderr; o relatório (JSON ou NDJSON)
+    vai para --output, para poder ser lido por outras ferramentas.
+    
+    Returns:
+        int: Código de saída (0 = tudo certo, 1 = falhas, 2 = erro de configuração)
+    """
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    def emit(entry):
+        if args.report == 'ndjson':
+            out.write(json.dumps(entry, default=str) + '\n')
+            out.flush()
+    
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if not validate_config():
+                return 2
+            
+            gdrive_manager = GoogleDriveManager()
+            azure_manager = AzureBlobManager(container_name=args.container)
+            
+            plan = None
+            if args.mirror:
+                # Listagens paginadas dos dois lados, cruzadas em uma passagem
+                blobs = ()
+                if azure_manager.container_client.exists():
+                    blobs = (blob_to_item(blob) for blob in azure_manager.iter_blobs())
+                plan = plan_mirror(
+                    gdrive_manager.iter_files_in_folder(
+                        query=build_query(gdrive_manager, args, 'modifiedTime')
+                    ),
+                    filter_files(blobs, include=args.include, exclude=args.exclude)
+                )
+                files = plan['add'] + plan['update']
+                logger.info("🪞 Espelhamento: %d novos, %d alterados, %d removidos, %d sem mudança",
+                            len(plan['add']), len(plan['update']), len(plan['delete']),
+                            plan['unchanged'])
+            elif args.restore:
+                blobs = [blob_to_item(blob) for blob in azure_manager.list_blobs()
+                         if not blob.name.startswith((COORDINATION_PREFIX + '/', PACK_ROOT + '/'))]
+                files = filter_files(blobs, include=args.include, exclude=args.exclude)
+            else:
+                files = gdrive_manager.list_files_in_folder(
+                    query=build_query(gdrive_manager, args)
+                )
+            
+            if args.dry_run and plan is not None:
+                entries = [dict(file_report(file), action='add') for file in plan['add']]
+                entries += [dict(file_report(file), action='update') for file in plan['update']]
+                if not args.no_delete:
+                    entries += [{'type': 'file', 'name': name, 'status': 'planned', 'action': 'delete'}
+                                for name in plan['delete']]
+                for entry in entries:
+                    emit(entry)
+                results = None
+            elif args.dry_run:
+                entries = [file_report(file) for file in plan_batch(files)]
+                for entry in entries:
+                    emit(entry)
+                results = None
+            elif args.restore:
+                entries = []
+                
+                def on_result(blob, result):
+                    entry = file_report(blob, result)
+                    entries.append(entry)
+                    emit(entry)
+                    logger.debug("[%d/%d] %s: %s", len(entries), len(files), blob['name'], result['status'])
+                
+                tracker = ProgressTracker(files)
+                with progress_reporter(tracker, BATCH_PROGRESS_INTERVAL_S):
+                    results = restore_batch(
+                        azure_manager, gdrive_manager, files,
+                        folder_id=args.folder, workers=args.workers, on_result=on_result,
+                        progress=tracker
+                    )
+            else:
+                azure_manager.create_container_if_not_exists()
+                targets = [AzureBlobManager(container_name=name) for name in args.also_container]
+                for target in targets:
+                    target.create_container_if_not_exists()
+                entries = []
+                
+                def on_result(file, result):
+                    entry = file_report(file, result)
+                    entries.append(entry)
+                    emit(entry)
+                    logger.debug("[%d/%d] %s: %s", len(entries), len(files), file['name'], result['status'])
+                
+                if plan is not None:
+                    results = run_mirror(
+                        gdrive_manager, azure_manager, plan,
+                        workers=args.workers, delete=not args.no_delete, on_result=on_result
+                    )
+                elif args.pack:
+                    tracker = ProgressTracker(files)
+                    with progress_reporter(tracker, BATCH_PROGRESS_INTERVAL_S):
+                        results = pack_files(
+                            gdrive_manager, azure_manager, files, args.pack,
+                            fmt=args.pack_format, workers=args.workers, on_result=on_result,
+                            progress=tracker
+                        )
+                elif args.shards:
+                    results = run_sharded(
+                        gdrive_manager, azure_manager, files,
+                        shard_count=args.shards,
+                        job_name=args.job or args.folder,
+                        worker_id=args.worker_id or f"{socket.gethostname()}-{os.getpid()}",
+                        workers=args.workers, on_result=on_result, targets=targets
+                    )
+                else:
+                    tracker = ProgressTracker(files)
+                    with progress_reporter(tracker, BATCH_PROGRESS_INTERVAL_S):
+                        results = transfer_batch(
+                            gdrive_manager, azure_manager, files,
+                            workers=args.workers, on_result=on_result, targets=targets,
+                            progress=tracker
+                        )
+        
+        summary = {
+            'type': 'summary',
+            'timestamp': datetime.now().isoformat(),
+            'folder_id': args.folder,
+            'container': args.container,
+            'also_containers': args.also_container,
+            'direction': 'azure-to-drive' if args.restore else 'drive-to-azure',
+            'dry_run': args.dry_run,
+            'total': len(files),
+            'bytes_planned': sum(file_size(file) for file in files)
+        }
+        if results is not None:
+            summary.update({
+                'success': len(results['success']),
+                'failed': len(results['failed']),
+                'bytes': results['bytes'],
+                'elapsed_s': results['elapsed_s'],
+                'throughput_mb_s': throughput_mb_s(results),
+                'api_calls_per_file': api_calls_per_file(results)
+            })
+            if 'shards' in results:
+                summary['shards'] = results['shards']
+                summary['unfinished_shards'] = results['unfinished_shards']
+            if 'deleted' in results:
+                summary['deleted'] = results['deleted']
+            if 'pack' in results:
+                summary['pack'] = results['pack']
+        if plan is not None:
+            summary['mirror'] = {
+                'add': len(plan['add']),
+                'update': len(plan['update']),
+                'delete': 0 if args.no_delete else len(plan['delete']),
+                'unchanged': plan['unchanged'],
+                'duplicates': [file['name'] for file in plan['duplicates']]
+            }
+        
+        if args.report == 'ndjson':
+            emit(summary)
+        else:
+            summary['files'] = entries
+            json.dump(summary, out, default=str, indent=2)
+            out.write('\n')
+        
+        return 1 if results is not None and results['failed'] else 0
+    
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 def main():
     """Função principal"""
+    if len(sys.argv) > 1:
+        args = parse_args()
+        if args.max_mb_s is not None:
+            global_bucket().set_rate(mb_s_to_bytes(args.max_mb_s))
+        sys.exit(run_sync(args) if args.sync else run_batch(args))
+    
     try:
         interactive_menu()
     except KeyboardInterrupt:
-        print("\n\n⚠️  Aplicação interrompida pelo usuário")
+        logger.warning("⚠️  Aplicação interrompida pelo usuário")
         sys.exit(0)
     except Exception as e:
-        print(f"\n❌ Erro não tratado: {e}")
+        logger.exception("❌ Erro não tratado: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""
+Espelhamento de uma pasta do Google Drive em um contêiner do Azure
+
+Compara as duas listagens em uma única passagem: os blobs são indexados
+por nome em um dicionário e os arquivos do Drive são conferidos contra o
+índice conforme chegam. O resultado é um plano com os arquivos novos, os
+alterados e os blobs que não existem mais no Drive; os dois primeiros
+seguem pelo transfer_batch e os removidos são deletados em lote.
+"""
+import time
+from datetime import datetime
+from packing import PACK_ROOT
+from sharding import COORDINATION_PREFIX
+from transfer_engine import record_result, transfer_batch
+
+
+def _md5_hex(value):
+    if not value:
+        return None
+    return value if isinstance(value, str) else bytes(value).hex()
+
+
+def is_current(file, blob):
+    """
+    Indica se o blob já tem o conteúdo atual do arquivo do Drive
+
+    Usa o MD5 quando os dois lados o têm; sem MD5, compara o tamanho e
+    considera alterado um arquivo modificado depois do blob.
+    """
+    file_md5 = file.get('md5Checksum')
+    blob_md5 = _md5_hex(blob.get('content_md5'))
+    if file_md5 and blob_md5:
+        return file_md5 == blob_md5
+
+    if 'size' in file and int(file['size']) != blob['size']:
+        return False
+
+    modified = file.get('modifiedTime')
+    last_modified = blob.get('last_modified')
+    if modified and last_modified:
+        return datetime.fromisoformat(modified.replace('Z', '+00:00')) <= last_modified
+    return True
+
+
+def plan_mirror(files, blobs):
+    """
+    Calcula o que precisa mudar no Azure para espelhar o Drive
+
+    Args:
+        files (iterable): Arquivos do Drive (já sem pastas)
+        blobs (iterable): Blobs como retornados por blob_to_item
+
+    Returns:
+        dict: 'add' e 'update' (arquivos do Drive), 'delete' (nomes de
+              blobs), 'unchanged' (quantidade) e 'duplicates' (arquivos
+              do Drive com nome repetido, que não podem ser espelhados)
+    """
+    index = {}
+    # Blobs de coordenação e de pacotes não correspondem a arquivos do Drive
+    for blob in blobs:
+        if not blob['name'].startswith((COORDINATION_PREFIX + '/', PACK_ROOT + '/')):
+            index[blob['name']] = blob
+
+    plan = {'add': [], 'update': [], 'delete': [], 'unchanged': 0, 'duplicates': []}
+    seen = set()
+    for file in files:
+        name = file['name']
+        if name in seen:
+            plan['duplicates'].append(file)
+            continue
+        seen.add(name)
+
+        blob = index.pop(name, None)
+        if blob is None:
+            plan['add'].append(file)
+        elif is_current(file, blob):
+            plan['unchanged'] += 1
+        else:
+            plan['update'].append(file)
+
+    plan['delete'] = list(index)
+    return plan
+
+
+def run_mirror(gdrive_manager, azure_manager, plan, workers=None, delete=True,
+               on_result=None):
+    """
+    Aplica um plano de espelhamento
+
+    Args:
+        gdrive_manager: Gerenciador do Google Drive
+        azure_manager: Gerenciador do Azure Blob Storage
+        plan (dict): Plano calculado por plan_mirror
+        workers (int): Transferências simultâneas (None = MAX_WORKERS)
+        delete (bool): Se False, mantém os blobs que saíram do Drive
+        on_result (callable): Chamada como on_result(file, resultado) para
+                              cada arquivo transferido e cada blob deletado
+
+    Returns:
+        dict: Resultados (ver new_results), com 'elapsed_s' e 'deleted'
+    """
+    started = time.perf_counter()
+    files = plan['add'] + plan['update']
+    results = transfer_batch(gdrive_manager, azure_manager, files,
+                             workers=workers, on_result=on_result, source='mirror')
+    results['deleted'] = 0
+
+    if delete and plan['delete']:
+        outcome = azure_manager.delete_blobs(plan['delete'])
+        results['deleted'] = len(outcome['deleted'])
+        results['total'] += len(plan['delete'])
+        deletions = [{'name': name, 'status': 'success', 'action': 'delete'}
+                     for name in outcome['deleted']]
+        deletions += [dict(failure, status='error', stage='delete', action='delete')
+                      for failure in outcome['failed']]
+        for result in deletions:
+            record_result(results, result)
+            if on_result:
+                on_result({'name': result['name']}, result)
+
+    results['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return results
@@ -0,0 +1,357 @@
+"""
+Empacotamento de arquivos pequenos em shards (tar ou zip)
+
+Com milhões de arquivos pequenos, o custo é o de cada requisição (um
+download e um PUT por arquivo), não o dos bytes. No modo --pack os
+arquivos pequenos são baixados em paralelo e gravados, em sequência, em
+shards de até PACK_SHARD_MB ('_packs/<nome>/shard-00000.tar'); cada shard
+é enviado ao Azure enquanto o próximo é montado. Ao fim, um índice
+compacto ('_packs/<nome>/index.json.gz') mapeia cada nome para o shard, o
+offset, o tamanho e o MD5, e PackReader lê um arquivo com uma única
+leitura em intervalo (ranged GET) do shard.
+
+Os membros são gravados sem compressão (tar ou zip STORED), para que o
+offset aponte direto para os bytes do arquivo. Os shards também podem ser
+baixados inteiros e abertos com tar/unzip.
+"""
+import gzip
+import hashlib
+import io
+import json
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import (
+    MAX_WORKERS, PACK_FORMAT, PACK_MAX_FILE_BYTES, PACK_SHARD_BYTES, UPLOAD_BLOCK_CONCURRENCY,
+    VERIFY_INTEGRITY
+)
+from history import begin_batch
+from logger import get_logger
+from transfer_engine import new_results, record_result, track, transfer_batch
+
+logger = get_logger('packing')
+
+# Blobs dos pacotes ficam fora do espelhamento e da restauração
+PACK_ROOT = '_packs'
+PACK_FORMATS = ('tar', 'zip')
+INDEX_BLOB = 'index.json.gz'
+INDEX_VERSION = 1
+
+# Downloads em andamento ou prontos à frente do shard, por worker
+PREFETCH_PER_WORKER = 4
+
+# Zip não representa datas anteriores a 1980
+_ZIP_MIN_MTIME = 315619200
+
+
+def pack_prefix(name):
+    """Pasta (prefixo de blob) de um pacote"""
+    return f"{PACK_ROOT}/{name.strip('/')}"
+
+
+def is_packable(file):
+    """Indica se o arquivo é pequeno o bastante para ir em um shard"""
+    size = file.get('size')
+    return size is not None and int(size) <= PACK_MAX_FILE_BYTES
+
+
+def _mtime(file):
+    modified = file.get('modifiedTime')
+    if modified:
+        return datetime.fromisoformat(modified.replace('Z', '+00:00')).timestamp()
+    return time.time()
+
+
+class ShardBuilder:
+    """Monta um shard em memória e registra onde começa cada membro"""
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.buffer = io.BytesIO()
+        # (nome, offset dos dados, tamanho, MD5)
+        self.members = []
+        if fmt == 'zip':
+            self._archive = zipfile.ZipFile(self.buffer, 'w', zipfile.ZIP_STORED)
+        else:
+            self._archive = tarfile.open(fileobj=self.buffer, mode='w',
+                                         format=tarfile.PAX_FORMAT)
+
+    @property
+    def size(self):
+        return self.buffer.tell()
+
+    def add(self, name, content, mtime, md5):
+        """Grava um membro e retorna o offset dos seus dados no shard"""
+        if self.format == 'zip':
+            info = zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, _ZIP_MIN_MTIME))[:6])
+            self._archive.writestr(info, content)
+            # Cabeçalho local: 30 bytes fixos + nome + campo extra
+            end = self.buffer.tell()
+            self.buffer.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', self.buffer.read(4))
+            self.buffer.seek(end)
+            offset = info.header_offset + 30 + name_length + extra_length
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = mtime
+            self._archive.addfile(info, io.BytesIO(content))
+            # Os dados terminam no fim do arquivo, completados até o bloco de 512
+            blocks = -(-len(content) // tarfile.BLOCKSIZE)
+            offset = self._archive.offset - blocks * tarfile.BLOCKSIZE
+        self.members.append((name, offset, len(content), md5))
+        return offset
+
+    def close(self):
+        """Fecha o arquivo (diretório do zip / blocos finais do tar) e retorna os bytes"""
+        self._archive.close()
+        return self.buffer.getvalue()
+
+
+def _prefetch(executor, func, items, window):
+    """func(item) em paralelo, entregando os resultados na ordem dos itens"""
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(func, item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+def pack_files(gdrive_manager, azure_manager, files, name, fmt=None, shard_bytes=None,
+               workers=None, on_result=None, progress=None, limiter=None):
+    """
+    Empacota arquivos do Drive em shards e grava o índice do pacote
+
+    Arquivos maiores que PACK_MAX_FILE_MB (ou sem tamanho) seguem pelo
+    transfer_batch, como blobs avulsos. A memória usada fica em torno de
+    dois shards (o que está sendo enviado e o que está sendo montado) mais
+    os downloads antecipados.
+
+    Args:
+        gdrive_manager: Gerenciador do Google Drive
+        azure_manager: Gerenciador do Azure Blob Storage
+        files (list): Arquivos como retornados por list_files_in_folder
+        name (str): Nome do pacote (os blobs ficam em '_packs/<nome>/')
+        fmt (str): 'tar' ou 'zip' (padrão: PACK_FORMAT)
+        shard_bytes (int): Tamanho de cada shard (padrão: PACK_SHARD_MB)
+        workers (int): Downloads simultâneos (None = MAX_WORKERS)
+        on_result (callable): Chamada como on_result(file, resultado) ao
+                              fim de cada arquivo (empacotado quando o seu
+                              shard termina de subir)
+        progress (ProgressTracker): Recebe o progresso dos downloads
+        limiter (Limiter): Limite de banda (padrão: só o global)
+
+    Returns:
+        dict: Resultados (ver new_results), com 'elapsed_s' e 'pack'
+              (prefixo, formato, shards e nome do blob do índice)
+    """
+    fmt = (fmt or PACK_FORMAT).lower()
+    if fmt not in PACK_FORMATS:
+        raise ValueError(f"Formato de pacote inválido: {fmt} (use tar ou zip)")
+    shard_bytes = shard_bytes or PACK_SHARD_BYTES
+    workers = max(1, workers or MAX_WORKERS)
+    prefix = pack_prefix(name)
+    started = time.perf_counter()
+
+    results = new_results(len(files))
+    history = begin_batch('pack')
+    # Os resultados de um shard são registrados na thread que o envia
+    lock = threading.Lock()
+
+    def report(file, result, save=False):
+        with lock:
+            record_result(results, result)
+            if save and history:
+                history.add(result)
+            if on_result:
+                on_result(file, result)
+
+    def handle(file, result):
+        # Os avulsos já vão para o histórico pelo transfer_batch
+        report(file, result, save=True)
+
+    small = [file for file in files if is_packable(file)]
+    large = [file for file in files if not is_packable(file)]
+    if large:
+        logger.info("📦 %d arquivos acima de PACK_MAX_FILE_MB seguem como blobs avulsos", len(large))
+        transfer_batch(gdrive_manager, azure_manager, large, workers=workers,
+                       on_result=report, source='pack', progress=progress, limiter=limiter)
+
+    shards = []
+    members = {}
+    seen = set()
+
+    def upload_shard(builder, packed):
+        shard_name = f"shard-{len(shards):05d}.{fmt}"
+        shards.append(shard_name)
+        data = builder.close()
+        metrics = {}
+        upload = azure_manager.upload_blob(
+            f"{prefix}/{shard_name}", data, overwrite=True, metrics=metrics,
+            max_concurrency=UPLOAD_BLOCK_CONCURRENCY,
+            content_md5=bytearray(hashlib.md5(data).digest()), limiter=limiter
+        )
+        with lock:
+            results['api_calls'] += metrics.get('api_calls', 0)
+        if upload['status'] == 'success':
+            logger.info("📦 %s: %d arquivos, %.2f MB", shard_name, len(packed),
+                        len(data) / (1024 * 1024))
+            for (member, offset, size, md5), (file, result) in zip(builder.members, packed):
+                members[member] = [len(shards) - 1, offset, size, md5]
+                handle(file, dict(result, shard=f"{prefix}/{shard_name}", offset=offset))
+        else:
+            for file, result in packed:
+                handle(file, {'name': file['name'], 'status': 'error', 'stage': 'upload',
+                              'error': upload.get('error', 'Erro desconhecido'),
+                              'shard': f"{prefix}/{shard_name}"})
+
+    def download(file):
+        metrics = {}
+        content = track(progress, file, lambda file_progress: gdrive_manager.download_file(
+            file['id'], file['name'], metrics=metrics, progress=file_progress, limiter=limiter
+        ))
+        return content, metrics
+
+    builder, packed, uploading = ShardBuilder(fmt), [], None
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            ThreadPoolExecutor(max_workers=1) as uploader:
+        for file, (content, metrics) in _prefetch(executor, download, small,
+                                                  workers * PREFETCH_PER_WORKER):
+            file_name = file['name']
+            base = {'name': file_name, 'api_calls': metrics.pop('api_calls', 0),
+                    'timings': {key: round(value, 4) for key, value in metrics.items()
+                                if value is not None}}
+            if content is None:
+                handle(file, dict(base, status='error', stage='download',
+                                  error='Falha no download do Google Drive'))
+                continue
+            if file_name in seen:
+                handle(file, dict(base, status='error', stage='pack',
+                                  error='Nome repetido no pacote'))
+                continue
+
+            md5 = hashlib.md5(content).hexdigest()
+            expected_md5 = file.get('md5Checksum')
+            if expected_md5 and VERIFY_INTEGRITY and md5 != expected_md5:
+                handle(file, dict(base, status='error', stage='verify',
+                                  error=f'MD5 divergente (Drive {expected_md5}, recebido {md5})'))
+                continue
+
+            seen.add(file_name)
+            builder.add(file_name, content, _mtime(file), md5)
+            packed.append((file, dict(base, status='success', size=len(content),
+                                      size_mb=round(len(content) / (1024 * 1024), 2), md5=md5,
+                                      verified=bool(expected_md5 and VERIFY_INTEGRITY))))
+            if builder.size >= shard_bytes:
+                # Um shard sobe enquanto o próximo é montado
+                if uploading is not None:
+                    uploading.result()
+                uploading = uploader.submit(upload_shard, builder, packed)
+                builder, packed = ShardBuilder(fmt), []
+
+        if uploading is not None:
+            uploading.result()
+        if packed:
+            upload_shard(builder, packed)
+
+    index_blob = f"{prefix}/{INDEX_BLOB}"
+    if shards:
+        index = {
+            'version': INDEX_VERSION,
+            'format': fmt,
+            'created_at': datetime.now().isoformat(),
+            'shards': shards,
+            # nome -> [shard, offset, tamanho, md5]
+            'members': members
+        }
+        data = gzip.compress(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+        upload = azure_manager.upload_blob(index_blob, data, overwrite=True, limiter=limiter)
+        if upload['status'] != 'success':
+            # Sem índice os shards continuam legíveis com tar/unzip, mas não por PackReader
+            results['total'] += 1
+            handle({'name': index_blob}, {'name': index_blob, 'status': 'error',
+                                          'stage': 'index', 'error': upload.get('error')})
+
+    results['pack'] = {
+        'prefix': prefix,
+        'format': fmt,
+        'shards': len(shards),
+        'members': len(members),
+        'index': index_blob if shards else None
+    }
+    results['elapsed_s'] = round(time.perf_counter() - started, 3)
+    if history:
+        history.finish(results)
+    return results
+
+
+class PackReader:
+    def __init__(self, azure_manager, name):
+        """
+        Abre um pacote para leitura (baixa só o índice)
+
+        Args:
+            azure_manager: Gerenciador do contêiner onde está o pacote
+            name (str): Nome do pacote (como em pack_files)
+
+        Raises:
+            FileNotFoundError: O índice do pacote não existe ou não pôde ser lido
+        """
+        self.azure_manager = azure_manager
+        self.prefix = pack_prefix(name)
+        data = azure_manager.download_blob(f"{self.prefix}/{INDEX_BLOB}")
+        if data is None:
+            raise FileNotFoundError(f"Índice do pacote não encontrado: {self.prefix}/{INDEX_BLOB}")
+        index = json.loads(gzip.decompress(data))
+        self.format = index['format']
+        self.shards = index['shards']
+        self.members = index['members']
+
+    def __contains__(self, file_name):
+        return file_name in self.members
+
+    def names(self):
+        """Nomes dos arquivos do pacote"""
+        return list(self.members)
+
+    def info(self, file_name):
+        """Shard, offset, tamanho e MD5 de um arquivo (None se não está no pacote)"""
+        entry = self.members.get(file_name)
+        if entry is None:
+            return None
+        shard, offset, size, md5 = entry
+        return {'name': file_name, 'shard': f"{self.prefix}/{self.shards[shard]}",
+                'offset': offset, 'size': size, 'md5': md5}
+
+    def download_blob(self, file_name):
+        """
+        Lê um arquivo do pacote com uma leitura em intervalo do shard
+
+        Args:
+            file_name (str): Nome do arquivo no pacote
+
+        Returns:
+            bytes: Conteúdo do arquivo, ou None se não existe ou falhou
+        """
+        info = self.info(file_name)
+        if info is None:
+            logger.error("❌ %s não está no pacote %s", file_name, self.prefix)
+            return None
+        if not info['size']:
+            return b''
+
+        data = self.azure_manager.download_blob(info['shard'], offset=info['offset'],
+                                                length=info['size'])
+        if data is not None and hashlib.md5(data).hexdigest() != info['md5']:
+            logger.error("❌ MD5 divergente ao ler %s de %s", file_name, info['shard'])
+            return None
+        return data
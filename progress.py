@@ -0,0 +1,160 @@
+"""
+Progresso das transferências em bytes, com vazão e tempo restante
+
+Cada arquivo em andamento tem um FileProgress, atualizado pelos laços de
+download (chunks do Drive ou intervalos paralelos) e pelo hook de progresso
+do upload do Azure. O ProgressTracker de um lote soma os arquivos e calcula
+a vazão (média dos últimos RATE_WINDOW_S segundos) e a estimativa de
+término. O CLI imprime snapshot() periodicamente e a interface web o
+consulta em /api/jobs/<id>.
+"""
+import threading
+import time
+from collections import deque
+from scheduler import file_size
+
+# Janela usada no cálculo da vazão atual
+RATE_WINDOW_S = 5.0
+
+_MB = 1024 * 1024
+
+
+class RateMeter:
+    """Vazão de um contador crescente, medida em uma janela deslizante"""
+
+    def __init__(self, window=RATE_WINDOW_S):
+        self.window = window
+        self._samples = deque()
+
+    def update(self, value, now=None):
+        now = now if now is not None else time.monotonic()
+        self._samples.append((now, value))
+        while len(self._samples) > 2 and now - self._samples[1][0] > self.window:
+            self._samples.popleft()
+
+    def rate(self):
+        """Bytes por segundo (0 sem amostras suficientes)"""
+        if len(self._samples) < 2:
+            return 0.0
+        (first_t, first_v), (last_t, last_v) = self._samples[0], self._samples[-1]
+        if last_t <= first_t:
+            return 0.0
+        return max(0.0, (last_v - first_v) / (last_t - first_t))
+
+
+def _eta(remaining, rate):
+    return round(remaining / rate, 1) if rate > 0 else None
+
+
+class FileProgress:
+    def __init__(self, name, total, lock):
+        self.name = name
+        self.total = total
+        self.downloaded = 0
+        self.uploaded = 0
+        self.phase = 'download'
+        self._lock = lock
+        self._download_rate = RateMeter()
+        self._upload_rate = RateMeter()
+
+    def download(self, done, total=None):
+        """Bytes já baixados (acumulado) e, se conhecido, o tamanho total"""
+        with self._lock:
+            self.downloaded = done
+            if total:
+                self.total = total
+            self._download_rate.update(done)
+
+    def add_download(self, count):
+        """Soma 'count' bytes baixados"""
+        self.download(self.downloaded + count)
+
+    def upload(self, done, total=None):
+        """Bytes já enviados (acumulado); usado como hook de progresso do Azure"""
+        with self._lock:
+            self.phase = 'upload'
+            self.uploaded = done
+            if total:
+                self.total = total
+            self._upload_rate.update(done)
+
+    def snapshot(self):
+        """Progresso do arquivo; chamar com o lock do tracker"""
+        if self.phase == 'upload':
+            rate = self._upload_rate.rate()
+            remaining = self.total - self.uploaded
+        else:
+            rate = self._download_rate.rate()
+            remaining = self.total - self.downloaded
+        return {
+            'name': self.name,
+            'phase': self.phase,
+            'bytes_total': self.total,
+            'downloaded': self.downloaded,
+            'uploaded': self.uploaded,
+            'rate_mb_s': round(rate / _MB, 2),
+            'eta_s': _eta(max(0, remaining), rate)
+        }
+
+
+class ProgressTracker:
+    def __init__(self, files=()):
+        """
+        Progresso de um lote
+
+        Args:
+            files (iterable): Arquivos do lote (o total usa o campo 'size')
+        """
+        self._lock = threading.Lock()
+        self.bytes_total = sum(file_size(file) for file in files)
+        self.files_total = len(files) if hasattr(files, '__len__') else 0
+        self.files_done = 0
+        self._finished_bytes = 0
+        self._active = {}
+        self._rate = RateMeter()
+        self.started = time.monotonic()
+
+    def start(self, file):
+        """Registra o início de um arquivo e retorna o seu FileProgress"""
+        progress = FileProgress(file.get('name'), file_size(file), self._lock)
+        with self._lock:
+            self._active[id(progress)] = progress
+        return progress
+
+    def finish(self, progress):
+        """Registra o fim de um arquivo (com sucesso ou não)"""
+        with self._lock:
+            self._active.pop(id(progress), None)
+            self.files_done += 1
+            # O arquivo deixa de contar como pendente, mesmo se falhou
+            self._finished_bytes += max(progress.total, progress.uploaded)
+
+    def delivered(self):
+        """Bytes já entregues ao destino (arquivos terminados + uploads em andamento)"""
+        return self._finished_bytes + sum(p.uploaded for p in self._active.values())
+
+    def snapshot(self):
+        """
+        Progresso do lote
+
+        Returns:
+            dict: Arquivos e bytes concluídos/totais, vazão atual em MB/s,
+                  tempo restante estimado ('eta_s', None se ainda não há
+                  vazão) e o progresso de cada arquivo em andamento
+        """
+        with self._lock:
+            delivered = self.delivered()
+            self._rate.update(delivered)
+            rate = self._rate.rate()
+            total = max(self.bytes_total, delivered)
+            return {
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'bytes_done': delivered,
+                'bytes_total': total,
+                'percent': round(100 * delivered / total, 1) if total else 0.0,
+                'rate_mb_s': round(rate / _MB, 2),
+                'eta_s': _eta(total - delivered, rate),
+                'elapsed_s': round(time.monotonic() - self.started, 1),
+                'active': [progress.snapshot() for progress in self._active.values()]
+            }
@@ -0,0 +1,49 @@
+"""
+Estado de uploads retomáveis
+
+Guarda, em um arquivo JSON por upload, a URI da sessão resumable do Google
+Drive e quantos bytes o servidor já confirmou. Se o processo for
+interrompido, o próximo upload com a mesma chave continua de onde parou.
+"""
+import hashlib
+import json
+import os
+from config import RESUME_STATE_DIR
+
+
+class ResumeStore:
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str): Pasta dos arquivos de estado (padrão: RESUME_STATE_DIR)
+        """
+        self.directory = directory or RESUME_STATE_DIR
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, key):
+        """Retorna o estado salvo para a chave, ou None"""
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('key') == key else None
+
+    def save(self, key, **state):
+        """Salva o estado (gravação atômica, para sobreviver a interrupções)"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(state, key=key), f)
+        os.replace(tmp_path, path)
+
+    def clear(self, key):
+        """Remove o estado de um upload concluído ou descartado"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,362 @@
+"""
+Agendador de transferências paralelas
+
+Executa as transferências em um pool de threads, admitindo cada arquivo
+somente quando há orçamento de bytes em memória disponível. Arquivos
+pequenos passam livremente; arquivos grandes aguardam até haver espaço.
+
+O lote é planejado por tamanho (plan_batch): os maiores arquivos começam
+primeiro (os grandes com upload de blocos em paralelo) e os menores
+preenchem os workers ociosos, para o lote não terminar esperando um
+arquivo grande.
+
+O JobScheduler mantém um pool compartilhado por vários jobs (servidor
+web): jobs de prioridade maior são atendidos primeiro, jobs de mesma
+prioridade se alternam nos workers livres e um job cancelado descarta os
+itens pendentes.
+"""
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cancellation import CancelToken
+from logger import get_logger
+from config import (
+    MAX_WORKERS, MAX_INFLIGHT_BYTES, LARGE_FILE_BYTES, UPLOAD_BLOCK_CONCURRENCY,
+    DOWNLOAD_CHUNK_SIZE, DOWNLOAD_PARALLELISM, RANGED_DOWNLOAD_MIN_BYTES, STAGING_MEMORY_BYTES
+)
+
+
+logger = get_logger('scheduler')
+
+
+def file_size(file):
+    """Tamanho em bytes de um arquivo do Google Drive (0 se desconhecido)"""
+    return int(file.get('size', 0) or 0)
+
+
+def is_large(file):
+    """Indica se o arquivo deve ser tratado como grande"""
+    return file_size(file) >= LARGE_FILE_BYTES
+
+
+def block_concurrency(file):
+    """Quantidade de blocos enviados em paralelo no upload de um arquivo"""
+    return UPLOAD_BLOCK_CONCURRENCY if is_large(file) else 1
+
+
+def uses_ranged_download(file):
+    """Indica se o arquivo é baixado em intervalos paralelos (streaming)"""
+    return file_size(file) >= RANGED_DOWNLOAD_MIN_BYTES
+
+
+def memory_footprint(file):
+    """
+    Bytes que a transferência de um arquivo ocupa em memória
+
+    Arquivos baixados inteiros ocupam o próprio tamanho, até
+    STAGING_MEMORY_MB (acima disso vão para o disco); arquivos baixados em
+    intervalos ocupam no máximo a janela de intervalos em trânsito mais o
+    intervalo que está sendo enviado ao Azure.
+    """
+    size = file_size(file)
+    if uses_ranged_download(file):
+        return min(size, (DOWNLOAD_PARALLELISM + 1) * DOWNLOAD_CHUNK_SIZE)
+    return min(size, STAGING_MEMORY_BYTES)
+
+
+def plan_batch(files):
+    """
+    Ordena um lote para minimizar o tempo total de transferência
+
+    Do maior para o menor: o arquivo mais longo não fica para o fim, e os
+    menores, no fim da fila, ocupam os workers que vão ficando livres.
+
+    Args:
+        files (list): Arquivos como retornados por list_files_in_folder
+
+    Returns:
+        list: Os mesmos arquivos na ordem de execução
+    """
+    return sorted(files, key=file_size, reverse=True)
+
+
+class ByteBudget:
+    def __init__(self, max_bytes):
+        """
+        Orçamento global de bytes em trânsito
+
+        Args:
+            max_bytes (int): Total de bytes que podem estar em memória ao
+                             mesmo tempo (0 = sem limite)
+        """
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+
+    def can_admit(self, size):
+        """
+        Verifica se um item de 'size' bytes cabe no orçamento
+
+        Um item maior que o orçamento inteiro é admitido sozinho, quando
+        nada mais está em trânsito, para não ficar bloqueado para sempre.
+        """
+        if not self.max_bytes or self.in_flight == 0:
+            return True
+        return self.in_flight + size <= self.max_bytes
+
+    def acquire(self, size):
+        self.in_flight += size
+
+    def release(self, size):
+        self.in_flight -= size
+
+
+class TransferScheduler:
+    def __init__(self, workers=None, max_inflight_bytes=None):
+        """
+        Inicializa o agendador
+
+        Args:
+            workers (int): Quantidade de transferências simultâneas
+            max_inflight_bytes (int): Orçamento de bytes em memória
+        """
+        self.workers = max(1, workers or MAX_WORKERS)
+        self.budget = ByteBudget(
+            MAX_INFLIGHT_BYTES if max_inflight_bytes is None else max_inflight_bytes
+        )
+        self._cond = threading.Condition()
+
+    def run(self, items, func, size_of=memory_footprint, on_result=None):
+        """
+        Executa func(item) para cada item respeitando workers e orçamento
+
+        Args:
+            items (list): Itens a processar, na ordem de preferência
+            func (callable): Função executada para cada item
+            size_of (callable): Retorna o tamanho em bytes de um item
+            on_result (callable): Chamada como on_result(item, resultado)
+                                  na thread do agendador, ao fim de cada item
+
+        Returns:
+            list: Resultados na mesma ordem dos itens
+        """
+        pending = list(enumerate(items))
+        results = [None] * len(pending)
+        finished = deque()
+        running = 0
+
+        def work(index, item, size):
+            try:
+                result = func(item)
+            except Exception as e:
+                result = e
+            with self._cond:
+                self.budget.release(size)
+                finished.append((index, item, result))
+                self._cond.notify_all()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                with self._cond:
+                    # Escolhe o primeiro item pendente que cabe no orçamento
+                    chosen = None
+                    if not finished and running < self.workers:
+                        for position, (index, item) in enumerate(pending):
+                            if self.budget.can_admit(size_of(item)):
+                                chosen = pending.pop(position)
+                                break
+
+                    if chosen is None and not finished:
+                        self._cond.wait()
+                        continue
+
+                    done = list(finished)
+                    finished.clear()
+                    running -= len(done)
+
+                    if chosen is not None:
+                        chosen_index, chosen_item = chosen
+                        chosen_size = size_of(chosen_item)
+                        self.budget.acquire(chosen_size)
+                        running += 1
+
+                for index, item, result in done:
+                    if isinstance(result, Exception):
+                        raise result
+                    results[index] = result
+                    if on_result:
+                        on_result(item, result)
+
+                if chosen is not None:
+                    executor.submit(work, chosen_index, chosen_item, chosen_size)
+
+        return results
+
+
+class ScheduledJob:
+    """Job submetido ao JobScheduler"""
+
+    def __init__(self, items, func, priority, size_of, on_result, on_done, cancel, sequence):
+        self.func = func
+        self.priority = priority
+        self.size_of = size_of
+        self.on_result = on_result
+        self.on_done = on_done
+        self.cancel = cancel
+        self.sequence = sequence
+        self.pending = list(enumerate(items))
+        self.results = [None] * len(self.pending)
+        self.skipped = []
+        self.running = 0
+        self.started = 0
+        self.served_at = 0
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Espera o job terminar; retorna False se o tempo acabou antes"""
+        return self.done.wait(timeout)
+
+
+class JobScheduler:
+    def __init__(self, workers=None, max_inflight_bytes=None):
+        """
+        Pool de workers compartilhado entre jobs
+
+        A cada worker livre, o próximo item vem do job de maior prioridade;
+        entre jobs de mesma prioridade, do que tem menos itens em execução
+        (e, no empate, do que foi atendido há mais tempo). Assim um arquivo
+        urgente não espera um lote grande terminar e lotes simultâneos
+        avançam juntos. O orçamento de bytes vale para todos os jobs.
+
+        Args:
+            workers (int): Transferências simultâneas no total
+            max_inflight_bytes (int): Orçamento de bytes em memória
+        """
+        self.workers = max(1, workers or MAX_WORKERS)
+        self.budget = ByteBudget(
+            MAX_INFLIGHT_BYTES if max_inflight_bytes is None else max_inflight_bytes
+        )
+        self._cond = threading.Condition()
+        self._jobs = []
+        self._finished = deque()
+        self._running = 0
+        self._ticks = itertools.count(1)
+        self._executor = None
+
+    def submit(self, items, func, priority=0, size_of=memory_footprint, on_result=None,
+               on_done=None, cancel=None):
+        """
+        Enfileira um job e retorna sem esperar
+
+        Args:
+            items (list): Itens do job, na ordem de preferência
+            func (callable): Executada como func(item) em um worker
+            priority (int): Maior = atendido antes
+            size_of (callable): Tamanho em bytes de um item
+            on_result (callable): on_result(item, resultado) ao fim de cada item
+            on_done (callable): on_done(job) quando o job termina
+            cancel (CancelToken): Token do job (criado se não informado)
+
+        Returns:
+            ScheduledJob: Use wait() para esperar e cancel() no agendador
+        """
+        job = ScheduledJob(items, func, priority, size_of, on_result, on_done,
+                           cancel or CancelToken(), next(self._ticks))
+        with self._cond:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+                threading.Thread(target=self._dispatch, name='job-scheduler', daemon=True).start()
+            self._jobs.append(job)
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, job):
+        """
+        Cancela um job: os itens pendentes são descartados e os em execução
+        param no próximo bloco (ver CancelToken)
+        """
+        job.cancel.cancel()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _pick(self):
+        # Chamado com o lock: escolhe (job, índice, item, tamanho) ou None
+        candidates = [job for job in self._jobs if job.pending and not job.cancel.cancelled]
+        candidates.sort(key=lambda job: (-job.priority, job.running, job.served_at))
+        for job in candidates:
+            for position, (index, item) in enumerate(job.pending):
+                size = job.size_of(item)
+                if self.budget.can_admit(size):
+                    del job.pending[position]
+                    return job, index, item, size
+        return None
+
+    def _work(self, job, index, item, size):
+        try:
+            result = job.func(item)
+        except Exception as e:
+            result = e
+        with self._cond:
+            self.budget.release(size)
+            self._finished.append((job, index, item, result))
+            self._cond.notify_all()
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while True:
+                    done = list(self._finished)
+                    self._finished.clear()
+                    for job, _, _, _ in done:
+                        job.running -= 1
+                        self._running -= 1
+
+                    for job in self._jobs:
+                        if job.pending and job.cancel.cancelled:
+                            job.skipped.extend(item for _, item in job.pending)
+                            job.pending = []
+
+                    chosen = self._pick() if self._running < self.workers else None
+                    if chosen is not None:
+                        job, _, _, size = chosen
+                        self.budget.acquire(size)
+                        job.running += 1
+                        job.started += 1
+                        job.served_at = next(self._ticks)
+                        self._running += 1
+
+                    completed = [job for job in self._jobs if not job.pending and not job.running]
+                    if done or chosen or completed:
+                        break
+                    self._cond.wait()
+
+                for job in completed:
+                    self._jobs.remove(job)
+
+            for job, index, item, result in done:
+                if isinstance(result, Exception):
+                    # Erro inesperado (func não tratou): encerra o job
+                    job.error = job.error or result
+                    self.cancel(job)
+                    continue
+                job.results[index] = result
+                self._callback(job.on_result, item, result)
+
+            if chosen is not None:
+                job, index, item, size = chosen
+                self._executor.submit(self._work, job, index, item, size)
+
+            for job in completed:
+                self._callback(job.on_done, job)
+                job.done.set()
+
+    @staticmethod
+    def _callback(func, *args):
+        # Um erro no callback não pode parar o agendador dos outros jobs
+        if func is None:
+            return
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("❌ Erro no callback de um job")
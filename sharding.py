@@ -0,0 +1,237 @@
+"""
+Transferência distribuída em shards coordenados por leases de blob
+
+A listagem do Drive é dividida em shards pelo hash do ID de cada arquivo.
+Cada shard tem um pequeno blob de coordenação no contêiner de destino; um
+worker (processo ou máquina) só transfere um shard enquanto segura o lease
+desse blob. Se um worker cai, o lease expira e outro worker assume o shard.
+Ao terminar, o shard é marcado como concluído nos metadados do blob.
+
+Um shard com arquivos que falharam, ou cujo lease foi perdido no meio do
+caminho, não é marcado: o lease é liberado e o shard fica para outro
+worker ou para a próxima execução do mesmo job.
+
+Vários processos locais podem ser testados contra o Azurite usando
+AZURE_CONNECTION_STRING=UseDevelopmentStorage=true.
+"""
+import random
+import threading
+import time
+import zlib
+from azure.core.exceptions import HttpResponseError, ResourceExistsError
+from cancellation import CancelToken
+from config import SHARD_LEASE_SECONDS
+from logger import get_logger
+from transfer_engine import new_results, record_result, transfer_batch
+
+COORDINATION_PREFIX = '_coordination'
+
+logger = get_logger('sharding')
+
+
+def shard_of(file, shard_count):
+    """Shard de um arquivo, calculado de forma estável a partir do seu ID"""
+    return zlib.crc32(file['id'].encode('utf-8')) % shard_count
+
+
+class _LeaseKeeper(threading.Thread):
+    """Renova um lease em segundo plano enquanto o shard é processado"""
+
+    def __init__(self, lease, interval):
+        super().__init__(daemon=True)
+        self.lease = lease
+        self.interval = interval
+        self.lost = False
+        # Cancelado quando o lease é perdido: o shard para no próximo bloco
+        self.cancel = CancelToken()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.lease.renew()
+            except HttpResponseError:
+                # Outro worker assumiu o shard: para de transferir (o que já
+                # subiu é idempotente, overwrite) e deixa o shard com ele
+                self.lost = True
+                self.cancel.cancel()
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ShardCoordinator:
+    def __init__(self, azure_manager, job_name, shard_count, lease_seconds=None):
+        """
+        Inicializa o coordenador de shards
+
+        Args:
+            azure_manager: Gerenciador do Azure (contêiner de destino)
+            job_name (str): Nome do job; workers do mesmo job dividem os shards
+            shard_count (int): Quantidade de shards
+            lease_seconds (int): Duração do lease (15 a 60 segundos)
+        """
+        self.container_client = azure_manager.container_client
+        self.job_name = job_name
+        self.shard_count = shard_count
+        self.lease_seconds = lease_seconds or SHARD_LEASE_SECONDS
+
+    def _blob(self, index):
+        return self.container_client.get_blob_client(
+            f"{COORDINATION_PREFIX}/{self.job_name}/shard-{index:05d}"
+        )
+
+    def ensure_shard_blobs(self):
+        """Cria os blobs de coordenação que ainda não existem"""
+        for index in range(self.shard_count):
+            try:
+                self._blob(index).upload_blob(b'', overwrite=False)
+            except (ResourceExistsError, HttpResponseError):
+                # Já existe (ou está com lease de outro worker)
+                pass
+
+    def is_done(self, index):
+        metadata = self._blob(index).get_blob_properties().metadata or {}
+        return metadata.get('status') == 'done'
+
+    def try_claim(self, index):
+        """
+        Tenta assumir um shard
+
+        Returns:
+            BlobLeaseClient: Lease do shard, ou None se outro worker o
+                             segura ou se ele já foi concluído
+        """
+        try:
+            lease = self._blob(index).acquire_lease(lease_duration=self.lease_seconds)
+        except HttpResponseError:
+            return None
+
+        # O dono anterior pode ter concluído e liberado o shard
+        if self.is_done(index):
+            lease.release()
+            return None
+        return lease
+
+    def mark_done(self, index, lease, worker_id, results):
+        """Marca o shard como concluído e libera o lease"""
+        self._blob(index).set_blob_metadata({
+            'status': 'done',
+            'worker': worker_id,
+            'success': str(len(results['success'])),
+            'failed': str(len(results['failed']))
+        }, lease=lease)
+        lease.release()
+
+    def abandon(self, lease):
+        """Libera o lease sem marcar o shard (fica para outro worker)"""
+        try:
+            lease.release()
+        except HttpResponseError:
+            # O lease já é de outro worker
+            pass
+
+    def hold(self, lease):
+        """Inicia a renovação automática de um lease"""
+        keeper = _LeaseKeeper(lease, max(1, self.lease_seconds / 3))
+        keeper.start()
+        return keeper
+
+
+def run_sharded(gdrive_manager, azure_manager, files, shard_count, job_name,
+                worker_id, workers=None, on_result=None, targets=None):
+    """
+    Executa a parte deste worker em uma transferência distribuída
+
+    O worker percorre os shards (começando de uma posição aleatória para
+    espalhar os workers), assume os que estão livres e não concluídos e
+    transfere seus arquivos. Shards com lease de outro worker são tentados
+    de novo depois que o lease pode ter expirado. Um shard com falhas ou
+    cujo lease foi perdido fica sem marcar (ver abandon) e este worker não
+    o tenta de novo. Termina quando não há mais shards para tentar.
+
+    Args:
+        gdrive_manager: Gerenciador do Google Drive
+        azure_manager: Gerenciador do Azure Blob Storage
+        files (list): Listagem completa (igual em todos os workers)
+        shard_count (int): Quantidade de shards
+        job_name (str): Nome do job compartilhado pelos workers
+        worker_id (str): Identificação deste worker (gravada nos metadados)
+        workers (int): Transferências simultâneas neste worker
+        on_result (callable): Chamada como on_result(file, resultado)
+        targets (list): Destinos adicionais de fan-out
+
+    Returns:
+        dict: Resultados dos arquivos transferidos por este worker, com
+              'shards' listando os shards concluídos e 'unfinished_shards'
+              os que ficaram sem marcar
+    """
+    coordinator = ShardCoordinator(azure_manager, job_name, shard_count)
+    coordinator.ensure_shard_blobs()
+
+    shards = [[] for _ in range(shard_count)]
+    for file in files:
+        shards[shard_of(file, shard_count)].append(file)
+
+    results = new_results(0)
+    results['shards'] = []
+    results['unfinished_shards'] = []
+    started = time.perf_counter()
+    remaining = set(range(shard_count))
+
+    while remaining:
+        offset = random.randrange(shard_count)
+        order = sorted(remaining, key=lambda index: (index - offset) % shard_count)
+        claimed_any = False
+
+        for index in order:
+            if coordinator.is_done(index):
+                remaining.discard(index)
+                continue
+
+            lease = coordinator.try_claim(index)
+            if lease is None:
+                continue
+
+            claimed_any = True
+            keeper = coordinator.hold(lease)
+            try:
+                shard_results = transfer_batch(
+                    gdrive_manager, azure_manager, shards[index],
+                    workers=workers, on_result=on_result, targets=targets,
+                    source='shard', cancel=keeper.cancel
+                )
+            finally:
+                keeper.stop()
+
+            done = False
+            if keeper.lost:
+                logger.warning("⚠️ Lease do shard %d perdido: o shard fica com o novo dono", index)
+            elif shard_results['failed']:
+                logger.warning("⚠️ Shard %d com %d falha(s): fica sem marcar para nova tentativa",
+                               index, len(shard_results['failed']))
+                coordinator.abandon(lease)
+            else:
+                try:
+                    coordinator.mark_done(index, lease, worker_id, shard_results)
+                    done = True
+                except HttpResponseError:
+                    # Lease perdido entre o fim do lote e a marcação
+                    logger.warning("⚠️ Lease do shard %d perdido antes de concluí-lo", index)
+            remaining.discard(index)
+            results['shards' if done else 'unfinished_shards'].append(index)
+            results['total'] += shard_results['total']
+            for status, key in (('success', 'success'), ('error', 'failed'),
+                                ('cancelled', 'cancelled')):
+                for entry in shard_results[key]:
+                    record_result(results, dict(entry, status=status))
+
+        if remaining and not claimed_any:
+            # Todos os shards restantes estão com outros workers: espera o
+            # lease de algum deles expirar (ou o shard ser concluído)
+            time.sleep(coordinator.lease_seconds / 2)
+
+    results['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return results
@@ -0,0 +1,56 @@
+"""
+Coalescência de chamadas idênticas simultâneas (single-flight)
+
+Quando várias threads pedem a mesma listagem ao mesmo tempo (ex.: várias
+abas do navegador atualizando juntas), só a primeira chama o serviço; as
+demais esperam e recebem o mesmo resultado (ou a mesma exceção). Nada fica
+em cache: uma chamada que começa depois da anterior terminar vai ao
+serviço de novo.
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Executa func(*args, **kwargs), compartilhando a execução em andamento
+
+        Args:
+            key: Identifica chamadas equivalentes (ex.: ('list_blobs', contêiner))
+
+        Returns:
+            O resultado de func; chamadas coalescidas recebem o mesmo objeto
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,254 @@
+"""
+Cache em disco (spool) dos arquivos baixados do Google Drive
+
+Cada arquivo é guardado com a chave ID do Drive + md5Checksum, então uma
+nova versão do arquivo nunca reaproveita o conteúdo antigo. Só entram no
+cache arquivos baixados por completo e com o MD5 conferido. Quando o
+tamanho total passa de SPOOL_MAX_MB, os arquivos usados há mais tempo são
+removidos (LRU).
+
+Na leitura o arquivo é mapeado em memória (mmap): o upload lê as páginas
+direto do cache do sistema operacional, sem copiar o arquivo inteiro.
+
+O cache é só uma otimização: falhas de disco (cheio, sem permissão) são
+registradas no log e o arquivo deixa de ser guardado, sem afetar a
+transferência.
+"""
+import mmap
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from config import SPOOL_DIR, SPOOL_MAX_BYTES
+from logger import get_logger
+from staging import is_buffer
+
+logger = get_logger('spool_cache')
+
+
+class SpoolEntry:
+    """Arquivo do cache aberto para leitura (mapeado em memória)"""
+
+    def __init__(self, cache, key, path, size):
+        self._cache = cache
+        self.key = key
+        self.size = size
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def content(self, chunk_size=None):
+        """
+        Conteúdo para o upload
+
+        Args:
+            chunk_size (int): Se informado, retorna um gerador de blocos
+                              (usado pelo fan-out); senão, o próprio mmap,
+                              que o Azure lê como um arquivo posicionável
+        """
+        if self._map is None:
+            return b''
+        if chunk_size is None:
+            self._map.seek(0)
+            return self._map
+
+        def generate():
+            for start in range(0, self.size, chunk_size):
+                yield self._map[start:start + chunk_size]
+        return generate()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        self._cache._release(self.key)
+
+
+class SpoolWriter:
+    """Grava no cache o conteúdo que passa do Drive para o Azure"""
+
+    def __init__(self, cache, key):
+        self._cache = cache
+        self.key = key
+        self.path = os.path.join(cache.directory, f"{key}.{uuid.uuid4().hex}.part")
+        self.bytes = 0
+        try:
+            self._file = open(self.path, 'wb')
+        except OSError as e:
+            logger.warning("⚠️ Cache em disco indisponível para %s: %s", key, e)
+            self._file = None
+
+    def write(self, data):
+        if self._file is None:
+            return
+        try:
+            self._file.write(data)
+        except OSError as e:
+            # Disco cheio etc.: para de guardar este arquivo, o upload segue
+            logger.warning("⚠️ Falha ao gravar %s no cache em disco: %s", self.key, e)
+            self._discard()
+            return
+        self.bytes += len(data)
+
+    def wrap(self, content):
+        """Mesmo contrato de StreamHasher.wrap: bytes ou iterável de blocos"""
+        if is_buffer(content):
+            self.write(content)
+            return content
+
+        def generate():
+            for chunk in content:
+                self.write(chunk)
+                yield chunk
+
+        return generate()
+
+    def finish(self, keep):
+        """
+        Fecha o arquivo temporário
+
+        Args:
+            keep (bool): Se True, o arquivo entra no cache; senão é descartado
+        """
+        if self._file is None:
+            return
+        if not keep:
+            self._discard()
+            return
+        try:
+            self._file.close()
+            self._file = None
+            self._cache._commit(self.key, self.path, self.bytes)
+        except OSError as e:
+            logger.warning("⚠️ Falha ao guardar %s no cache em disco: %s", self.key, e)
+            self._discard()
+
+    def _discard(self):
+        # Fecha e remove o arquivo temporário; as próximas escritas são ignoradas
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SpoolCache:
+    def __init__(self, directory=None, max_bytes=None):
+        """
+        Inicializa o cache, recuperando os arquivos de execuções anteriores
+
+        Args:
+            directory (str): Pasta do cache (padrão: SPOOL_DIR)
+            max_bytes (int): Tamanho máximo (padrão: SPOOL_MAX_MB)
+        """
+        self.directory = directory or SPOOL_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else SPOOL_MAX_BYTES
+        self._entries = OrderedDict()
+        self._in_use = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.part'):
+                # Download interrompido em uma execução anterior
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            found.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._bytes += size
+
+    @staticmethod
+    def key(file_id, md5_checksum):
+        return f"{file_id}-{md5_checksum}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def open(self, file_id, md5_checksum):
+        """
+        Abre um arquivo do cache
+
+        Returns:
+            SpoolEntry: Arquivo mapeado em memória (feche com close()), ou
+                        None se o arquivo não está no cache
+        """
+        key = self.key(file_id, md5_checksum)
+        with self._lock:
+            size = self._entries.get(key)
+            if size is None:
+                return None
+            self._entries.move_to_end(key)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+
+        try:
+            # A data de modificação guarda a ordem LRU entre execuções
+            os.utime(self._path(key))
+            return SpoolEntry(self, key, self._path(key), size)
+        except OSError:
+            self._release(key)
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._bytes -= size
+            return None
+
+    def writer(self, file_id, md5_checksum):
+        """Cria um SpoolWriter para um arquivo que será baixado"""
+        return SpoolWriter(self, self.key(file_id, md5_checksum))
+
+    def _release(self, key):
+        with self._lock:
+            count = self._in_use.get(key, 0) - 1
+            if count > 0:
+                self._in_use[key] = count
+            else:
+                self._in_use.pop(key, None)
+
+    def _commit(self, key, tmp_path, size):
+        with self._lock:
+            if key in self._in_use:
+                # Outro upload está lendo a mesma versão, que já está no cache
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self._path(key))
+            self._bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        # Remove os menos usados recentemente, sem tocar nos arquivos abertos
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                return
+            if key in self._in_use:
+                continue
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("⚠️ Falha ao remover %s do cache em disco: %s", key, e)
+            self._bytes -= self._entries.pop(key)
+
+
+_spool_cache = None
+_spool_lock = threading.Lock()
+
+
+def get_spool_cache():
+    """Retorna o cache global, ou None se SPOOL_DIR não está configurado"""
+    global _spool_cache
+    if not SPOOL_DIR:
+        return None
+    with _spool_lock:
+        if _spool_cache is None:
+            _spool_cache = SpoolCache()
+        return _spool_cache
@@ -0,0 +1,87 @@
+"""
+Buffer de staging dos arquivos que precisam chegar inteiros antes do upload
+
+Quando não há streaming (download sem intervalos, tamanho desconhecido,
+upload resumable do Drive a partir de um iterável), o conteúdo é acumulado
+em um StagingBuffer. Até STAGING_MEMORY_MB ele fica em um BytesIO; acima
+disso o que já chegou é copiado uma vez para um arquivo temporário
+(em STAGING_DIR) e o restante vai direto para o disco.
+
+Ao terminar, o arquivo em disco é mapeado em memória (mmap somente
+leitura): o upload lê as páginas do cache do sistema operacional, como no
+spool_cache, então um arquivo de 10 GB não precisa de 10 GB de RAM. O
+arquivo temporário não tem nome no disco; o espaço volta quando o mmap é
+liberado, mesmo que o processo termine no meio do caminho.
+"""
+import io
+import mmap
+import tempfile
+from config import STAGING_DIR, STAGING_MEMORY_BYTES
+
+# Conteúdos inteiros (lidos de uma vez ou como arquivo), e não iteráveis de blocos
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def is_buffer(content):
+    """Indica se o conteúdo é um buffer inteiro (bytes, mmap...) e não um iterável de blocos"""
+    return isinstance(content, BUFFER_TYPES)
+
+
+def iter_buffer(content, chunk_size):
+    """Blocos de um buffer, em ordem (só um bloco é copiado por vez)"""
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+
+class StagingBuffer:
+    """Arquivo binário de escrita sequencial: em memória, depois em disco"""
+
+    def __init__(self, max_memory=None, directory=None):
+        """
+        Args:
+            max_memory (int): Bytes mantidos em memória antes de ir para o
+                              disco (padrão: STAGING_MEMORY_MB)
+            directory (str): Pasta do arquivo temporário (padrão:
+                             STAGING_DIR, ou a pasta temporária do sistema)
+        """
+        self.max_memory = STAGING_MEMORY_BYTES if max_memory is None else max_memory
+        self.directory = directory or STAGING_DIR or None
+        self.spilled = False
+        self._file = io.BytesIO()
+
+    def write(self, data):
+        if not self.spilled and self._file.tell() + len(data) > self.max_memory:
+            self._spill()
+        return self._file.write(data)
+
+    def tell(self):
+        return self._file.tell()
+
+    def _spill(self):
+        disk = tempfile.TemporaryFile(prefix='staging-', dir=self.directory)
+        with self._file.getbuffer() as received:
+            disk.write(received)
+        self._file = disk
+        self.spilled = True
+
+    def getvalue(self):
+        """
+        Conteúdo completo (o buffer não aceita mais escritas)
+
+        Returns:
+            bytes se coube na memória; senão um mmap somente leitura, que
+            o Azure e o Drive leem como um arquivo posicionável, sem cópia
+        """
+        file, self._file = self._file, None
+        if not self.spilled:
+            return file.getvalue()
+        with file:
+            file.flush()
+            # O mapeamento continua válido depois de fechar o arquivo
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Descarta o conteúdo (sem efeito depois de getvalue)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -5,15 +5,32 @@
 
 const API_BASE = 'http://localhost:5000/api';
 
+// Itens pedidos por página às listagens paginadas
+const PAGE_SIZE = 200;
+
+// Linhas extras renderizadas acima e abaixo da área visível
+const OVERSCAN_ROWS = 8;
+
+// Intervalo da consulta de progresso de um job (ms)
+const PROGRESS_POLL_MS = 500;
+
+// Consultas seguidas sem encontrar o job (outro processo do servidor) antes de desistir
+const MAX_JOB_MISSES = 20;
+
 // Estado da aplicação
 const appState = {
-    googleDriveFiles: [],
-    azureBlobs: [],
-    selectedGDriveFiles: new Set(),
+    // Arquivos selecionados: id → { id, name, size, md5 } (para a transferência)
+    selectedGDriveFiles: new Map(),
     selectedAzureBlobs: new Set(),
-    isTransferring: false
+    isTransferring: false,
+    // Job em andamento (para o botão de cancelar)
+    currentJobId: null
 };
 
+// Listas virtualizadas (criadas no DOMContentLoaded)
+let gdriveList = null;
+let azureList = null;
+
 /**
  * Inicializa a aplicação
  */
@@ -23,6 +40,23 @@ document.addEventListener('DOMContentLoaded', () => {
     // Verificar conexão com API
     checkHealthStatus();
     
+    gdriveList = new VirtualList({
+        list: document.getElementById('gdrive-list'),
+        endpoint: `${API_BASE}/google-drive/files`,
+        itemsKey: 'files',
+        renderRow: fileRowHtml,
+        signature: file => `${file.id}|${file.name}|${file.size}|${file.modified}|${appState.selectedGDriveFiles.has(file.id)}`,
+        onClick: onGDriveRowClick
+    });
+    azureList = new VirtualList({
+        list: document.getElementById('azure-list'),
+        endpoint: `${API_BASE}/azure/blobs`,
+        itemsKey: 'blobs',
+        renderRow: blobRowHtml,
+        signature: blob => `${blob.name}|${blob.size_mb}|${blob.last_modified}|${appState.selectedAzureBlobs.has(blob.name)}`,
+        onClick: onAzureRowClick
+    });
+    
     // Carregar dados iniciais
     loadGoogleDriveFiles();
     loadAzureBlobs();
@@ -75,61 +109,235 @@ function updateStatusIndicator(status, text) {
 }
 
 /**
- * Carrega arquivos do Google Drive
+ * Lista virtualizada e paginada
+ *
+ * Só as linhas visíveis (mais OVERSCAN_ROWS) existem no DOM; as páginas
+ * da API são carregadas conforme a rolagem. Na atualização, a primeira
+ * página traz a versão da listagem: se não mudou, nada é refeito; se
+ * mudou, as páginas são recarregadas e só as linhas cujo conteúdo mudou
+ * são redesenhadas.
  */
-async function loadGoogleDriveFiles() {
-    const loader = document.getElementById('gdrive-loader');
-    const list = document.getElementById('gdrive-list');
-    const empty = document.getElementById('gdrive-empty');
-    const error = document.getElementById('gdrive-error');
+class VirtualList {
+    constructor({ list, endpoint, itemsKey, renderRow, signature, onClick }) {
+        this.list = list;
+        this.scroller = list.parentElement;
+        this.endpoint = endpoint;
+        this.itemsKey = itemsKey;
+        this.renderRow = renderRow;
+        this.signature = signature;
+        
+        this.items = [];
+        this.total = 0;
+        this.version = null;
+        this.loadedPages = new Set();
+        this.pendingPages = new Map();
+        this.rows = new Map();
+        this.frame = null;
+        
+        this.list.classList.add('virtual');
+        this.scroller.addEventListener('scroll', () => this.scheduleRender());
+        window.addEventListener('resize', () => this.scheduleRender());
+        this.list.addEventListener('click', (e) => {
+            const row = e.target.closest('.file-item');
+            const item = row && this.items[Number(row.dataset.index)];
+            if (item) {
+                onClick(item, e.target.closest('[data-action]')?.dataset.action);
+            }
+        });
+    }
     
-    loader.style.display = 'flex';
-    list.style.display = 'none';
-    empty.style.display = 'none';
-    error.style.display = 'none';
+    rowHeight() {
+        return parseFloat(getComputedStyle(this.list).getPropertyValue('--row-height')) || 84;
+    }
     
-    try {
-        const response = await fetch(`${API_BASE}/google-drive/files`);
+    async fetchPage(page, extra = '') {
+        const url = `${this.endpoint}?offset=${page * PAGE_SIZE}&limit=${PAGE_SIZE}${extra}`;
+        const response = await fetch(url);
         const data = await response.json();
+        if (data.status !== 'success') {
+            throw new Error(data.message);
+        }
+        return data;
+    }
+    
+    storePage(page, data) {
+        const items = data[this.itemsKey];
+        for (let i = 0; i < items.length; i++) {
+            this.items[page * PAGE_SIZE + i] = items[i];
+        }
+        this.loadedPages.add(page);
+    }
+    
+    /**
+     * Atualiza a lista a partir do servidor
+     *
+     * @returns {boolean} true se a listagem mudou
+     */
+    async reload() {
+        const version = this.version ? `&version=${this.version}` : '';
+        const data = await this.fetchPage(0, `&refresh=1${version}`);
+        if (data.unchanged) {
+            return false;
+        }
         
-        if (data.status === 'success') {
-            appState.googleDriveFiles = data.files;
-            renderGoogleDriveFiles();
-            loader.style.display = 'none';
-            list.style.display = 'flex';
+        // Os itens antigos continuam visíveis até suas páginas chegarem
+        this.version = data.version;
+        this.total = data.count;
+        this.items.length = Math.min(this.items.length, this.total);
+        this.loadedPages.clear();
+        this.pendingPages.clear();
+        this.storePage(0, data);
+        this.render();
+        return true;
+    }
+    
+    async loadPage(page) {
+        if (this.loadedPages.has(page) || this.pendingPages.has(page)) {
+            return this.pendingPages.get(page);
+        }
+        
+        const version = this.version;
+        const request = this.fetchPage(page).then(async data => {
+            if (data.version !== version) {
+                // Página de uma listagem mais antiga (ex.: outro processo do
+                // servidor): pede de novo com a listagem atualizada
+                data = await this.fetchPage(page, '&refresh=1');
+            }
+            if (this.version !== version) {
+                return;
+            }
+            if (data.version !== version) {
+                // A listagem mudou no servidor entre uma página e outra
+                return this.reload();
+            }
+            this.storePage(page, data);
+            this.scheduleRender();
+        }).catch(error => {
+            console.error('❌ Erro ao carregar página:', error);
+        }).finally(() => {
+            this.pendingPages.delete(page);
+        });
+        this.pendingPages.set(page, request);
+        return request;
+    }
+    
+    /**
+     * Carrega todas as páginas que ainda faltam (ex.: "Selecionar Tudo")
+     */
+    async loadAll() {
+        const pages = Math.ceil(this.total / PAGE_SIZE);
+        const requests = [];
+        for (let page = 0; page < pages; page++) {
+            requests.push(this.loadPage(page));
+        }
+        await Promise.all(requests);
+        return this.items.slice(0, this.total).filter(Boolean);
+    }
+    
+    scheduleRender() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
+            });
+        }
+    }
+    
+    render() {
+        const rowHeight = this.rowHeight();
+        this.list.style.height = `${this.total * rowHeight}px`;
+        
+        const listTop = this.list.getBoundingClientRect().top -
+            this.scroller.getBoundingClientRect().top + this.scroller.scrollTop;
+        const viewTop = this.scroller.scrollTop - listTop;
+        const first = Math.max(0, Math.floor(viewTop / rowHeight) - OVERSCAN_ROWS);
+        const last = Math.min(this.total,
+            Math.ceil((viewTop + this.scroller.clientHeight) / rowHeight) + OVERSCAN_ROWS);
+        
+        // Remove as linhas que saíram da área visível
+        for (const [index, row] of this.rows) {
+            if (index < first || index >= last) {
+                row.remove();
+                this.rows.delete(index);
+            }
+        }
+        
+        for (let index = first; index < last; index++) {
+            const item = this.items[index];
+            if (item === undefined || !this.loadedPages.has(Math.floor(index / PAGE_SIZE))) {
+                this.loadPage(Math.floor(index / PAGE_SIZE));
+            }
             
-            if (data.count === 0) {
-                list.style.display = 'none';
-                empty.style.display = 'block';
+            let row = this.rows.get(index);
+            if (!row) {
+                row = document.createElement('div');
+                row.dataset.index = index;
+                this.rows.set(index, row);
+                this.list.appendChild(row);
+            }
+            row.style.transform = `translateY(${index * rowHeight}px)`;
+            
+            // Só redesenha a linha se o conteúdo (ou a seleção) mudou
+            const signature = item ? this.signature(item) : '';
+            if (row.dataset.signature !== signature || !row.innerHTML) {
+                row.dataset.signature = signature;
+                if (item) {
+                    row.className = 'file-item';
+                    row.innerHTML = this.renderRow(item);
+                } else {
+                    row.className = 'file-item placeholder';
+                    row.innerHTML = '<div class="file-info"><div class="file-details">Carregando...</div></div>';
+                }
             }
-        } else {
-            throw new Error(data.message);
         }
-    } catch (error) {
-        console.error('❌ Erro ao carregar Google Drive:', error);
+    }
+}
+
+/**
+ * Carrega uma lista virtualizada, mostrando o loader só na primeira carga
+ */
+async function loadVirtualList(virtualList, prefix, errorMessage) {
+    const loader = document.getElementById(`${prefix}-loader`);
+    const list = document.getElementById(`${prefix}-list`);
+    const empty = document.getElementById(`${prefix}-empty`);
+    const error = document.getElementById(`${prefix}-error`);
+    
+    if (virtualList.version === null) {
+        loader.style.display = 'flex';
+        list.style.display = 'none';
+    }
+    empty.style.display = 'none';
+    error.style.display = 'none';
+    
+    try {
+        const changed = await virtualList.reload();
+        loader.style.display = 'none';
+        list.style.display = virtualList.total === 0 ? 'none' : 'block';
+        empty.style.display = virtualList.total === 0 ? 'block' : 'none';
+        if (changed) {
+            virtualList.render();
+        }
+    } catch (err) {
+        console.error(`❌ ${errorMessage}:`, err);
         loader.style.display = 'none';
         error.style.display = 'block';
-        showToast('Erro ao carregar arquivos do Google Drive', 'error');
+        showToast(errorMessage, 'error');
     }
 }
 
+/**
+ * Carrega arquivos do Google Drive
+ */
+async function loadGoogleDriveFiles() {
+    await loadVirtualList(gdriveList, 'gdrive', 'Erro ao carregar arquivos do Google Drive');
+    updateTransferButtonState();
+}
+
 /**
  * Renderiza lista de arquivos do Google Drive
  */
 function renderGoogleDriveFiles() {
-    const list = document.getElementById('gdrive-list');
-    list.innerHTML = '';
-    
-    appState.googleDriveFiles.forEach(file => {
-        const isSelected = appState.selectedGDriveFiles.has(file.id);
-        const item = createFileItem(file, isSelected, () => {
-            toggleGDriveSelection(file.id);
-        }, () => {
-            transferSingleFile(file.id, file.name);
-        });
-        list.appendChild(item);
-    });
-    
+    gdriveList.render();
     updateTransferButtonState();
 }
 
@@ -137,111 +345,54 @@ function renderGoogleDriveFiles() {
  * Carrega blobs do Azure
  */
 async function loadAzureBlobs() {
-    const loader = document.getElementById('azure-loader');
-    const list = document.getElementById('azure-list');
-    const empty = document.getElementById('azure-empty');
-    const error = document.getElementById('azure-error');
-    
-    loader.style.display = 'flex';
-    list.style.display = 'none';
-    empty.style.display = 'none';
-    error.style.display = 'none';
-    
-    try {
-        const response = await fetch(`${API_BASE}/azure/blobs`);
-        const data = await response.json();
-        
-        if (data.status === 'success') {
-            appState.azureBlobs = data.blobs;
-            renderAzureBlobs();
-            loader.style.display = 'none';
-            list.style.display = 'flex';
-            
-            if (data.count === 0) {
-                list.style.display = 'none';
-                empty.style.display = 'block';
-            }
-        } else {
-            throw new Error(data.message);
-        }
-    } catch (error) {
-        console.error('❌ Erro ao carregar Azure Blobs:', error);
-        loader.style.display = 'none';
-        error.style.display = 'block';
-        showToast('Erro ao carregar blobs do Azure', 'error');
-    }
+    await loadVirtualList(azureList, 'azure', 'Erro ao carregar blobs do Azure');
+    updateDeleteButtonState();
 }
 
 /**
  * Renderiza lista de blobs do Azure
  */
 function renderAzureBlobs() {
-    const list = document.getElementById('azure-list');
-    list.innerHTML = '';
-    
-    appState.azureBlobs.forEach(blob => {
-        const isSelected = appState.selectedAzureBlobs.has(blob.name);
-        const item = createBlobItem(blob, isSelected, () => {
-            toggleAzureSelection(blob.name);
-        }, () => {
-            deleteBlob(blob.name);
-        });
-        list.appendChild(item);
-    });
-    
+    azureList.render();
     updateDeleteButtonState();
 }
 
 /**
- * Cria elemento de arquivo
+ * Formata data para exibição
  */
-function createFileItem(file, isSelected, onToggle, onTransfer) {
-    const div = document.createElement('div');
-    div.className = `file-item ${isSelected ? 'selected' : ''}`;
-    
-    const formatDate = (dateStr) => {
-        const date = new Date(dateStr);
-        return date.toLocaleDateString('pt-BR') + ' ' + date.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' });
-    };
-    
-    div.innerHTML = `
-        <input type="checkbox" class="file-checkbox" ${isSelected ? 'checked' : ''} onchange="${onToggle.name}">
+function formatDate(dateStr) {
+    const date = new Date(dateStr);
+    return date.toLocaleDateString('pt-BR') + ' ' + date.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' });
+}
+
+/**
+ * Conteúdo da linha de um arquivo do Google Drive
+ */
+function fileRowHtml(file) {
+    const isSelected = appState.selectedGDriveFiles.has(file.id);
+    return `
+        <input type="checkbox" class="file-checkbox" ${isSelected ? 'checked' : ''}>
         <div class="file-info">
             <div class="file-name">📄 ${escapeHtml(file.name)}</div>
             <div class="file-details">
                 <span>📦 ${file.size_mb} MB</span>
-                <span>🏷️ ${file.mime_type}</span>
+                <span>🏷️ ${escapeHtml(file.mime_type)}</span>
                 <span>📅 ${formatDate(file.created)}</span>
             </div>
         </div>
         <div class="file-actions">
-            <button class="btn btn-small btn-success" onclick="${onTransfer.name}">⬆️ Enviar</button>
+            <button class="btn btn-small btn-success" data-action="transfer">⬆️ Enviar</button>
         </div>
     `;
-    
-    div.addEventListener('click', (e) => {
-        if (e.target.tagName !== 'BUTTON' && e.target.type !== 'checkbox') {
-            onToggle();
-        }
-    });
-    
-    return div;
 }
 
 /**
- * Cria elemento de blob
+ * Conteúdo da linha de um blob
  */
-function createBlobItem(blob, isSelected, onToggle, onDelete) {
-    const div = document.createElement('div');
-    div.className = `file-item ${isSelected ? 'selected' : ''}`;
-    
-    const formatDate = (dateStr) => {
-        const date = new Date(dateStr);
-        return date.toLocaleDateString('pt-BR') + ' ' + date.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' });
-    };
-    
-    div.innerHTML = `
-        <input type="checkbox" class="file-checkbox" ${isSelected ? 'checked' : ''} onchange="${onToggle.name}">
+function blobRowHtml(blob) {
+    const isSelected = appState.selectedAzureBlobs.has(blob.name);
+    return `
+        <input type="checkbox" class="file-checkbox" ${isSelected ? 'checked' : ''}>
         <div class="file-info">
             <div class="file-name">☁️ ${escapeHtml(blob.name)}</div>
             <div class="file-details">
@@ -250,27 +401,48 @@ function createBlobItem(blob, isSelected, onToggle, onDelete) {
             </div>
         </div>
         <div class="file-actions">
-            <button class="btn btn-small btn-danger" onclick="${onDelete.name}">🗑️ Deletar</button>
+            <button class="btn btn-small btn-danger" data-action="delete">🗑️ Deletar</button>
         </div>
     `;
-    
-    div.addEventListener('click', (e) => {
-        if (e.target.tagName !== 'BUTTON' && e.target.type !== 'checkbox') {
-            onToggle();
-        }
-    });
-    
-    return div;
+}
+
+/**
+ * Clique em uma linha do Google Drive (seleção ou botão "Enviar")
+ */
+function onGDriveRowClick(file, action) {
+    if (action === 'transfer') {
+        transferSingleFile(file);
+    } else {
+        toggleGDriveSelection(file);
+    }
+}
+
+/**
+ * Clique em uma linha do Azure (seleção ou botão "Deletar")
+ */
+function onAzureRowClick(blob, action) {
+    if (action === 'delete') {
+        deleteBlob(blob.name);
+    } else {
+        toggleAzureSelection(blob.name);
+    }
+}
+
+/**
+ * Dados de um arquivo enviados na transferência
+ */
+function transferEntry(file) {
+    return { id: file.id, name: file.name, size: file.size, md5: file.md5 };
 }
 
 /**
  * Toggle seleção Google Drive
  */
-function toggleGDriveSelection(fileId) {
-    if (appState.selectedGDriveFiles.has(fileId)) {
-        appState.selectedGDriveFiles.delete(fileId);
+function toggleGDriveSelection(file) {
+    if (appState.selectedGDriveFiles.has(file.id)) {
+        appState.selectedGDriveFiles.delete(file.id);
     } else {
-        appState.selectedGDriveFiles.add(fileId);
+        appState.selectedGDriveFiles.set(file.id, transferEntry(file));
     }
     renderGoogleDriveFiles();
 }
@@ -278,8 +450,9 @@ function toggleGDriveSelection(fileId) {
 /**
  * Selecionar tudo Google Drive
  */
-function selectAllGDrive() {
-    appState.googleDriveFiles.forEach(file => appState.selectedGDriveFiles.add(file.id));
+async function selectAllGDrive() {
+    const files = await gdriveList.loadAll();
+    files.forEach(file => appState.selectedGDriveFiles.set(file.id, transferEntry(file)));
     renderGoogleDriveFiles();
 }
 
@@ -306,8 +479,9 @@ function toggleAzureSelection(blobName) {
 /**
  * Selecionar tudo Azure
  */
-function selectAllAzure() {
-    appState.azureBlobs.forEach(blob => appState.selectedAzureBlobs.add(blob.name));
+async function selectAllAzure() {
+    const blobs = await azureList.loadAll();
+    blobs.forEach(blob => appState.selectedAzureBlobs.add(blob.name));
     renderAzureBlobs();
 }
 
@@ -338,16 +512,17 @@ function updateDeleteButtonState() {
 /**
  * Transfere arquivo único
  */
-async function transferSingleFile(fileId, fileName) {
+async function transferSingleFile(file) {
     appState.selectedGDriveFiles.clear();
-    appState.selectedGDriveFiles.add(fileId);
-    await transferSelectedFiles();
+    appState.selectedGDriveFiles.set(file.id, transferEntry(file));
+    // Prioridade alta: passa na frente dos lotes em andamento no servidor
+    await transferSelectedFiles('high');
 }
 
 /**
  * Transfere arquivos selecionados
  */
-async function transferSelectedFiles() {
+async function transferSelectedFiles(priority = 'normal') {
     if (appState.selectedGDriveFiles.size === 0) {
         showToast('Selecione pelo menos um arquivo', 'warning');
         return;
@@ -362,28 +537,33 @@ async function transferSelectedFiles() {
     openTransferModal();
     
     try {
-        const fileIds = Array.from(appState.selectedGDriveFiles);
-        const response = await fetch(`${API_BASE}/transfer`, {
+        // Envia id, nome e tamanho para o servidor não precisar listar a pasta novamente
+        const files = Array.from(appState.selectedGDriveFiles.values());
+        const response = await fetch(`${API_BASE}/jobs`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ file_ids: fileIds })
+            body: JSON.stringify({ files: files, priority: priority })
         });
         
         const data = await response.json();
-        
-        if (data.status === 'success' || data.status === 'partial') {
-            showTransferResults(data.results);
-        } else {
+        if (data.status !== 'success') {
             throw new Error(data.message);
         }
         
+        appState.currentJobId = data.job.id;
+        document.getElementById('cancel-transfer-btn').style.display = 'inline-block';
+        const job = await waitForJob(data.job.id);
+        showTransferResults(job.results);
+        
     } catch (error) {
         console.error('❌ Erro ao transferir:', error);
         showToast('Erro ao transferir arquivos: ' + error.message, 'error');
     } finally {
         appState.isTransferring = false;
+        appState.currentJobId = null;
+        document.getElementById('cancel-transfer-btn').style.display = 'none';
         
         // Limpar seleção e recarregar listas
         setTimeout(() => {
@@ -436,7 +616,6 @@ async function deleteSelectedBlobs() {
     }
     
     appState.selectedAzureBlobs.clear();
-    renderAzureBlobs();
     loadAzureBlobs();
     
     showToast(`Deletados: ${deleteCount}, Erros: ${errorCount}`, deleteCount > errorCount ? 'success' : 'error');
@@ -471,6 +650,111 @@ async function deleteBlob(blobName) {
     }
 }
 
+/**
+ * Acompanha um job até o fim, mostrando o progresso em bytes
+ *
+ * @returns {Promise<object>} O job terminado, com os resultados
+ */
+async function waitForJob(jobId) {
+    let misses = 0;
+    let finished = false;
+    for (;;) {
+        // Depois do fim, uma última consulta (com as mesmas novas tentativas) traz os resultados
+        const response = await fetch(`${API_BASE}/jobs/${jobId}${finished ? '' : '?results=0'}`);
+        if (response.status === 404) {
+            // Com vários processos, a consulta pode cair em outro processo
+            if (++misses >= MAX_JOB_MISSES) {
+                throw new Error('job não encontrado no servidor');
+            }
+        } else {
+            misses = 0;
+            const data = await response.json();
+            if (data.status !== 'success') {
+                throw new Error(data.message);
+            }
+            if (finished) {
+                return data.job;
+            }
+            if (data.job.finished_at) {
+                finished = true;
+                continue;
+            }
+            showJobProgress(data.job.progress);
+        }
+        await new Promise(resolve => setTimeout(resolve, PROGRESS_POLL_MS));
+    }
+}
+
+/**
+ * Formata bytes em MB
+ */
+function formatMb(bytes) {
+    return (bytes / (1024 * 1024)).toFixed(1);
+}
+
+/**
+ * Formata o tempo restante
+ */
+function formatEta(seconds) {
+    if (seconds === null || seconds === undefined) {
+        return '';
+    }
+    if (seconds < 60) {
+        return `, faltam ~${Math.ceil(seconds)}s`;
+    }
+    return `, faltam ~${Math.floor(seconds / 60)}min ${Math.ceil(seconds % 60)}s`;
+}
+
+/**
+ * Atualiza a barra do lote e a lista dos arquivos em andamento
+ */
+function showJobProgress(progress) {
+    if (!progress) {
+        return;
+    }
+    
+    document.getElementById('progress-fill').style.width = progress.percent + '%';
+    const eta = progress.bytes_done < progress.bytes_total ? formatEta(progress.eta_s) : '';
+    document.getElementById('progress-text').textContent =
+        `${progress.files_done}/${progress.files_total} arquivo(s) · ` +
+        `${formatMb(progress.bytes_done)}/${formatMb(progress.bytes_total)} MB ` +
+        `(${progress.percent}%) · ${progress.rate_mb_s} MB/s${eta}`;
+    
+    document.getElementById('progress-files').innerHTML = progress.active.map(file => {
+        const done = file.phase === 'upload' ? file.uploaded : file.downloaded;
+        const percent = file.bytes_total ? Math.min(100, (done / file.bytes_total) * 100) : 0;
+        const phase = file.phase === 'upload' ? '⬆️' : '⬇️';
+        return `
+            <div class="progress-file">
+                <div class="progress-file-name">${phase} ${escapeHtml(file.name)}</div>
+                <div class="progress-bar small"><div class="progress-fill" style="width: ${percent}%"></div></div>
+                <div class="progress-file-info">${formatMb(done)}/${formatMb(file.bytes_total)} MB · ${file.rate_mb_s} MB/s${formatEta(file.eta_s)}</div>
+            </div>
+        `;
+    }).join('');
+}
+
+/**
+ * Cancela o job em andamento (os arquivos em andamento param no próximo bloco)
+ */
+async function cancelTransfer() {
+    if (!appState.currentJobId) {
+        return;
+    }
+    
+    try {
+        const response = await fetch(`${API_BASE}/jobs/${appState.currentJobId}/cancel`, { method: 'POST' });
+        if (!response.ok) {
+            // 404: o job está em outro processo do servidor (WEB_WORKERS > 1)
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.message || `HTTP ${response.status}`);
+        }
+        document.getElementById('progress-text').textContent = 'Cancelando...';
+    } catch (error) {
+        showToast('Erro ao cancelar: ' + error.message, 'error');
+    }
+}
+
 /**
  * Abre modal de transferência
  */
@@ -487,6 +771,7 @@ function openTransferModal() {
     const text = document.getElementById('progress-text');
     fill.style.width = '0%';
     text.textContent = 'Iniciando transferência...';
+    document.getElementById('progress-files').innerHTML = '';
 }
 
 /**
@@ -508,6 +793,7 @@ function showTransferResults(results) {
     const total = results.total;
     const success = results.success.length;
     const failed = results.failed.length;
+    const cancelled = (results.cancelled || []).length;
     
     // Atualizar barra de progresso
     const percentage = (success / total) * 100;
@@ -516,7 +802,7 @@ function showTransferResults(results) {
     // Atualizar resumo
     document.getElementById('result-total').textContent = total;
     document.getElementById('result-success').textContent = success;
-    document.getElementById('result-failed').textContent = failed;
+    document.getElementById('result-failed').textContent = failed + cancelled;
     
     // Listar resultados
     resultsList.innerHTML = '';
@@ -525,8 +811,8 @@ function showTransferResults(results) {
         const item = document.createElement('div');
         item.className = 'result-item success';
         item.innerHTML = `
-            <div class="result-item name">✅ ${escapeHtml(file.name)}</div>
-            <div class="result-item message">${file.size_mb} MB enviado</div>
+            <div class="result-item name">✅ ${escapeHtml(file.name)}${file.verified ? ' 🔒' : ''}</div>
+            <div class="result-item message">${file.size_mb} MB enviado${formatTimings(file.timings)}</div>
         `;
         resultsList.appendChild(item);
     });
@@ -541,11 +827,37 @@ function showTransferResults(results) {
         resultsList.appendChild(item);
     });
     
+    (results.cancelled || []).forEach(file => {
+        const item = document.createElement('div');
+        item.className = 'result-item error';
+        item.innerHTML = `
+            <div class="result-item name">⏹️ ${escapeHtml(file.name)}</div>
+            <div class="result-item message">Cancelado</div>
+        `;
+        resultsList.appendChild(item);
+    });
+    
     progress.style.display = 'none';
     resultsDiv.style.display = 'block';
     document.getElementById('close-modal-btn').style.display = 'block';
 }
 
+/**
+ * Formata os tempos de uma transferência (download, upload e fila)
+ */
+function formatTimings(timings) {
+    if (!timings) {
+        return '';
+    }
+    
+    const parts = [];
+    if (timings.download_s !== undefined) parts.push(`⬇️ ${timings.download_s.toFixed(2)}s`);
+    if (timings.upload_s !== undefined) parts.push(`⬆️ ${timings.upload_s.toFixed(2)}s`);
+    if (timings.queue_wait_s) parts.push(`⏳ fila ${timings.queue_wait_s.toFixed(2)}s`);
+    
+    return parts.length ? ` (${parts.join(', ')})` : '';
+}
+
 /**
  * Mostra notificação toast
  */
@@ -0,0 +1,330 @@
+"""
+Camada de armazenamento: interface comum de origem e destino
+
+O motor de transferência (transfer_file/transfer_batch), o CLI e a API
+falam com um StorageBackend: listar, ler em streaming, gravar em streaming
+e deletar. GoogleDriveManager e AzureBlobManager implementam a interface;
+LocalBackend (uma pasta do disco) e MemoryBackend (um dicionário em
+memória) servem para staging local, espelhos em disco e para medir o motor
+sem rede.
+
+Os backends são escolhidos por TRANSFER_SOURCE e TRANSFER_SINK (ver
+open_backend): 'drive', 'drive:<pasta>', 'azure', 'azure:<contêiner>',
+'local:<pasta>' ou 'memory'.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from bandwidth import default_limiter
+from config import DOWNLOAD_CHUNK_SIZE
+from logger import get_logger
+from staging import is_buffer
+
+logger = get_logger('storage')
+
+BACKEND_KINDS = ('drive', 'azure', 'local', 'memory')
+# Backends que precisam das credenciais do .env (ver validate_config)
+CLOUD_BACKENDS = ('drive', 'azure')
+
+# Gravações em andamento do LocalBackend (renomeadas ao terminar)
+PARTIAL_SUFFIX = '.part'
+
+
+class StorageBackend:
+    """
+    Origem ou destino de transferências
+
+    Os arquivos são dicionários no formato do Drive, usado pelo agendador:
+    'id', 'name', 'size', 'md5Checksum' (hex, ou None se desconhecido) e
+    'modifiedTime' (ISO 8601).
+    """
+    kind = 'storage'
+
+    def prepare(self):
+        """Cria o destino se ainda não existe (contêiner, pasta)"""
+
+    def list_files(self):
+        """
+        Lista os arquivos do backend (sem pastas)
+
+        Returns:
+            list: Arquivos no formato descrito na classe
+        """
+        raise NotImplementedError
+
+    def read_file(self, file, metrics=None, cancel=None, progress=None, limiter=None):
+        """
+        Lê um arquivo
+
+        Args:
+            file (dict): Arquivo como retornado por list_files
+            metrics (dict): Recebe 'download_s' e soma em 'api_calls'
+            cancel (CancelToken): Interrompe a leitura entre dois blocos
+            progress (FileProgress): Recebe os bytes lidos
+            limiter (Limiter): Limite de banda (padrão: só o global)
+
+        Returns:
+            bytes ou iterável de blocos de bytes (com 'size' bytes no
+            total), ou None se falhar
+        """
+        raise NotImplementedError
+
+    def write_file(self, name, content, length=None, overwrite=True, metrics=None,
+                   progress=None, limiter=None, **options):
+        """
+        Grava um arquivo
+
+        Args:
+            name (str): Nome do arquivo no destino
+            content: bytes ou iterável de blocos de bytes
+            length (int): Tamanho total; obrigatório para iteráveis
+            overwrite (bool): Se True, substitui um arquivo de mesmo nome
+            metrics (dict): Recebe 'upload_s' e soma em 'api_calls'
+            progress (FileProgress): Recebe os bytes gravados
+            limiter (Limiter): Limite de banda (padrão: só o global)
+            **options: Opções específicas do backend (ex.: content_md5 no
+                       Azure); backends que não as usam as ignoram
+
+        Returns:
+            dict: 'name', 'size', 'size_mb' e 'status' 'success', ou
+                  'status' 'error' e 'error'
+        """
+        raise NotImplementedError
+
+    def delete_file(self, name):
+        """
+        Deleta um arquivo
+
+        Returns:
+            bool: True se bem-sucedido
+        """
+        raise NotImplementedError
+
+
+def backend_kind(spec):
+    """Tipo de um backend a partir da especificação ('local:/dados' -> 'local')"""
+    return spec.partition(':')[0].strip().lower()
+
+
+def uses_cloud(*specs):
+    """Indica se algum backend precisa das credenciais do Drive ou do Azure"""
+    return any(backend_kind(spec) in CLOUD_BACKENDS for spec in specs)
+
+
+def open_backend(spec, folder_id=None, container_name=None):
+    """
+    Cria um backend a partir da especificação
+
+    Args:
+        spec (str): 'drive', 'drive:<pasta>', 'azure', 'azure:<contêiner>',
+                    'local:<pasta>' ou 'memory'
+        folder_id (str): Pasta do Drive quando spec é só 'drive'
+        container_name (str): Contêiner quando spec é só 'azure'
+
+    Raises:
+        ValueError: Especificação desconhecida ou incompleta
+    """
+    kind = backend_kind(spec)
+    argument = spec.partition(':')[2].strip()
+    if kind == 'drive':
+        from google_drive_manager import GoogleDriveManager
+        return GoogleDriveManager(folder_id=argument or folder_id)
+    if kind == 'azure':
+        from azure_blob_manager import AzureBlobManager
+        return AzureBlobManager(container_name=argument or container_name)
+    if kind == 'local' and argument:
+        return LocalBackend(argument)
+    if kind == 'memory':
+        return MemoryBackend()
+    raise ValueError(f"Backend inválido: {spec!r} (use drive, azure, local:<pasta> ou memory)")
+
+
+def _result(name, size):
+    return {
+        'name': name,
+        'size': size,
+        'size_mb': round(size / (1024 * 1024), 2),
+        'last_modified': datetime.now(timezone.utc),
+        'status': 'success'
+    }
+
+
+def _chunks(content):
+    if is_buffer(content):
+        return [content]
+    return content
+
+
+class LocalBackend(StorageBackend):
+    """Pasta do disco; os nomes usam '/' e podem ter subpastas"""
+    kind = 'local'
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _path(self, name):
+        path = os.path.abspath(os.path.join(self.root, *name.split('/')))
+        if path == self.root or os.path.commonpath([path, self.root]) != self.root:
+            raise ValueError(f"Nome fora da pasta {self.root}: {name}")
+        return path
+
+    def prepare(self):
+        os.makedirs(self.root, exist_ok=True)
+
+    def list_files(self):
+        files = []
+        for folder, _, names in os.walk(self.root):
+            for file_name in names:
+                if file_name.endswith(PARTIAL_SUFFIX):
+                    continue
+                path = os.path.join(folder, file_name)
+                stat = os.stat(path)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                files.append({
+                    'id': name,
+                    'name': name,
+                    'size': stat.st_size,
+                    'md5Checksum': None,
+                    'modifiedTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+                })
+        return sorted(files, key=lambda file: file['name'])
+
+    def read_file(self, file, metrics=None, cancel=None, progress=None, limiter=None):
+        limiter = limiter or default_limiter()
+        try:
+            handle = open(self._path(file['name']), 'rb')
+        except (OSError, ValueError) as e:
+            logger.error("❌ Erro ao ler %s: %s", file['name'], e)
+            return None
+
+        def generate():
+            started = time.perf_counter()
+            with handle:
+                while True:
+                    chunk = handle.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    limiter.consume(len(chunk), cancel)
+                    if progress is not None:
+                        progress.add_download(len(chunk))
+                    yield chunk
+            if metrics is not None:
+                metrics['download_s'] = time.perf_counter() - started
+
+        return generate()
+
+    def write_file(self, name, content, length=None, overwrite=True, metrics=None,
+                   progress=None, limiter=None, **options):
+        limiter = limiter or default_limiter()
+        started = time.perf_counter()
+        partial = None
+        try:
+            path = self._path(name)
+            if not overwrite and os.path.exists(path):
+                raise FileExistsError(f"{name} já existe")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Grava ao lado e renomeia: quem lista nunca vê um arquivo pela metade
+            partial = f"{path}.{uuid.uuid4().hex[:8]}{PARTIAL_SUFFIX}"
+            written = 0
+            with open(partial, 'wb') as out:
+                for chunk in _chunks(content):
+                    out.write(chunk)
+                    written += len(chunk)
+                    limiter.consume(len(chunk))
+                    if progress is not None:
+                        progress.upload(written, length)
+            os.replace(partial, path)
+        except Exception as e:
+            if partial is not None and os.path.exists(partial):
+                os.remove(partial)
+            logger.error("❌ Erro ao gravar %s: %s", name, e)
+            return {'name': name, 'status': 'error', 'error': str(e)}
+
+        if metrics is not None:
+            metrics['upload_s'] = time.perf_counter() - started
+        return _result(name, written)
+
+    def delete_file(self, name):
+        try:
+            os.remove(self._path(name))
+            return True
+        except (OSError, ValueError) as e:
+            logger.error("❌ Erro ao deletar %s: %s", name, e)
+            return False
+
+
+class MemoryBackend(StorageBackend):
+    """Arquivos em um dicionário do processo (testes e medições sem rede)"""
+    kind = 'memory'
+
+    def __init__(self, files=None):
+        """
+        Args:
+            files (dict): Conteúdo inicial, nome -> bytes
+        """
+        self._lock = threading.Lock()
+        self._files = {}
+        for name, data in (files or {}).items():
+            self.put(name, data)
+
+    def put(self, name, data):
+        """Grava um arquivo diretamente (sem limite de banda nem progresso)"""
+        data = bytes(data)
+        entry = (data, hashlib.md5(data).hexdigest(), datetime.now(timezone.utc).isoformat())
+        with self._lock:
+            self._files[name] = entry
+
+    def get(self, name):
+        """Conteúdo de um arquivo, ou None se não existe"""
+        with self._lock:
+            entry = self._files.get(name)
+        return entry[0] if entry else None
+
+    def list_files(self):
+        with self._lock:
+            items = sorted(self._files.items())
+        return [{'id': name, 'name': name, 'size': len(data), 'md5Checksum': md5,
+                 'modifiedTime': modified}
+                for name, (data, md5, modified) in items]
+
+    def read_file(self, file, metrics=None, cancel=None, progress=None, limiter=None):
+        data = self.get(file['name'])
+        if data is None:
+            logger.error("❌ %s não existe no backend em memória", file['name'])
+            return None
+        (limiter or default_limiter()).consume(len(data), cancel)
+        if progress is not None:
+            progress.download(len(data), len(data))
+        if metrics is not None:
+            metrics['download_s'] = 0.0
+        return data
+
+    def write_file(self, name, content, length=None, overwrite=True, metrics=None,
+                   progress=None, limiter=None, **options):
+        limiter = limiter or default_limiter()
+        started = time.perf_counter()
+        if not overwrite and self.get(name) is not None:
+            return {'name': name, 'status': 'error', 'error': f"{name} já existe"}
+        try:
+            parts = []
+            written = 0
+            for chunk in _chunks(content):
+                parts.append(bytes(chunk))
+                written += len(chunk)
+                limiter.consume(len(chunk))
+                if progress is not None:
+                    progress.upload(written, length)
+        except Exception as e:
+            return {'name': name, 'status': 'error', 'error': str(e)}
+
+        self.put(name, b''.join(parts))
+        if metrics is not None:
+            metrics['upload_s'] = time.perf_counter() - started
+        return _result(name, written)
+
+    def delete_file(self, name):
+        with self._lock:
+            return self._files.pop(name, None) is not None
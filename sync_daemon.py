@@ -0,0 +1,191 @@
+"""
+Sincronização contínua Google Drive → Azure guiada pelas mudanças do Drive
+
+Na primeira execução guarda o token de mudanças do Drive
+(changes.getStartPageToken) e espelha a pasta inteira uma vez. Depois,
+a cada SYNC_INTERVAL_SECONDS, consulta só as mudanças desde o último
+token (changes.list) e transfere os arquivos da pasta que mudaram: o
+trabalho depende da quantidade de mudanças, não do tamanho da pasta.
+
+Por padrão nenhum blob é deletado. Com delete=True, os ciclos seguintes
+deletam os blobs dos arquivos que saíram da pasta ou foram renomeados; o
+espelhamento inicial nunca deleta, porque o contêiner pode ter blobs que
+não vieram desta pasta.
+
+O token e o nome/MD5 de cada arquivo sincronizado ficam no ResumeStore,
+então o serviço retoma de onde parou após reiniciar. Arquivos cuja
+transferência falhou são tentados de novo no ciclo seguinte.
+"""
+import threading
+import time
+from config import GOOGLE_DRIVE_FOLDER_ID, SYNC_INTERVAL_SECONDS
+from drive_query import FOLDER_MIME_TYPE
+from logger import get_logger
+from mirror import plan_mirror, run_mirror
+from resume_state import ResumeStore
+from transfer_engine import blob_to_item, new_results, record_result, transfer_batch
+
+logger = get_logger('sync')
+
+
+class SyncDaemon:
+    def __init__(self, gdrive_manager, azure_manager, folder_id=None, interval=None,
+                 delete=False, workers=None, on_result=None, store=None):
+        """
+        Args:
+            gdrive_manager: Gerenciador do Google Drive
+            azure_manager: Gerenciador do Azure Blob Storage (contêiner de destino)
+            folder_id (str): Pasta sincronizada (padrão: GOOGLE_DRIVE_FOLDER_ID)
+            interval (float): Segundos entre os ciclos (padrão: SYNC_INTERVAL_SECONDS)
+            delete (bool): Deleta os blobs de arquivos removidos, movidos
+                           para fora da pasta ou renomeados (só depois do
+                           espelhamento inicial)
+            workers (int): Transferências simultâneas (None = MAX_WORKERS)
+            on_result (callable): Chamada como on_result(file, resultado)
+            store (ResumeStore): Onde fica o estado (padrão: RESUME_STATE_DIR)
+        """
+        self.gdrive_manager = gdrive_manager
+        self.azure_manager = azure_manager
+        self.folder_id = folder_id or GOOGLE_DRIVE_FOLDER_ID
+        self.interval = SYNC_INTERVAL_SECONDS if interval is None else interval
+        self.delete = delete
+        self.workers = workers
+        self.on_result = on_result
+        self.store = store or ResumeStore()
+        self.key = f"sync:{self.folder_id}->{azure_manager.container_name}"
+
+    def _bootstrap(self):
+        # O token vem antes da listagem: mudanças feitas durante o
+        # espelhamento inicial aparecem no primeiro ciclo
+        page_token = self.gdrive_manager.get_start_page_token()
+        logger.info("🔄 Sincronização inicial: espelhando a pasta inteira",
+                    extra={'folder_id': self.folder_id})
+
+        synced = {}
+
+        def listed():
+            query = (self.gdrive_manager.query(self.folder_id).files_only()
+                     .fields('id', 'name', 'size', 'md5Checksum', 'modifiedTime'))
+            for file in self.gdrive_manager.iter_files_in_folder(query=query):
+                synced[file['id']] = {'name': file['name'], 'md5': file.get('md5Checksum')}
+                yield file
+
+        blobs = ()
+        if self.azure_manager.container_client.exists():
+            blobs = (blob_to_item(blob) for blob in self.azure_manager.iter_blobs())
+        plan = plan_mirror(listed(), blobs)
+        self.azure_manager.create_container_if_not_exists()
+        results = run_mirror(self.gdrive_manager, self.azure_manager, plan,
+                             workers=self.workers, delete=False, on_result=self.on_result)
+
+        failed = {entry['name'] for entry in results['failed']}
+        retry = [file for file in plan['add'] + plan['update'] if file['name'] in failed]
+        for file in retry:
+            synced.pop(file['id'], None)
+        self.store.save(self.key, page_token=page_token, files=synced, retry=retry)
+        return results
+
+    def _in_folder(self, change):
+        file = change.get('file')
+        return (not change.get('removed') and file is not None
+                and not file.get('trashed')
+                and file.get('mimeType') != FOLDER_MIME_TYPE
+                and self.folder_id in file.get('parents', []))
+
+    def sync_once(self):
+        """
+        Executa um ciclo: consulta as mudanças e aplica as da pasta
+
+        Returns:
+            dict: Resultados (ver new_results), com 'elapsed_s', 'changes'
+                  (mudanças lidas do Drive) e 'deleted'
+        """
+        state = self.store.load(self.key)
+        if state is None:
+            results = self._bootstrap()
+            results['changes'] = 0
+            return results
+
+        started = time.perf_counter()
+        changes, next_token = self.gdrive_manager.list_changes(state['page_token'])
+        synced = state['files']
+
+        # Várias mudanças do mesmo arquivo: vale a última
+        latest = {change['fileId']: change for change in changes}
+        pending = {file['id']: file for file in state.get('retry', [])}
+        stale = []
+        for file_id, change in latest.items():
+            previous = synced.get(file_id)
+            if self._in_folder(change):
+                file = change['file']
+                if previous and previous['name'] != file['name']:
+                    stale.append(previous['name'])
+                elif previous and file.get('md5Checksum') and previous['md5'] == file['md5Checksum']:
+                    # Só metadados mudaram (ex.: permissões, descrição)
+                    pending.pop(file_id, None)
+                    continue
+                pending[file_id] = file
+            else:
+                pending.pop(file_id, None)
+                if previous:
+                    stale.append(previous['name'])
+                    del synced[file_id]
+
+        files = list(pending.values())
+        if files:
+            self.azure_manager.create_container_if_not_exists()
+            results = transfer_batch(self.gdrive_manager, self.azure_manager, files,
+                                     workers=self.workers, on_result=self.on_result,
+                                     source='sync')
+        else:
+            results = new_results(0)
+
+        failed = {entry['name'] for entry in results['failed']}
+        retry = []
+        for file in files:
+            if file['name'] in failed:
+                retry.append(file)
+            else:
+                synced[file['id']] = {'name': file['name'], 'md5': file.get('md5Checksum')}
+
+        # Um nome antigo pode ter sido reaproveitado por outro arquivo sincronizado
+        current = {entry['name'] for entry in synced.values()}
+        stale = [name for name in dict.fromkeys(stale) if name not in current]
+        results['deleted'] = 0
+        if self.delete and stale:
+            outcome = self.azure_manager.delete_blobs(stale)
+            results['deleted'] = len(outcome['deleted'])
+            results['total'] += len(stale)
+            for name in outcome['deleted']:
+                record_result(results, {'name': name, 'status': 'success', 'action': 'delete'})
+            for failure in outcome['failed']:
+                record_result(results, dict(failure, status='error', stage='delete', action='delete'))
+
+        self.store.save(self.key, page_token=next_token, files=synced, retry=retry)
+        results['changes'] = len(changes)
+        results['elapsed_s'] = round(time.perf_counter() - started, 3)
+        return results
+
+    def run(self, stop_event=None):
+        """
+        Executa ciclos até stop_event ser sinalizado
+
+        Um erro em um ciclo (ex.: rede) é registrado e o ciclo seguinte
+        tenta de novo a partir do mesmo token.
+        """
+        stop_event = stop_event or threading.Event()
+        logger.info("🔄 Sincronização contínua a cada %ss", self.interval,
+                    extra={'folder_id': self.folder_id,
+                           'container': self.azure_manager.container_name})
+        while not stop_event.is_set():
+            try:
+                results = self.sync_once()
+                level = logger.info if results['total'] else logger.debug
+                level("🔄 Ciclo: %d mudança(s), %d enviado(s), %d falha(s), %d deletado(s)",
+                      results['changes'], len(results['success']) - results['deleted'],
+                      len(results['failed']), results['deleted'],
+                      extra={'elapsed_s': results['elapsed_s']})
+            except Exception as e:
+                logger.error("❌ Erro no ciclo de sincronização: %s", e)
+            stop_event.wait(self.interval)
+        logger.info("⏹️  Sincronização encerrada")
@@ -0,0 +1,159 @@
+"""
+Módulo de rastreamento (tracing) no estilo OpenTelemetry
+
+Cada etapa de uma transferência (download, upload, propriedades) gera um
+span com início, fim e atributos. Os spans podem ser exportados para um
+arquivo JSON local (um span por linha) para investigar transferências lentas.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from config import TRACE_EXPORT_FILE
+
+
+class Span:
+    """Representa uma operação medida dentro de um trace"""
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.start_time = time.time()
+        self.end_time = None
+        self._start = time.perf_counter()
+        self._end = None
+
+    @property
+    def duration(self):
+        """Duração do span em segundos"""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def set_attribute(self, key, value):
+        """Adiciona um atributo ao span"""
+        self.attributes[key] = value
+
+    def end(self, error=None):
+        """Finaliza o span"""
+        self._end = time.perf_counter()
+        self.end_time = self.start_time + (self._end - self._start)
+        if error is not None:
+            self.status = 'error'
+            self.attributes['error'] = str(error)
+
+    def to_dict(self):
+        """Converte o span para um dicionário serializável"""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_span_id': self.parent_id,
+            'name': self.name,
+            'start_time_unix_nano': int(self.start_time * 1e9),
+            'end_time_unix_nano': int((self.end_time or self.start_time) * 1e9),
+            'duration_ms': round(self.duration * 1000, 3),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+
+class Tracer:
+    def __init__(self, export_file=None):
+        """
+        Inicializa o tracer
+
+        Args:
+            export_file (str): Arquivo JSON para exportar os spans.
+                               Se vazio, os spans não são guardados.
+        """
+        self.export_file = export_file
+        self.enabled = bool(export_file)
+        self._finished = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self):
+        """Retorna o span ativo na thread atual, ou None"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """
+        Abre um span filho do span ativo (ou a raiz de um novo trace)
+
+        O span é sempre medido, mesmo com o tracer desabilitado, para que
+        a duração possa ser usada nos resultados das transferências.
+
+        Args:
+            name (str): Nome da operação
+            parent (Span): Span pai explícito, para operações executadas
+                           em outra thread. Se None, usa o span ativo
+        """
+        parent = parent or self.current_span()
+        trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        parent_id = parent.span_id if parent else None
+        span = Span(name, trace_id, parent_id, attributes)
+
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(error=e)
+            raise
+        else:
+            span.end()
+        finally:
+            stack.pop()
+            if self.enabled:
+                with self._lock:
+                    self._finished.append(span)
+
+    def export(self, path=None):
+        """
+        Exporta os spans finalizados para um arquivo JSON (um span por linha)
+
+        Args:
+            path (str): Caminho do arquivo. Se None, usa o configurado
+
+        Returns:
+            int: Quantidade de spans exportados
+        """
+        path = path or self.export_file
+        if not path:
+            return 0
+
+        with self._lock:
+            spans, self._finished = self._finished, []
+
+        if not spans:
+            return 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + '\n')
+
+        return len(spans)
+
+
+_tracer = Tracer(TRACE_EXPORT_FILE)
+
+
+def get_tracer():
+    """Retorna o tracer global da aplicação"""
+    return _tracer
@@ -0,0 +1,556 @@
+"""
+Motor de transferência Google Drive → Azure Blob Storage
+
+Centraliza a transferência de um arquivo e de lotes de arquivos em
+paralelo (usada pelo CLI e pela API) e registra os tempos de cada etapa
+no resultado. A origem e o destino são StorageBackend (ver storage.py):
+por padrão o Drive e o Azure, mas também uma pasta local ou a memória.
+Também faz o caminho inverso, Azure → Google Drive, para restaurar backups.
+"""
+import time
+from datetime import datetime
+from config import (
+    API_CALL_BUDGET_PER_FILE, VERIFY_INTEGRITY, AZURE_READ_CHUNK_SIZE, DRIVE_UPLOAD_CHUNK_SIZE,
+    DOWNLOAD_CHUNK_SIZE
+)
+from cancellation import TransferCancelled
+from drive_query import FOLDER_MIME_TYPE
+from history import begin_batch
+from integrity import StreamHasher, md5_hex_to_bytes
+from resume_state import ResumeStore
+from scheduler import TransferScheduler, block_concurrency, file_size, plan_batch
+from spool_cache import get_spool_cache
+from staging import is_buffer
+from tracing import get_tracer
+
+
+def new_results(total):
+    """Cria o dicionário de resultados de um lote"""
+    return {
+        'success': [],
+        'failed': [],
+        'cancelled': [],
+        'total': total,
+        'api_calls': 0,
+        'over_budget': 0,
+        'bytes': 0,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def record_result(results, result):
+    """Adiciona o resultado de um arquivo na lista correspondente do lote"""
+    entry = {key: value for key, value in result.items() if key != 'status'}
+    results['api_calls'] += result.get('api_calls', 0)
+    if result.get('over_budget'):
+        results['over_budget'] += 1
+    if result['status'] == 'success':
+        results['bytes'] += result.get('size', 0)
+        results['success'].append(entry)
+    elif result['status'] == 'cancelled':
+        results['cancelled'].append(entry)
+    else:
+        results['failed'].append(entry)
+
+
+def api_calls_per_file(results):
+    """Média de chamadas de API por arquivo processado no lote"""
+    processed = len(results['success']) + len(results['failed'])
+    if not processed:
+        return 0.0
+    return round(results['api_calls'] / processed, 2)
+
+
+def throughput_mb_s(results):
+    """Vazão agregada do lote em MB/s (bytes transferidos / tempo total)"""
+    elapsed = results.get('elapsed_s')
+    if not elapsed:
+        return 0.0
+    return round(results['bytes'] / (1024 * 1024) / elapsed, 2)
+
+
+def track(progress, file, run):
+    """
+    Executa run(file_progress) registrando o arquivo no ProgressTracker
+
+    Sem tracker (progress None), run recebe None.
+    """
+    if progress is None:
+        return run(None)
+    file_progress = progress.start(file)
+    try:
+        return run(file_progress)
+    finally:
+        progress.finish(file_progress)
+
+
+def _round_timings(metrics):
+    return {key: round(value, 4) for key, value in metrics.items() if value is not None}
+
+
+def transfer_file(origin, destination, file, enqueued_at=None, targets=None,
+                  cancel=None, progress=None, limiter=None):
+    """
+    Transfere um arquivo da origem para o destino (Google Drive → Azure)
+
+    Args:
+        origin (StorageBackend): Origem (ex.: GoogleDriveManager)
+        destination (StorageBackend): Destino (ex.: AzureBlobManager)
+        file (dict): Arquivo como retornado por origin.list_files()
+        enqueued_at (float): time.perf_counter() de quando o arquivo entrou
+                             na fila; usado para calcular 'queue_wait_s'
+        targets (list): Outros AzureBlobManager que recebem o mesmo
+                        download (fan-out, só com destino Azure); a origem
+                        é lida uma única vez
+        cancel (CancelToken): Interrompe a transferência entre dois blocos;
+                              o resultado fica com status 'cancelled'
+        progress (FileProgress): Recebe os bytes baixados e enviados
+        limiter (Limiter): Limite de banda do download e do upload
+                           (padrão: só o global)
+
+    Returns:
+        dict: 'name', 'status' ('success', 'error' ou 'cancelled'), 'size_mb' ou 'error',
+              'timings' com os tempos de cada etapa em segundos e
+              'api_calls' com as requisições feitas ao Drive e ao Azure
+    """
+    file_id = file['id']
+    file_name = file['name']
+    started = time.perf_counter()
+    metrics = {
+        'queue_wait_s': started - enqueued_at if enqueued_at is not None else 0.0
+    }
+
+    with get_tracer().span('transfer_file', file_id=file_id, file_name=file_name,
+                           size=int(file.get('size', 0))) as span:
+        span.set_attribute('queue_wait_ms', round(metrics['queue_wait_s'] * 1000, 3))
+        expected_md5 = file.get('md5Checksum')
+        spool = get_spool_cache() if expected_md5 else None
+        cached = spool.open(file_id, expected_md5) if spool else None
+        spool_writer = None
+        span.set_attribute('cached', cached is not None)
+        try:
+            # Ler da origem (ou a mesma versão do cache em disco)
+            length = None
+            if cancel is not None:
+                cancel.check()
+            if cached is not None:
+                length = cached.size
+                if progress is not None:
+                    progress.download(cached.size, cached.size)
+                chunked = targets or cancel is not None
+                file_content = cached.content(DOWNLOAD_CHUNK_SIZE if chunked else None)
+            else:
+                # Arquivos grandes do Drive chegam em intervalos paralelos, em ordem
+                file_content = origin.read_file(file, metrics=metrics, cancel=cancel,
+                                                progress=progress, limiter=limiter)
+                if file_content is not None and not is_buffer(file_content):
+                    length = file_size(file)
+                    if not length:
+                        # Tamanho desconhecido (ex.: informado pelo cliente): lê tudo antes
+                        file_content, length = b''.join(file_content), None
+
+            if file_content is None:
+                result = {
+                    'name': file_name,
+                    'status': 'error',
+                    'stage': 'download',
+                    'error': f'Falha ao ler da origem ({origin.kind})'
+                }
+            else:
+                # O MD5 é calculado enquanto os bytes seguem para o Azure;
+                # o que vem do cache já foi conferido ao entrar nele
+                hasher = StreamHasher()
+                if cancel is not None:
+                    cancel.check()
+                    if not is_buffer(file_content):
+                        file_content = cancel.wrap(file_content)
+                if cached is None:
+                    file_content = hasher.wrap(file_content)
+                    if spool is not None:
+                        spool_writer = spool.writer(file_id, expected_md5)
+                        file_content = spool_writer.wrap(file_content)
+
+                # Gravar no destino (e nos demais contêineres, se houver)
+                upload_options = {
+                    'overwrite': True,
+                    'metrics': metrics,
+                    'max_concurrency': block_concurrency(file),
+                    'length': length,
+                    'content_md5': md5_hex_to_bytes(expected_md5),
+                    'validate_content': VERIFY_INTEGRITY,
+                    'progress': progress,
+                    'limiter': limiter
+                }
+                if targets:
+                    upload_result = destination.upload_blob_fanout(
+                        file_name, file_content, targets, **upload_options
+                    )
+                else:
+                    upload_result = destination.write_file(file_name, file_content, **upload_options)
+
+                received_md5 = expected_md5 if cached is not None else hasher.hexdigest()
+                if spool_writer is not None:
+                    # Só guarda downloads completos e com o MD5 do Drive
+                    spool_writer.finish(keep=received_md5 == expected_md5 and
+                                        hasher.bytes == file_size(file))
+                    spool_writer = None
+
+                if upload_result['status'] == 'success' and expected_md5 and \
+                        VERIFY_INTEGRITY and received_md5 != expected_md5:
+                    # Conteúdo divergente do Drive: não deixa o blob corrompido
+                    for backend in [destination] + list(targets or []):
+                        backend.delete_file(file_name)
+                    result = {
+                        'name': file_name,
+                        'status': 'error',
+                        'stage': 'verify',
+                        'error': f'MD5 divergente ({origin.kind} {expected_md5}, recebido {received_md5})'
+                    }
+                elif upload_result['status'] == 'success':
+                    result = {
+                        'name': file_name,
+                        'status': 'success',
+                        'size': upload_result['size'],
+                        'size_mb': upload_result['size_mb'],
+                        'md5': received_md5,
+                        'verified': bool(expected_md5 and VERIFY_INTEGRITY),
+                        'cached': cached is not None
+                    }
+                else:
+                    result = {
+                        'name': file_name,
+                        'status': 'error',
+                        'stage': 'upload',
+                        'error': upload_result.get('error', 'Erro desconhecido')
+                    }
+
+                if 'targets' in upload_result:
+                    result['targets'] = [
+                        {key: target.get(key) for key in ('container', 'status', 'error')}
+                        for target in upload_result['targets']
+                    ]
+
+        except TransferCancelled as e:
+            result = {'name': file_name, 'status': 'cancelled', 'error': str(e)}
+        except Exception as e:
+            result = {
+                'name': file_name,
+                'status': 'error',
+                'error': str(e)
+            }
+        finally:
+            if spool_writer is not None:
+                spool_writer.finish(keep=False)
+            if cached is not None:
+                cached.close()
+
+        if cancel is not None and cancel.cancelled and result['status'] == 'error' and \
+                result.get('stage') != 'verify':
+            # O SDK do Azure devolve a interrupção do gerador como erro de upload
+            result = {'name': file_name, 'status': 'cancelled', 'stage': result.get('stage'),
+                      'error': 'Transferência cancelada'}
+
+        span.set_attribute('status', result['status'])
+        span.set_attribute('api_calls', metrics.get('api_calls', 0))
+
+    metrics['total_s'] = time.perf_counter() - started
+    api_calls = metrics.pop('api_calls', 0)
+    result['timings'] = _round_timings(metrics)
+    result['api_calls'] = api_calls
+    if API_CALL_BUDGET_PER_FILE and api_calls > API_CALL_BUDGET_PER_FILE:
+        result['over_budget'] = True
+    return result
+
+
+def transfer_batch(origin, destination, files, workers=None, on_result=None,
+                   targets=None, source='batch', progress=None, limiter=None, cancel=None):
+    """
+    Transfere um lote de arquivos em paralelo
+
+    O lote é ordenado por plan_batch (do maior para o menor; os menores
+    preenchem os workers livres no fim) e cada arquivo é admitido pelo
+    TransferScheduler conforme o orçamento de bytes em memória
+    (MAX_INFLIGHT_MB), usando o campo 'size' do Drive.
+
+    Args:
+        origin (StorageBackend): Origem (ex.: GoogleDriveManager)
+        destination (StorageBackend): Destino (ex.: AzureBlobManager)
+        files (list): Arquivos como retornados por origin.list_files()
+        workers (int): Transferências simultâneas (None = MAX_WORKERS)
+        on_result (callable): Chamada como on_result(file, resultado) ao
+                              fim de cada arquivo
+        targets (list): Destinos adicionais de fan-out (ver transfer_file)
+        source (str): Origem do lote no histórico (ex.: 'api', 'cli')
+        progress (ProgressTracker): Recebe o progresso em bytes de cada arquivo
+        limiter (Limiter): Limite de banda do lote (padrão: só o global)
+        cancel (CancelToken): Interrompe o lote; os arquivos que faltam
+                              ficam com status 'cancelled'
+
+    Returns:
+        dict: Resultados do lote (ver new_results), com 'elapsed_s'
+    """
+    results = new_results(len(files))
+    enqueued_at = time.perf_counter()
+    history = begin_batch(source)
+
+    def handle(file, result):
+        record_result(results, result)
+        if history:
+            history.add(result)
+        if on_result:
+            on_result(file, result)
+
+    def run(file):
+        return track(progress, file, lambda file_progress: transfer_file(
+            origin, destination, file, enqueued_at=enqueued_at, targets=targets,
+            cancel=cancel, progress=file_progress, limiter=limiter
+        ))
+
+    TransferScheduler(workers=workers).run(plan_batch(files), run, on_result=handle)
+    results['elapsed_s'] = round(time.perf_counter() - enqueued_at, 3)
+    if history:
+        history.finish(results)
+
+    get_tracer().export()
+    return results
+
+
+def blob_to_item(blob):
+    """Converte as propriedades de um blob no formato usado pelo agendador"""
+    content_settings = blob.content_settings
+    return {
+        'name': blob.name,
+        'size': blob.size,
+        'content_md5': bytes(content_settings.content_md5).hex() if content_settings.content_md5 else None,
+        'content_type': content_settings.content_type,
+        'last_modified': blob.last_modified
+    }
+
+
+def restore_blob(azure_manager, gdrive_manager, blob, folder_id=None, file_name=None,
+                 enqueued_at=None, progress=None, limiter=None):
+    """
+    Transfere um blob do Azure para o Google Drive (sentido inverso)
+
+    O blob é lido em intervalos e enviado com upload resumable; a sessão
+    é salva para retomar o arquivo se o processo for interrompido.
+
+    Args:
+        azure_manager: Gerenciador do Azure Blob Storage (origem)
+        gdrive_manager: Gerenciador do Google Drive (destino)
+        blob (dict): Blob como retornado por blob_to_item
+        folder_id (str): Pasta de destino no Drive
+        file_name (str): Nome no Drive (padrão: a última parte do nome do blob)
+        enqueued_at (float): Ver transfer_file
+        progress (FileProgress): Recebe os bytes confirmados pelo Drive
+        limiter (Limiter): Limite de banda da leitura e do upload
+
+    Returns:
+        dict: Mesmo formato de transfer_file, com 'drive_id' no sucesso
+    """
+    blob_name = blob['name']
+    started = time.perf_counter()
+    metrics = {
+        'queue_wait_s': started - enqueued_at if enqueued_at is not None else 0.0
+    }
+
+    resume_key = f"{azure_manager.container_name}/{blob_name}->{folder_id or ''}"
+    with get_tracer().span('restore_blob', blob=blob_name, size=blob['size']) as span:
+        try:
+            reader, _ = azure_manager.open_blob_reader(blob_name, limiter=limiter)
+            upload_result = gdrive_manager.upload_file_resumable(
+                file_name or blob_name.rsplit('/', 1)[-1], reader,
+                folder_id=folder_id,
+                mime_type=blob.get('content_type'),
+                resume_key=resume_key,
+                metrics=metrics,
+                progress=progress,
+                limiter=limiter
+            )
+
+            expected_md5 = blob.get('content_md5')
+            if upload_result['status'] != 'success':
+                result = {
+                    'name': blob_name,
+                    'status': 'error',
+                    'stage': 'upload',
+                    'error': upload_result.get('error', 'Erro desconhecido')
+                }
+            elif VERIFY_INTEGRITY and expected_md5 and \
+                    upload_result.get('md5Checksum') != expected_md5:
+                # Conteúdo divergente do Azure: não deixa o arquivo corrompido
+                # no Drive nem uma sessão que o retomaria
+                gdrive_manager.trash_file(upload_result['id'])
+                ResumeStore().clear(resume_key)
+                result = {
+                    'name': blob_name,
+                    'status': 'error',
+                    'stage': 'verify',
+                    'error': f"MD5 divergente (Azure {expected_md5}, Drive {upload_result.get('md5Checksum')})"
+                }
+            else:
+                size = int(upload_result.get('size', blob['size']))
+                result = {
+                    'name': blob_name,
+                    'status': 'success',
+                    'drive_id': upload_result['id'],
+                    'size': size,
+                    'size_mb': round(size / (1024 * 1024), 2),
+                    'md5': upload_result.get('md5Checksum'),
+                    'verified': bool(expected_md5 and VERIFY_INTEGRITY)
+                }
+
+        except Exception as e:
+            result = {
+                'name': blob_name,
+                'status': 'error',
+                'error': str(e)
+            }
+
+        span.set_attribute('status', result['status'])
+
+    metrics['total_s'] = time.perf_counter() - started
+    result['api_calls'] = metrics.pop('api_calls', 0)
+    result['timings'] = _round_timings(metrics)
+    return result
+
+
+def _same_content(drive_file, blob):
+    if drive_file.get('md5Checksum') and blob.get('content_md5'):
+        return drive_file['md5Checksum'] == blob['content_md5']
+    return file_size(drive_file) == file_size(blob)
+
+
+def plan_restore(gdrive_manager, blobs, folder_id=None):
+    """
+    Decide a pasta e o nome de cada blob no Drive
+
+    Os diretórios virtuais do blob ('a/b/x.txt') viram subpastas da pasta
+    de destino; as que faltam são criadas aqui, antes dos uploads
+    paralelos. Blobs que já estão na pasta com o mesmo nome e o mesmo MD5
+    (o mesmo tamanho, se um dos lados não tem MD5) são marcados como já
+    restaurados, então rodar a restauração de novo não duplica arquivos.
+
+    Returns:
+        dict: Nome do blob -> {'folder_id', 'file_name', 'existing'
+              (arquivo do Drive ou None)}, ou {'error'} se o blob não pode
+              ser restaurado
+    """
+    root = folder_id or gdrive_manager.folder_id or 'root'
+    folders = {(): root}
+    subfolders = {}
+    listings = {}
+    plans = {}
+    paths = set()
+
+    def folder_for(parts):
+        if parts not in folders:
+            parent = folder_for(parts[:-1])
+            folder = None
+            if parent:
+                if parent not in subfolders:
+                    query = gdrive_manager.query(parent).mime_types(FOLDER_MIME_TYPE).fields('id', 'name')
+                    subfolders[parent] = {file['name']: file['id']
+                                          for file in gdrive_manager.iter_files_in_folder(query=query)}
+                folder = subfolders[parent].get(parts[-1]) or \
+                    gdrive_manager.create_folder(parts[-1], parent)
+                subfolders[parent][parts[-1]] = folder
+            folders[parts] = folder
+        return folders[parts]
+
+    def files_in(folder):
+        if folder not in listings:
+            query = gdrive_manager.query(folder).files_only().fields('id', 'name', 'size', 'md5Checksum')
+            listings[folder] = {}
+            for file in gdrive_manager.iter_files_in_folder(query=query):
+                listings[folder].setdefault(file['name'], []).append(file)
+        return listings[folder]
+
+    for blob in blobs:
+        parts = tuple(part for part in blob['name'].split('/') if part)
+        if not parts or parts in paths:
+            # Só acontece com nomes como 'a//x' e 'a/x', ou marcadores de diretório
+            plans[blob['name']] = {'error': f"Caminho no Drive vazio ou repetido: {'/'.join(parts)}"}
+            continue
+        paths.add(parts)
+        folder = folder_for(parts[:-1])
+        if not folder:
+            plans[blob['name']] = {'error': f"Falha ao criar a pasta {'/'.join(parts[:-1])} no Drive"}
+            continue
+        existing = [file for file in files_in(folder).get(parts[-1], []) if _same_content(file, blob)]
+        plans[blob['name']] = {
+            'folder_id': folder,
+            'file_name': parts[-1],
+            'existing': existing[0] if existing else None
+        }
+    return plans
+
+
+def restore_batch(azure_manager, gdrive_manager, blobs, folder_id=None, workers=None,
+                  on_result=None, source='restore', progress=None, limiter=None):
+    """
+    Restaura um lote de blobs do Azure para o Google Drive em paralelo
+
+    Cada blob ocupa em memória no máximo um intervalo de leitura do Azure
+    mais um chunk do upload do Drive, independente do seu tamanho. As
+    pastas e os blobs já restaurados são resolvidos antes (ver
+    plan_restore); os já restaurados entram como sucesso com 'skipped'.
+
+    Args:
+        azure_manager: Gerenciador do Azure Blob Storage (origem)
+        gdrive_manager: Gerenciador do Google Drive (destino)
+        blobs (list): Blobs como retornados por blob_to_item
+        folder_id (str): Pasta de destino no Drive
+        workers (int): Transferências simultâneas (None = MAX_WORKERS)
+        on_result (callable): Chamada como on_result(blob, resultado)
+        source (str): Origem do lote no histórico
+        progress (ProgressTracker): Recebe o progresso em bytes de cada blob
+        limiter (Limiter): Limite de banda do lote (padrão: só o global)
+
+    Returns:
+        dict: Resultados do lote (ver new_results), com 'elapsed_s'
+    """
+    results = new_results(len(blobs))
+    enqueued_at = time.perf_counter()
+    window = AZURE_READ_CHUNK_SIZE + DRIVE_UPLOAD_CHUNK_SIZE
+    history = begin_batch(source)
+
+    def handle(blob, result):
+        record_result(results, result)
+        if history:
+            history.add(result)
+        if on_result:
+            on_result(blob, result)
+
+    plans = plan_restore(gdrive_manager, blobs, folder_id)
+    pending = []
+    for blob in blobs:
+        plan = plans[blob['name']]
+        if 'error' in plan:
+            result = {'name': blob['name'], 'status': 'error', 'stage': 'plan', 'error': plan['error']}
+        elif plan['existing'] is not None:
+            result = {'name': blob['name'], 'status': 'success', 'skipped': True,
+                      'drive_id': plan['existing']['id'],
+                      'md5': plan['existing'].get('md5Checksum')}
+        else:
+            pending.append(blob)
+            continue
+        handle(blob, track(progress, blob, lambda _, result=result: result))
+
+    TransferScheduler(workers=workers).run(
+        plan_batch(pending),
+        lambda blob: track(progress, blob, lambda blob_progress: restore_blob(
+            azure_manager, gdrive_manager, blob,
+            folder_id=plans[blob['name']]['folder_id'],
+            file_name=plans[blob['name']]['file_name'],
+            enqueued_at=enqueued_at, progress=blob_progress, limiter=limiter
+        )),
+        size_of=lambda blob: min(file_size(blob), window),
+        on_result=handle
+    )
+    results['elapsed_s'] = round(time.perf_counter() - enqueued_at, 3)
+    if history:
+        history.finish(results)
+
+    get_tracer().export()
+    return results
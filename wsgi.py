@@ -0,0 +1,27 @@
+"""
+Ponto de entrada WSGI para produção
+
+    gunicorn -c gunicorn.conf.py wsgi:app      (Linux/macOS)
+    python wsgi.py                             (waitress, também no Windows)
+
+Processos e threads são configurados por WEB_WORKERS e WEB_THREADS.
+"""
+import sys
+from app import create_app
+from config import validate_config, WEB_HOST, WEB_PORT, WEB_THREADS
+from logger import get_logger
+
+app = create_app()
+logger = get_logger('wsgi')
+
+if __name__ == '__main__':
+    if not validate_config():
+        logger.error("❌ Configurações inválidas")
+        sys.exit(1)
+    
+    from waitress import serve
+    
+    # waitress usa um processo com várias threads; para vários processos
+    # use o gunicorn (ou rode mais instâncias atrás de um balanceador)
+    logger.info("🌐 Servindo em http://%s:%d (%d threads)", WEB_HOST, WEB_PORT, WEB_THREADS)
+    serve(app, host=WEB_HOST, port=WEB_PORT, threads=WEB_THREADS)